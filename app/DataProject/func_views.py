@@ -1,26 +1,51 @@
 import base64
+import logging
 import os
 import json
 import re
+from contextlib import ExitStack
 
 from datetime import datetime
 
-import pandas as pd
 from flask import request, jsonify, current_app, send_file
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from werkzeug.exceptions import RequestEntityTooLarge
 from werkzeug.utils import secure_filename
 
 from app import db
 from .modules import (
-    DataProject, ProjectUser, Table, Sheet, SheetProject,
+    DataProject, ProjectUser, Table, Sheet, SheetProject, ProjectWorkbook,
     ChartData, ChartType, ChartProject, DataAnaType, DataAnaModel, DataAnaModelsTypes
 )
 from app.user.modules import User  # 导入User模型
 from app.core.config import config  # 导入配置文件
+from app.core.utils import lazy_import
+from app.core.metrics import stage_timer
+from app.core.logger import brief
 
 from app.Utils.data_project_utils import DataProjectUtils
 from app.Utils.chart_utils import ChartUtils
 from app.Utils.RequestsUtils import RequestsUtils
 from app.Utils.data_detail_utils import ExcelExec
+from app.Utils.pagination_utils import PaginationUtils
+from app.Utils.cache_utils import TTLCache
+from app.Utils.reference_cache import ReferenceCache
+from app.Utils.FilsSystemUtils import FilsSystemUtils
+from app.Utils.csv_utils import CsvUtils
+from app.Utils.excel_reader import ExcelReader
+from app.Utils.excel_writer import (ExcelStreamWriter, UnsupportedWorkbookError, atomic_replace, frame_rows,
+                                    unique_sheet_name)
+from app.core.project_lock import READ, WRITE, ProjectLockTimeout, locked_project, project_lock
+from app.core.uploads import ChunkedUpload, ChunkedUploadError, save_upload, stored_upload_path
+
+logger = logging.getLogger(__name__)
+
+# pandas 延迟到首次读取Excel时再导入，轻量接口不必承担其导入开销
+pd = lazy_import('pandas')
+
+# 图表总数缓存：键为 (项目ID, 图表类型ID)
+chart_count_cache = TTLCache(ttl=config.CHART_COUNT_CACHE_TTL)
 
 
 # -------------------------项目数据处理方法-------------------------------
@@ -31,13 +56,13 @@ def project_add():
         data = request.get_json()
 
         # 添加调试信息
-        print("=== 收到创建项目请求 ===")
-        print(f"请求数据: {data}")
-        print(f"请求头: {dict(request.headers)}")
-        print(f"Content-Type: {request.content_type}")
+        logger.debug("=== 收到创建项目请求 ===")
+        logger.debug("请求数据: %s", brief(data))
+        logger.debug("请求头: %s", brief(dict(request.headers)))
+        logger.debug("Content-Type: %s", request.content_type)
 
         if not data:
-            print("错误: 请求数据为空")
+            logger.warning("错误: 请求数据为空")
             return jsonify({
                 'success': False,
                 'message': '请求数据不能为空'
@@ -45,12 +70,13 @@ def project_add():
 
         # 验证必填字段
         required_fields = ['name', 'user_ids']
-        print(f"验证必填字段: {required_fields}")
+        logger.debug("验证必填字段: %s", brief(required_fields))
 
         for field in required_fields:
-            print(f"检查字段 '{field}': 存在={field in data}, 值={data.get(field) if field in data else '不存在'}")
+            logger.debug("检查字段 '%s': 存在=%s, 值=%s",
+                         field, field in data, brief(data.get(field, '不存在')))
             if field not in data or not data[field]:
-                print(f"错误: 字段 '{field}' 为空或不存在")
+                logger.warning("错误: 字段 '%s' 为空或不存在", field)
                 return jsonify({
                     'success': False,
                     'message': f'{field}字段不能为空'
@@ -60,29 +86,27 @@ def project_add():
         description = data.get('description', '').strip()
         user_ids = data['user_ids']  # 用户ID列表
 
-        print(f"处理数据 - 名称: '{name}', 描述: '{description}', 用户ID: {user_ids}")
+        logger.debug("处理数据 - 名称: '%s', 描述: '%s', 用户ID: %s",
+                     brief(name), brief(description), brief(user_ids))
 
         # 检查项目名是否已存在
         existing_project = DataProject.query.filter_by(name=name).first()
         if existing_project:
-            print(f"错误: 项目名 '{name}' 已存在")
+            logger.warning("错误: 项目名 '%s' 已存在", brief(name))
             return jsonify({
                 'success': False,
                 'message': '项目名已存在'
             }), 400
 
-        # 验证用户是否存在
-        valid_users = []
-        for user_id in user_ids:
-            user = User.query.get(user_id)
-            if not user:
-                print(f"错误: 用户ID {user_id} 不存在")
-                return jsonify({
-                    'success': False,
-                    'message': f'用户ID {user_id} 不存在'
-                }), 400
-            valid_users.append(user)
-            print(f"用户 {user_id} 验证通过: {user.username}")
+        # 验证用户是否存在（一次 IN 查询）
+        valid_users, missing_user_id = load_users_by_ids(user_ids)
+        if missing_user_id is not None:
+            logger.warning("错误: 用户ID %s 不存在", missing_user_id)
+            return jsonify({
+                'success': False,
+                'message': f'用户ID {missing_user_id} 不存在'
+            }), 400
+        logger.debug("用户验证通过: %s", brief([user.username for user in valid_users]))
 
         # 创建新项目
         new_project = DataProject(
@@ -92,25 +116,22 @@ def project_add():
 
         db.session.add(new_project)
         db.session.flush()  # 获取项目ID但不提交事务
-        print(f"创建项目成功，项目ID: {new_project.id}")
+        logger.info("创建项目成功，项目ID: %s", new_project.id)
 
-        # 创建项目-用户关联关系
-        for user_id in user_ids:
-            project_user = ProjectUser(
-                user_id=user_id,
-                project_id=new_project.id
-            )
-            db.session.add(project_user)
-            print(f"创建项目-用户关联: 项目ID={new_project.id}, 用户ID={user_id}")
+        # 创建项目-用户关联关系（批量插入）
+        db.session.bulk_insert_mappings(ProjectUser, [
+            {'user_id': user.id, 'project_id': new_project.id} for user in valid_users
+        ])
+        logger.debug("创建项目-用户关联: 项目ID=%s, 用户数=%s", new_project.id, len(valid_users))
 
         db.session.commit()
-        print("数据库提交成功")
+        logger.debug("数据库提交成功")
 
         # 获取完整的项目信息（包含用户信息）
         project_dict = new_project.to_dict()
         project_dict['users'] = [user.to_dict() for user in valid_users]
 
-        print("=== 项目创建完成 ===")
+        logger.debug("=== 项目创建完成 ===")
         return jsonify({
             'success': True,
             'message': '项目创建成功',
@@ -119,36 +140,83 @@ def project_add():
 
     except Exception as e:
         db.session.rollback()
-        print(f"=== 发生异常 ===")
-        print(f"错误类型: {type(e).__name__}")
-        print(f"错误信息: {str(e)}")
-        import traceback
-        print(f"堆栈跟踪: {traceback.format_exc()}")
+        logger.exception("创建项目时发生异常")
         return jsonify({
             'success': False,
             'message': f'项目创建失败: {str(e)}'
         }), 500
 
 
+def load_users_by_ids(user_ids):
+    """
+    一次 IN 查询校验用户ID列表
+    返回 (按请求顺序去重后的用户列表, 第一个不存在的用户ID)，全部存在时第二项为None
+    """
+    normalized_ids = []
+    for user_id in user_ids:
+        try:
+            normalized_ids.append(int(user_id))
+        except (TypeError, ValueError):
+            return [], user_id
+    normalized_ids = list(dict.fromkeys(normalized_ids))
+
+    users_by_id = {user.id: user for user in User.query.filter(User.id.in_(normalized_ids)).all()}
+    for user_id in normalized_ids:
+        if user_id not in users_by_id:
+            return [], user_id
+    return [users_by_id[user_id] for user_id in normalized_ids], None
+
+
 def get_project_list():
-    """获取项目列表（包含用户信息）"""
+    """
+    获取项目列表（包含用户信息）
+    1、按项目ID游标分页：after_id 为上一页最后一个项目ID，limit 为每页条数
+    2、可选按项目名称模糊筛选：name
+    3、本页项目的成员通过一次连表查询取出，整个接口固定两条SQL
+    """
     try:
-        projects = DataProject.query.all()
-        project_list = []
+        after_id = PaginationUtils.get_after_id(request.args)
+        limit = PaginationUtils.get_limit(request.args)
+        name = request.args.get('name', '').strip()
+
+        # 1. 查询本页项目（多取一条用于判断是否还有下一页）
+        query = DataProject.query
+        if name:
+            query = query.filter(DataProject.name.contains(name, autoescape=True))
+        if after_id:
+            query = query.filter(DataProject.id > after_id)
+        projects, has_more = PaginationUtils.split_page(
+            query.order_by(DataProject.id.asc()).limit(limit + 1).all(), limit)
+
+        # 2. 一次连表查询取出本页所有项目关联的用户
+        users_by_project = {}
+        if projects:
+            project_user_rows = db.session.query(ProjectUser.project_id, User).join(
+                User, User.id == ProjectUser.user_id
+            ).filter(
+                ProjectUser.project_id.in_([project.id for project in projects])
+            ).order_by(ProjectUser.id.asc()).all()
+
+            for project_id, user in project_user_rows:
+                users = users_by_project.setdefault(project_id, {})
+                users.setdefault(user.id, user.to_dict())
 
+        project_list = []
         for project in projects:
             project_dict = project.to_dict()
-            # 获取项目关联的用户
-            project_users = ProjectUser.query.filter_by(project_id=project.id).all()
-            user_ids = [pu.user_id for pu in project_users]
-            users = User.query.filter(User.id.in_(user_ids)).all() if user_ids else []
-            project_dict['users'] = [user.to_dict() for user in users]
+            project_dict['users'] = list(users_by_project.get(project.id, {}).values())
             project_list.append(project_dict)
 
         return jsonify({
             'success': True,
             'projects': project_list,
-            'count': len(projects)
+            'count': len(project_list),
+            'pagination': {
+                'limit': limit,
+                'after_id': after_id,
+                'next_after_id': projects[-1].id if has_more else None,
+                'has_more': has_more
+            }
         }), 200
     except Exception as e:
         return jsonify({
@@ -160,31 +228,34 @@ def get_project_list():
 def project_delete(project_id):
     """删除项目功能"""
     try:
-        print(f"=== 收到删除项目请求 ===")
-        print(f"要删除的项目ID: {project_id}")
+        logger.debug("=== 收到删除项目请求 ===")
+        logger.debug("要删除的项目ID: %s", project_id)
 
         # 查找项目是否存在
         project = DataProject.query.get(project_id)
         if not project:
-            print(f"错误: 项目ID {project_id} 不存在")
+            logger.warning("错误: 项目ID %s 不存在", project_id)
             return jsonify({
                 'success': False,
                 'message': '项目不存在'
             }), 404
 
-        print(f"找到项目: {project.name} (ID: {project.id})")
+        logger.debug("找到项目: %s (ID: %s)", project.name, project.id)
 
         # 先删除项目-用户关联关系
         project_users = ProjectUser.query.filter_by(project_id=project_id).all()
         for project_user in project_users:
             db.session.delete(project_user)
-            print(f"删除项目-用户关联: 项目ID={project_id}, 用户ID={project_user.user_id}")
+            logger.debug("删除项目-用户关联: 项目ID=%s, 用户ID=%s", project_id, project_user.user_id)
+
+        # 删除当前工作簿指针
+        ProjectWorkbook.query.filter_by(project_id=project_id).delete()
 
         # 删除项目本身
         db.session.delete(project)
         db.session.commit()
 
-        print(f"项目删除成功: {project.name}")
+        logger.info("项目删除成功: %s", project.name)
         return jsonify({
             'success': True,
             'message': '项目删除成功'
@@ -192,11 +263,7 @@ def project_delete(project_id):
 
     except Exception as e:
         db.session.rollback()
-        print(f"=== 删除项目时发生异常 ===")
-        print(f"错误类型: {type(e).__name__}")
-        print(f"错误信息: {str(e)}")
-        import traceback
-        print(f"堆栈跟踪: {traceback.format_exc()}")
+        logger.exception("删除项目时发生异常")
         return jsonify({
             'success': False,
             'message': f'项目删除失败: {str(e)}'
@@ -225,13 +292,13 @@ def get_users_for_select():
 def get_project_detail(project_id):
     """获取项目详情"""
     try:
-        print(f"=== 获取项目详情请求 ===")
-        print(f"项目ID: {project_id}")
+        logger.debug("=== 获取项目详情请求 ===")
+        logger.debug("项目ID: %s", project_id)
 
         # 查找项目是否存在
         project = DataProject.query.get(project_id)
         if not project:
-            print(f"错误: 项目ID {project_id} 不存在")
+            logger.warning("错误: 项目ID %s 不存在", project_id)
             return jsonify({
                 'success': False,
                 'message': '项目不存在'
@@ -246,17 +313,14 @@ def get_project_detail(project_id):
         project_dict['users'] = [user.to_dict() for user in users]
         project_dict['user_ids'] = user_ids  # 单独返回用户ID列表，便于前端处理
 
-        print(f"项目详情获取成功: {project.name}")
+        logger.debug("项目详情获取成功: %s", project.name)
         return jsonify({
             'success': True,
             'project': project_dict
         }), 200
 
     except Exception as e:
-        print(f"=== 获取项目详情时发生异常 ===")
-        print(f"错误信息: {str(e)}")
-        import traceback
-        print(f"堆栈跟踪: {traceback.format_exc()}")
+        logger.exception("获取项目详情时发生异常")
         return jsonify({
             'success': False,
             'message': f'获取项目详情失败: {str(e)}'
@@ -269,12 +333,12 @@ def project_update(project_id):
         # 获取请求数据
         data = request.get_json()
 
-        print("=== 收到更新项目请求 ===")
-        print(f"项目ID: {project_id}")
-        print(f"请求数据: {data}")
+        logger.debug("=== 收到更新项目请求 ===")
+        logger.debug("项目ID: %s", project_id)
+        logger.debug("请求数据: %s", brief(data))
 
         if not data:
-            print("错误: 请求数据为空")
+            logger.warning("错误: 请求数据为空")
             return jsonify({
                 'success': False,
                 'message': '请求数据不能为空'
@@ -283,7 +347,7 @@ def project_update(project_id):
         # 验证项目是否存在
         project = DataProject.query.get(project_id)
         if not project:
-            print(f"错误: 项目ID {project_id} 不存在")
+            logger.warning("错误: 项目ID %s 不存在", project_id)
             return jsonify({
                 'success': False,
                 'message': '项目不存在'
@@ -291,12 +355,13 @@ def project_update(project_id):
 
         # 验证必填字段
         required_fields = ['name', 'user_ids']
-        print(f"验证必填字段: {required_fields}")
+        logger.debug("验证必填字段: %s", brief(required_fields))
 
         for field in required_fields:
-            print(f"检查字段 '{field}': 存在={field in data}, 值={data.get(field) if field in data else '不存在'}")
+            logger.debug("检查字段 '%s': 存在=%s, 值=%s",
+                         field, field in data, brief(data.get(field, '不存在')))
             if field not in data or not data[field]:
-                print(f"错误: 字段 '{field}' 为空或不存在")
+                logger.warning("错误: 字段 '%s' 为空或不存在", field)
                 return jsonify({
                     'success': False,
                     'message': f'{field}字段不能为空'
@@ -306,7 +371,8 @@ def project_update(project_id):
         description = data.get('description', '').strip()
         user_ids = data['user_ids']  # 用户ID列表
 
-        print(f"处理数据 - 名称: '{name}', 描述: '{description}', 用户ID: {user_ids}")
+        logger.debug("处理数据 - 名称: '%s', 描述: '%s', 用户ID: %s",
+                     brief(name), brief(description), brief(user_ids))
 
         # 检查项目名是否已存在（排除当前项目）
         existing_project = DataProject.query.filter(
@@ -314,24 +380,21 @@ def project_update(project_id):
             DataProject.id != project_id
         ).first()
         if existing_project:
-            print(f"错误: 项目名 '{name}' 已存在")
+            logger.warning("错误: 项目名 '%s' 已存在", brief(name))
             return jsonify({
                 'success': False,
                 'message': '项目名已存在'
             }), 400
 
-        # 验证用户是否存在
-        valid_users = []
-        for user_id in user_ids:
-            user = User.query.get(user_id)
-            if not user:
-                print(f"错误: 用户ID {user_id} 不存在")
-                return jsonify({
-                    'success': False,
-                    'message': f'用户ID {user_id} 不存在'
-                }), 400
-            valid_users.append(user)
-            print(f"用户 {user_id} 验证通过: {user.username}")
+        # 验证用户是否存在（一次 IN 查询）
+        valid_users, missing_user_id = load_users_by_ids(user_ids)
+        if missing_user_id is not None:
+            logger.warning("错误: 用户ID %s 不存在", missing_user_id)
+            return jsonify({
+                'success': False,
+                'message': f'用户ID {missing_user_id} 不存在'
+            }), 400
+        logger.debug("用户验证通过: %s", brief([user.username for user in valid_users]))
 
         # 更新项目信息
         project.name = name
@@ -339,25 +402,22 @@ def project_update(project_id):
 
         # 删除原有的项目-用户关联关系
         ProjectUser.query.filter_by(project_id=project_id).delete()
-        print("删除原有项目-用户关联关系")
+        logger.debug("删除原有项目-用户关联关系")
 
-        # 创建新的项目-用户关联关系
-        for user_id in user_ids:
-            project_user = ProjectUser(
-                user_id=user_id,
-                project_id=project_id
-            )
-            db.session.add(project_user)
-            print(f"创建项目-用户关联: 项目ID={project_id}, 用户ID={user_id}")
+        # 创建新的项目-用户关联关系（批量插入）
+        db.session.bulk_insert_mappings(ProjectUser, [
+            {'user_id': user.id, 'project_id': project_id} for user in valid_users
+        ])
+        logger.debug("创建项目-用户关联: 项目ID=%s, 用户数=%s", project_id, len(valid_users))
 
         db.session.commit()
-        print("数据库提交成功")
+        logger.debug("数据库提交成功")
 
         # 获取更新后的项目信息
         project_dict = project.to_dict()
         project_dict['users'] = [user.to_dict() for user in valid_users]
 
-        print("=== 项目更新完成 ===")
+        logger.debug("=== 项目更新完成 ===")
         return jsonify({
             'success': True,
             'message': '项目更新成功',
@@ -366,11 +426,7 @@ def project_update(project_id):
 
     except Exception as e:
         db.session.rollback()
-        print(f"=== 更新项目时发生异常 ===")
-        print(f"错误类型: {type(e).__name__}")
-        print(f"错误信息: {str(e)}")
-        import traceback
-        print(f"堆栈跟踪: {traceback.format_exc()}")
+        logger.exception("更新项目时发生异常")
         return jsonify({
             'success': False,
             'message': f'项目更新失败: {str(e)}'
@@ -409,13 +465,13 @@ def get_project_stats():
 def get_project_data_views(project_id):
     """获取项目数据视图数据"""
     try:
-        print(f"=== 获取项目数据视图请求 ===")
-        print(f"项目ID: {project_id}")
+        logger.debug("=== 获取项目数据视图请求 ===")
+        logger.debug("项目ID: %s", project_id)
 
         # 验证项目是否存在
         project = DataProject.query.get(project_id)
         if not project:
-            print(f"错误: 项目ID {project_id} 不存在")
+            logger.warning("错误: 项目ID %s 不存在", project_id)
             return jsonify({
                 'success': False,
                 'message': '项目不存在'
@@ -449,7 +505,7 @@ def get_project_data_views(project_id):
             }
         ]
 
-        print(f"数据视图获取成功，共 {len(data_views)} 个视图")
+        logger.debug("数据视图获取成功，共 %s 个视图", len(data_views))
         return jsonify({
             'success': True,
             'project': project.to_dict(),
@@ -458,10 +514,7 @@ def get_project_data_views(project_id):
         }), 200
 
     except Exception as e:
-        print(f"=== 获取数据视图时发生异常 ===")
-        print(f"错误信息: {str(e)}")
-        import traceback
-        print(f"堆栈跟踪: {traceback.format_exc()}")
+        logger.exception("获取数据视图时发生异常")
         return jsonify({
             'success': False,
             'message': f'获取数据视图失败: {str(e)}'
@@ -469,20 +522,21 @@ def get_project_data_views(project_id):
 
 
 # -------------------------表格数据处理方法-------------------------------
+@locked_project(WRITE)
 def save_workbook_data(project_id):
     """保存工作簿数据到文件系统，并转换为Excel，同时存入数据库"""
     try:
-        print(f"=== 收到保存工作簿请求 ===")
-        print(f"项目ID: {project_id}")
+        logger.debug("=== 收到保存工作簿请求 ===")
+        logger.debug("项目ID: %s", project_id)
 
         # 获取请求数据
         data = request.get_json()
-        print(f"请求数据: {data}")
+        logger.debug("请求数据: %s", brief(data))
 
         # 使用工具类验证数据
         is_valid, validation_msg = DataProjectUtils.validate_workbook_data(data)
         if not is_valid:
-            print(f"数据验证失败: {validation_msg}")
+            logger.warning("数据验证失败: %s", validation_msg)
             return jsonify({
                 'success': False,
                 'message': validation_msg
@@ -491,12 +545,12 @@ def save_workbook_data(project_id):
         workbook_name = data['workbook_name']
         sheets_data = data['sheets']
 
-        print(f"处理工作簿: {workbook_name}, 包含 {len(sheets_data)} 个表格")
+        logger.debug("处理工作簿: %s, 包含 %s 个表格", workbook_name, len(sheets_data))
 
         # 验证项目是否存在
         project = DataProject.query.get(project_id)
         if not project:
-            print(f"错误: 项目ID {project_id} 不存在")
+            logger.warning("错误: 项目ID %s 不存在", project_id)
             return jsonify({
                 'success': False,
                 'message': '项目不存在'
@@ -504,7 +558,7 @@ def save_workbook_data(project_id):
 
         # 使用工具类准备项目目录
         project_dir = DataProjectUtils.prepare_project_directory(project_id, config)
-        print(f"项目目录: {project_dir}")
+        logger.debug("项目目录: %s", project_dir)
 
         # 保存工作簿数据为JSON文件
         json_file_path = os.path.join(project_dir, f"{workbook_name}.json")
@@ -519,13 +573,13 @@ def save_workbook_data(project_id):
         with open(json_file_path, 'w', encoding='utf-8') as f:
             json.dump(workbook_structure, f, ensure_ascii=False, indent=2)
 
-        print(f"工作簿JSON数据已保存到: {json_file_path}")
+        logger.debug("工作簿JSON数据已保存到: %s", json_file_path)
 
         # 使用工具类将JSON转换为Excel文件（修改点：不再生成CSV）
         excel_file_path = os.path.join(project_dir, f"{workbook_name}.xlsx")
 
         DataProjectUtils.convert_json_to_excel(json_file_path, excel_file_path)  # 修改点：调用新方法
-        print("JSON数据已成功转换为Excel文件")
+        logger.debug("JSON数据已成功转换为Excel文件")
 
         # 数据库操作部分保持不变
         try:
@@ -537,7 +591,7 @@ def save_workbook_data(project_id):
             db.session.add(sheet_record)
             db.session.flush()  # 获取ID但不提交
 
-            print(f"创建Sheet记录: ID={sheet_record.id}, 名称={workbook_name}")
+            logger.debug("创建Sheet记录: ID=%s, 名称=%s", sheet_record.id, workbook_name)
 
             # 2. 创建SheetProject关联记录
             sheet_project = SheetProject(
@@ -545,36 +599,36 @@ def save_workbook_data(project_id):
                 project_id=project_id
             )
             db.session.add(sheet_project)
-            print(f"创建SheetProject关联: sheet_id={sheet_record.id}, project_id={project_id}")
-
-            # 3. 创建Table记录（基于页签名）
-            table_records = []
-            for sheet_data in sheets_data:
-                table_name = sheet_data.get('name', '未命名表格')
-                table_record = Table(
-                    name=table_name,
-                    sheet_id=sheet_record.id
-                )
-                db.session.add(table_record)
-                table_records.append(table_record)
-                print(f"创建Table记录: 名称={table_name}, sheet_id={sheet_record.id}")
+            logger.debug("创建SheetProject关联: sheet_id=%s, project_id=%s", sheet_record.id, project_id)
+
+            # 当前工作簿指针与Sheet记录在同一事务中更新
+            set_current_workbook(project_id, excel_file_path, sheet_record.id)
+
+            # 3. 创建Table记录（基于页签名，批量插入）
+            table_records = [
+                {'name': sheet_data.get('name', '未命名表格'), 'sheet_id': sheet_record.id}
+                for sheet_data in sheets_data
+            ]
+            db.session.bulk_insert_mappings(Table, table_records)
+            logger.debug("创建Table记录: %s, sheet_id=%s",
+                         brief([record['name'] for record in table_records]), sheet_record.id)
 
             # 提交所有数据库操作
             db.session.commit()
-            print("数据库操作提交成功")
+            logger.debug("数据库操作提交成功")
 
             sheet_id = sheet_record.id
             table_count = len(table_records)
 
         except Exception as db_error:
             db.session.rollback()
-            print(f"数据库操作失败: {str(db_error)}")
+            logger.warning("数据库操作失败: %s", db_error)
             return jsonify({
                 'success': False,
                 'message': f'数据库操作失败: {str(db_error)}'
             }), 500
 
-        print(f"数据已存入数据库: Sheet ID={sheet_id}, 包含 {table_count} 个Table记录")
+        logger.info("数据已存入数据库: Sheet ID=%s, 包含 %s 个Table记录", sheet_id, table_count)
 
         # 使用工具类清除JSON文件
         DataProjectUtils.cleanup_json_file(json_file_path)
@@ -590,24 +644,21 @@ def save_workbook_data(project_id):
 
     except Exception as e:
         db.session.rollback()
-        print(f"=== 保存工作簿时发生异常 ===")
-        print(f"错误类型: {type(e).__name__}")
-        print(f"错误信息: {str(e)}")
-        import traceback
-        print(f"堆栈跟踪: {traceback.format_exc()}")
+        logger.exception("保存工作簿时发生异常")
         return jsonify({
             'success': False,
             'message': f'保存工作簿失败: {str(e)}'
         }), 500
 
 
+@locked_project(READ)
 def load_workbook_data(project_id):
     """从Excel文件加载工作簿数据"""
     try:
         # 验证项目是否存在
         project = DataProject.query.get(project_id)
         if not project:
-            print(f"错误: 项目ID {project_id} 不存在")
+            logger.warning("错误: 项目ID %s 不存在", project_id)
             return jsonify({
                 'success': False,
                 'message': '项目不存在'
@@ -616,24 +667,24 @@ def load_workbook_data(project_id):
         # 查找项目目录
         project_dir = DataProjectUtils.prepare_project_directory(project_id, config)
         if not os.path.exists(project_dir):
-            print(f"项目目录不存在: {project_dir}")
+            logger.warning("项目目录不存在: %s", project_dir)
             return jsonify({
                 'success': True,
                 'message': '项目目录不存在，返回空数据',
                 'workbook_data': None
             }), 200
 
-        # 查找最新的Excel文件（而不是JSON文件）
-        excel_file_path = DataProjectUtils.get_latest_excel_file(project_dir)
+        # 查找当前工作簿（按指针索引查询，不扫描目录）
+        excel_file_path = get_current_workbook_path(project_id, project_dir)
         if not excel_file_path:
-            print("未找到Excel工作簿文件")
+            logger.debug("未找到Excel工作簿文件")
             return jsonify({
                 'success': True,
                 'message': '未找到工作簿文件',
                 'workbook_data': None
             }), 200
 
-        print(f"找到Excel文件: {excel_file_path}")
+        logger.debug("找到Excel文件: %s", excel_file_path)
 
         # 使用工具类将Excel文件转换为JSON数据
         workbook_data = DataProjectUtils.convert_excel_to_json(excel_file_path)
@@ -642,8 +693,8 @@ def load_workbook_data(project_id):
         workbook_data['project_id'] = project_id
         workbook_data['project_name'] = project.name
 
-        print(f"从Excel文件加载工作簿数据成功: {excel_file_path}")
-        print(f"工作簿包含 {len(workbook_data.get('sheets', []))} 个工作表")
+        logger.debug("从Excel文件加载工作簿数据成功: %s", excel_file_path)
+        logger.debug("工作簿包含 %s 个工作表", len(workbook_data.get('sheets', [])))
 
         return jsonify({
             'success': True,
@@ -652,16 +703,82 @@ def load_workbook_data(project_id):
         }), 200
 
     except Exception as e:
-        print(f"=== 加载工作簿时发生异常 ===")
-        print(f"错误信息: {str(e)}")
-        import traceback
-        print(f"堆栈跟踪: {traceback.format_exc()}")
+        logger.exception("加载工作簿时发生异常")
         return jsonify({
             'success': False,
             'message': f'加载工作簿失败: {str(e)}'
         }), 500
 
 
+def _project_workbook_path(project_id):
+    """项目导入的Excel数据文件路径（覆盖写入）"""
+    project_dir = os.path.join(current_app.config['SHEET_DATA_DIR'], str(project_id))
+    os.makedirs(project_dir, exist_ok=True)
+    return os.path.join(project_dir, 'workbook_data.xlsx')
+
+
+def set_current_workbook(project_id, file_path, sheet_id=None):
+    """
+    更新项目的当前工作簿指针（不提交，随调用方的 commit 与工作簿记录一起生效）
+    """
+    pointer = ProjectWorkbook.query.filter_by(project_id=project_id).first()
+    if pointer is None:
+        try:
+            # 并发的首次保存可能同时插入，唯一索引冲突时改为更新对方插入的记录
+            with db.session.begin_nested():
+                db.session.add(ProjectWorkbook(project_id=project_id, sheet_id=sheet_id, file_path=file_path))
+            return
+        except IntegrityError:
+            pointer = ProjectWorkbook.query.filter_by(project_id=project_id).first()
+    pointer.file_path = file_path
+    pointer.sheet_id = sheet_id
+    pointer.updated_at = datetime.utcnow()
+
+
+def get_current_workbook_path(project_id, project_dir=None):
+    """
+    项目当前工作簿路径：按 project_workbooks 指针做一次索引查询
+
+    没有指针（指针表上线前的项目）或文件已被删除时，退回扫描项目目录并回填指针
+    """
+    pointer = ProjectWorkbook.query.filter_by(project_id=project_id).first()
+    if pointer and os.path.exists(pointer.file_path):
+        return pointer.file_path
+
+    project_dir = project_dir or DataProjectUtils.prepare_project_directory(project_id, config)
+    excel_file_path = DataProjectUtils.get_latest_excel_file(project_dir)
+    if excel_file_path:
+        try:
+            set_current_workbook(project_id, excel_file_path)
+            db.session.commit()
+            logger.info("回填项目 %s 的当前工作簿: %s", project_id, excel_file_path)
+        except Exception as e:
+            db.session.rollback()
+            logger.warning("回填当前工作簿失败: %s", e)
+    return excel_file_path
+
+
+def _sheet_lock_key(view_args):
+    """Sheet所属项目（按项目加锁），没有关联记录时按Sheet单独加锁"""
+    sheet_project = SheetProject.query.filter_by(sheet_id=view_args['sheet_id']).first()
+    return sheet_project.project_id if sheet_project else f"sheet_{view_args['sheet_id']}"
+
+
+def _table_lock_key(view_args):
+    """Table所在Sheet所属的项目"""
+    table = Table.query.get(view_args['table_id'])
+    return _sheet_lock_key({'sheet_id': table.sheet_id}) if table else f"table_{view_args['table_id']}"
+
+
+def _import_success_response(target_path):
+    return jsonify({
+        'success': True,
+        'message': '文件导入成功',
+        'filepath': target_path
+    }), 200
+
+
+@locked_project(WRITE)
 def import_excel_file(project_id):
     """简化版Excel文件导入处理"""
     try:
@@ -672,42 +789,165 @@ def import_excel_file(project_id):
         if file.filename == '':
             return jsonify({'success': False, 'message': '没有选择文件'}), 400
 
-        if not file.filename.lower().endswith(('.xlsx', '.xls')):
-            return jsonify({'success': False, 'message': '只支持.xlsx/.xls格式'}), 400
-
-        # 准备项目数据目录
-        project_dir = os.path.join(current_app.config['SHEET_DATA_DIR'], str(project_id))
-        os.makedirs(project_dir, exist_ok=True)
+        is_csv = CsvUtils.is_csv_file(file.filename)
+        if not is_csv and not file.filename.lower().endswith(('.xlsx', '.xls')):
+            return jsonify({'success': False, 'message': '只支持.xlsx/.xls/.csv/.tsv/.txt格式'}), 400
 
         # 覆盖写入数据文件
-        target_path = os.path.join(project_dir, 'workbook_data.xlsx')
-        file.save(target_path)
+        target_path = _project_workbook_path(project_id)
+        if is_csv:
+            # CSV直接解析后写为单页签的工作簿，页签名取自文件名
+            df = CsvUtils.read_csv(stored_upload_path(file))
+            DataProjectUtils.write_frames_to_excel({CsvUtils.table_name(file.filename): df}, target_path)
+        else:
+            save_upload(file, target_path, current_app.config.get('UPLOAD_CHUNK_SIZE', 1024 * 1024))
+        set_current_workbook(project_id, target_path)
+        db.session.commit()
 
-        return jsonify({
-            'success': True,
-            'message': '文件导入成功',
-            'filepath': target_path
-        }), 200
+        return _import_success_response(target_path)
 
     except Exception as e:
+        db.session.rollback()
         return jsonify({
             'success': False,
             'message': f'文件导入失败: {str(e)}'
         }), 500
 
 
+# -----------------------------Excel断点续传导入-----------------------------------------
+# 流程：init 创建上传会话 -> 按偏移量 PUT 分片（请求头 X-Chunk-SHA256 为分片的SHA-256）
+#      -> 断线后 GET 会话状态取得 offset 继续上传 -> complete 拼接文件并按 import_excel_file 的方式导入
+def _chunked_upload_root():
+    return os.path.join(current_app.config['UPLOAD_FOLDER'], 'chunked')
+
+
+def _chunked_upload_error(e):
+    return jsonify({'success': False, 'message': e.message, **e.data}), e.status_code
+
+
+def init_chunked_import(project_id):
+    """创建分片上传会话，返回 upload_id 和分片大小"""
+    try:
+        data = request.get_json(silent=True) or {}
+        filename = str(data.get('filename') or '').strip()
+        total_size = data.get('total_size')
+
+        if not filename:
+            return jsonify({'success': False, 'message': '文件名不能为空'}), 400
+        if not filename.lower().endswith(('.xlsx', '.xls')) and not CsvUtils.is_csv_file(filename):
+            return jsonify({'success': False, 'message': '只支持.xlsx/.xls/.csv/.tsv/.txt格式'}), 400
+        if not isinstance(total_size, int) or total_size <= 0:
+            return jsonify({'success': False, 'message': '文件大小无效'}), 400
+
+        max_size = current_app.config.get('CHUNKED_UPLOAD_MAX_MB', 2048) * 1024 * 1024
+        if total_size > max_size:
+            return jsonify({'success': False, 'message': f'文件超过大小限制（{max_size // 1024 // 1024}MB）'}), 413
+
+        # 分片（单个请求体）不能超过 MAX_CONTENT_LENGTH
+        chunk_size = current_app.config.get('CHUNKED_UPLOAD_CHUNK_SIZE', 8 * 1024 * 1024)
+        max_content_length = current_app.config.get('MAX_CONTENT_LENGTH')
+        if max_content_length:
+            chunk_size = min(chunk_size, max_content_length)
+
+        upload = ChunkedUpload.create(_chunked_upload_root(), project_id, filename, total_size, chunk_size)
+        logger.info("创建分片上传: 项目 %s, %s, %s 字节, upload_id=%s", project_id, filename, total_size,
+                    upload.upload_id)
+        return jsonify({'success': True, 'message': '上传会话创建成功', **upload.status()}), 201
+
+    except Exception as e:
+        logger.exception("创建分片上传时发生异常")
+        return jsonify({'success': False, 'message': f'创建上传会话失败: {str(e)}'}), 500
+
+
+def get_chunked_import(project_id, upload_id):
+    """查询上传会话状态，offset 为续传起点"""
+    try:
+        upload = ChunkedUpload.load(_chunked_upload_root(), upload_id, project_id)
+        return jsonify({'success': True, 'message': '获取上传状态成功', **upload.status()}), 200
+    except ChunkedUploadError as e:
+        return _chunked_upload_error(e)
+
+
+def upload_chunked_import_part(project_id, upload_id):
+    """上传一个分片：查询参数 offset 为分片起始偏移量，请求体为分片的原始字节"""
+    try:
+        upload = ChunkedUpload.load(_chunked_upload_root(), upload_id, project_id)
+        offset = request.args.get('offset', type=int)
+        if offset is None or offset < 0:
+            raise ChunkedUploadError('分片偏移量无效', 400, {'offset': upload.offset})
+
+        new_offset = upload.write_chunk(offset, request.stream, request.headers.get('X-Chunk-SHA256'),
+                                        current_app.config.get('UPLOAD_CHUNK_SIZE', 1024 * 1024))
+        logger.debug("分片上传 %s: %s -> %s / %s", upload_id, offset, new_offset, upload.total_size)
+        return jsonify({
+            'success': True,
+            'message': '分片上传成功',
+            'offset': new_offset,
+            'complete': new_offset == upload.total_size
+        }), 200
+
+    except ChunkedUploadError as e:
+        return _chunked_upload_error(e)
+    except RequestEntityTooLarge:
+        raise
+    except Exception as e:
+        logger.exception("上传分片时发生异常")
+        return jsonify({'success': False, 'message': f'分片上传失败: {str(e)}'}), 500
+
+
+@locked_project(WRITE)
+def complete_chunked_import(project_id, upload_id):
+    """所有分片上传完成后拼接文件（可选 sha256 校验整个文件）并导入为项目数据文件"""
+    try:
+        upload = ChunkedUpload.load(_chunked_upload_root(), upload_id, project_id)
+        data = request.get_json(silent=True) or {}
+        filename = upload.meta['filename']
+        buffer_size = current_app.config.get('UPLOAD_CHUNK_SIZE', 1024 * 1024)
+        target_path = _project_workbook_path(project_id)
+        if CsvUtils.is_csv_file(filename):
+            # CSV拼接到上传目录（请求结束时删除）后解析，与 import_excel_file 一样写为单页签的工作簿
+            csv_path = upload.assemble(os.path.join(_chunked_upload_root(), f'{upload_id}.csv'), data.get('sha256'),
+                                       buffer_size)
+            request.track_upload_path(csv_path)
+            DataProjectUtils.write_frames_to_excel({CsvUtils.table_name(filename): CsvUtils.read_csv(csv_path)},
+                                                   target_path)
+        else:
+            upload.assemble(target_path, data.get('sha256'), buffer_size)
+        set_current_workbook(project_id, target_path)
+        db.session.commit()
+        logger.info("分片上传完成: 项目 %s, upload_id=%s, %s 字节", project_id, upload_id, upload.total_size)
+        return _import_success_response(target_path)
+
+    except ChunkedUploadError as e:
+        return _chunked_upload_error(e)
+    except Exception as e:
+        db.session.rollback()
+        logger.exception("完成分片上传时发生异常")
+        return jsonify({'success': False, 'message': f'文件导入失败: {str(e)}'}), 500
+
+
+def abort_chunked_import(project_id, upload_id):
+    """取消上传并删除已接收的分片"""
+    try:
+        ChunkedUpload.load(_chunked_upload_root(), upload_id, project_id).discard()
+        return jsonify({'success': True, 'message': '上传已取消'}), 200
+    except ChunkedUploadError as e:
+        return _chunked_upload_error(e)
+
+
+@locked_project(WRITE)
 def merge_tables(project_id):
     """数据合并接口 - 完整实现"""
     try:
-        print(f"=== 收到数据合并请求 ===")
-        print(f"项目ID: {project_id}")
+        logger.debug("=== 收到数据合并请求 ===")
+        logger.debug("项目ID: %s", project_id)
 
         # 获取请求数据
         data = request.get_json()
 
         # 验证必要字段
         if not data:
-            print("错误: 请求数据为空")
+            logger.warning("错误: 请求数据为空")
             return jsonify({
                 'success': False,
                 'message': '请求数据不能为空',
@@ -724,9 +964,8 @@ def merge_tables(project_id):
         if not merge_validation_result['success']:
             return jsonify(merge_validation_result), 400
 
-        # 准备项目目录和Excel文件路径
-        project_dir = DataProjectUtils.prepare_project_directory(project_id, config)
-        excel_file_path = DataProjectUtils.get_latest_excel_file(project_dir)
+        # 项目当前工作簿路径
+        excel_file_path = get_current_workbook_path(project_id)
 
         # 第三步：执行数据合并
         merge_result = ExcelExec.join_excels(data, project_id, excel_file_path)
@@ -749,7 +988,7 @@ def merge_tables(project_id):
                     }
                 )
             except Exception as load_error:
-                print(f"加载合并后数据失败: {str(load_error)}")
+                logger.warning("加载合并后数据失败: %s", load_error)
 
                 return jsonify({
                     'success': True,
@@ -766,11 +1005,7 @@ def merge_tables(project_id):
             }), 500
 
     except Exception as e:
-        print(f"=== 数据合并时发生异常 ===")
-        print(f"错误类型: {type(e).__name__}")
-        print(f"错误信息: {str(e)}")
-        import traceback
-        print(f"堆栈跟踪: {traceback.format_exc()}")
+        logger.exception("数据合并时发生异常")
         return jsonify({
             'success': False,
             'message': f'数据合并失败: {str(e)}',
@@ -782,15 +1017,15 @@ def merge_tables(project_id):
 def validate_match_columns(data, project_id):
     """第一步：验证匹配列是否存在于所有源表中"""
     try:
-        print("=== 开始验证匹配列 ===")
+        logger.debug("=== 开始验证匹配列 ===")
 
         target_table_name = data.get('targetTableName')
         source_table_names = data.get('sourceTableNames', [])
         match_columns = data.get('matchColumns', [])
 
-        print(f"目标表: {target_table_name}")
-        print(f"源表: {source_table_names}")
-        print(f"匹配列: {match_columns}")
+        logger.debug("目标表: %s", target_table_name)
+        logger.debug("源表: %s", brief(source_table_names))
+        logger.debug("匹配列: %s", brief(match_columns))
 
         if not match_columns:
             return {
@@ -857,11 +1092,11 @@ def validate_match_columns(data, project_id):
                 'message': '匹配列在部分表中不存在: ' + '; '.join(error_messages)
             }
 
-        print("=== 匹配列验证通过 ===")
+        logger.debug("=== 匹配列验证通过 ===")
         return {'success': True}
 
     except Exception as e:
-        print(f"验证匹配列时发生异常: {str(e)}")
+        logger.exception("验证匹配列时发生异常")
         return {
             'success': False,
             'message': f'验证匹配列失败: {str(e)}'
@@ -871,11 +1106,11 @@ def validate_match_columns(data, project_id):
 def validate_merge_columns(data, project_id):
     """第二步：验证待合并列是否存在"""
     try:
-        print("=== 开始验证待合并列 ===")
+        logger.debug("=== 开始验证待合并列 ===")
 
         merge_columns_config = data.get('mergeColumns', [])
 
-        print(f"待合并列配置: {merge_columns_config}")
+        logger.debug("待合并列配置: %s", brief(merge_columns_config))
 
         if not merge_columns_config:
             return {
@@ -943,11 +1178,11 @@ def validate_merge_columns(data, project_id):
                 'message': '待合入列在部分表中不存在: ' + '; '.join(error_messages)
             }
 
-        print("=== 待合并列验证通过 ===")
+        logger.debug("=== 待合并列验证通过 ===")
         return {'success': True}
 
     except Exception as e:
-        print(f"验证待合并列时发生异常: {str(e)}")
+        logger.exception("验证待合并列时发生异常")
         return {
             'success': False,
             'message': f'验证待合并列失败: {str(e)}'
@@ -960,15 +1195,16 @@ def get_project_workbook_data(project_id):
     try:
         # 这里需要根据实际的数据存储方式实现
         # 假设我们从文件系统或数据库加载工作簿数据
-        project_dir = DataProjectUtils.prepare_project_directory(project_id, config)
-        excel_file_path = DataProjectUtils.get_latest_excel_file(project_dir)
+        # 读取期间持有项目读锁，合并表在写锁内调用时可重入
+        with project_lock(project_id).read():
+            excel_file_path = get_current_workbook_path(project_id)
 
-        if excel_file_path and os.path.exists(excel_file_path):
-            return DataProjectUtils.convert_excel_to_json(excel_file_path)
+            if excel_file_path and os.path.exists(excel_file_path):
+                return DataProjectUtils.convert_excel_to_json(excel_file_path)
 
         return None
     except Exception as e:
-        print(f"获取项目工作簿数据失败: {str(e)}")
+        logger.warning("获取项目工作簿数据失败: %s", e)
         return None
 
 
@@ -987,25 +1223,23 @@ def find_table_by_name(workbook_data, table_name):
 def get_chart_types():
     """获取图表类型列表（用于创建文件夹）"""
     try:
-        print("=== 获取图表类型列表请求 ===")
+        logger.debug("=== 获取图表类型列表请求 ===")
 
-        # 从数据库获取所有图表类型
-        chart_types = ChartType.query.all()
+        # 图表类型来自参考数据缓存，各类型图表数量一次 GROUP BY 统计
+        chart_types = ReferenceCache.get_chart_types()
+        chart_counts = get_chart_counts_by_type()
 
         chart_types_list = []
         for chart_type in chart_types:
-            # 获取该类型对应的图表数量
-            chart_count = ChartData.query.filter_by(chart_type_id=chart_type.id).count()
-
             chart_types_list.append({
                 'id': chart_type.id,
                 'type_name': chart_type.type_name,
                 'description': chart_type.description,
-                'chart_count': chart_count,
+                'chart_count': chart_counts.get(chart_type.id, 0),
                 'create_time': chart_type.created_at.strftime('%Y-%m-%d') if chart_type.created_at else '未知'
             })
 
-        print(f"获取到 {len(chart_types_list)} 个图表类型")
+        logger.debug("获取到 %s 个图表类型", len(chart_types_list))
         return jsonify({
             'success': True,
             'chart_types': chart_types_list,
@@ -1013,10 +1247,7 @@ def get_chart_types():
         }), 200
 
     except Exception as e:
-        print(f"=== 获取图表类型列表时发生异常 ===")
-        print(f"错误信息: {str(e)}")
-        import traceback
-        print(f"堆栈跟踪: {traceback.format_exc()}")
+        logger.exception("获取图表类型列表时发生异常")
         return jsonify({
             'success': False,
             'message': f'获取图表类型列表失败: {str(e)}'
@@ -1026,13 +1257,13 @@ def get_chart_types():
 def get_charts_by_type(chart_type_id):
     """根据图表类型ID获取该类型下的所有图表"""
     try:
-        print(f"=== 获取图表类型详情请求 ===")
-        print(f"图表类型ID: {chart_type_id}")
+        logger.debug("=== 获取图表类型详情请求 ===")
+        logger.debug("图表类型ID: %s", chart_type_id)
 
         # 验证图表类型是否存在
-        chart_type = ChartType.query.get(chart_type_id)
+        chart_type = ReferenceCache.get_chart_type(chart_type_id)
         if not chart_type:
-            print(f"错误: 图表类型ID {chart_type_id} 不存在")
+            logger.warning("错误: 图表类型ID %s 不存在", chart_type_id)
             return jsonify({
                 'success': False,
                 'message': '图表类型不存在'
@@ -1051,7 +1282,7 @@ def get_charts_by_type(chart_type_id):
                 'create_time': chart.created_at.strftime('%Y-%m-%d %H:%M') if chart.created_at else '未知'
             })
 
-        print(f"获取到图表类型 '{chart_type.type_name}' 下的 {len(charts_list)} 个图表")
+        logger.debug("获取到图表类型 '%s' 下的 %s 个图表", chart_type.type_name, len(charts_list))
         return jsonify({
             'success': True,
             'chart_type': {
@@ -1064,10 +1295,7 @@ def get_charts_by_type(chart_type_id):
         }), 200
 
     except Exception as e:
-        print(f"=== 获取图表类型详情时发生异常 ===")
-        print(f"错误信息: {str(e)}")
-        import traceback
-        print(f"堆栈跟踪: {traceback.format_exc()}")
+        logger.exception("获取图表类型详情时发生异常")
         return jsonify({
             'success': False,
             'message': f'获取图表类型详情失败: {str(e)}'
@@ -1077,7 +1305,7 @@ def get_charts_by_type(chart_type_id):
 def create_chart():
     """创建新图表"""
     try:
-        print("=== 收到创建图表请求 ===")
+        logger.debug("=== 收到创建图表请求 ===")
 
         # 检查是否包含文件上传
         if 'chart_file' in request.files:
@@ -1086,14 +1314,14 @@ def create_chart():
             if file.filename != '':
                 # 文件保存逻辑（这里简化处理）
                 filename = secure_filename(file.filename)
-                print(f"收到文件: {filename}")
+                logger.debug("收到文件: %s", filename)
 
         # 获取表单数据
         chart_name = request.form.get('chart_name', '').strip()
         chart_type_id = request.form.get('chart_type_id', type=int)
         project_id = request.form.get('project_id', type=int)
 
-        print(f"图表数据 - 名称: '{chart_name}', 类型ID: {chart_type_id}, 项目ID: {project_id}")
+        logger.debug("图表数据 - 名称: '%s', 类型ID: %s, 项目ID: %s", chart_name, chart_type_id, project_id)
 
         if not chart_name:
             return jsonify({
@@ -1108,7 +1336,7 @@ def create_chart():
             }), 400
 
         # 验证图表类型是否存在
-        chart_type = ChartType.query.get(chart_type_id)
+        chart_type = ReferenceCache.get_chart_type(chart_type_id)
         if not chart_type:
             return jsonify({
                 'success': False,
@@ -1132,8 +1360,9 @@ def create_chart():
         )
         db.session.add(chart_project)
         db.session.commit()
+        chart_count_cache.clear()
 
-        print(f"图表创建成功: ID={new_chart.id}, 名称={chart_name}")
+        logger.info("图表创建成功: ID=%s, 名称=%s", new_chart.id, chart_name)
 
         return jsonify({
             'success': True,
@@ -1148,7 +1377,7 @@ def create_chart():
 
     except Exception as e:
         db.session.rollback()
-        print(f"创建图表时发生异常: {str(e)}")
+        logger.exception("创建图表时发生异常")
         return jsonify({
             'success': False,
             'message': f'创建图表失败: {str(e)}'
@@ -1156,46 +1385,61 @@ def create_chart():
 
 
 def get_charts_by_type_with_pagination(chart_type_id):
-    """根据图表类型ID获取该类型下的图表（带分页）"""
+    """
+    根据图表类型ID获取该类型下的图表（游标分页）
+    1、cursor 为上一页返回的 next_cursor，limit（兼容 per_page）为每页条数
+    2、可选 project_id 只查看某个项目下的图表
+    3、with_count=1 时返回缓存的总数，否则不做 count 查询
+    """
     try:
-        print(f"=== 获取图表分页数据请求 ===")
-        print(f"图表类型ID: {chart_type_id}")
+        logger.debug("=== 获取图表分页数据请求 ===")
+        logger.debug("图表类型ID: %s", chart_type_id)
 
         # 获取分页参数
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 10, type=int)
+        cursor = request.args.get('cursor', '')
+        limit = PaginationUtils.get_limit(request.args, default=request.args.get('per_page', 10, type=int))
+        project_id = request.args.get('project_id', type=int)
+        with_count = request.args.get('with_count', 0, type=int) == 1
+        if not PaginationUtils.is_valid_cursor(cursor):
+            return jsonify({
+                'success': False,
+                'message': '分页游标无效'
+            }), 400
 
         # 验证图表类型是否存在
-        chart_type = ChartType.query.get(chart_type_id)
+        chart_type = ReferenceCache.get_chart_type(chart_type_id)
         if not chart_type:
-            print(f"错误: 图表类型ID {chart_type_id} 不存在")
+            logger.warning("错误: 图表类型ID %s 不存在", chart_type_id)
             return jsonify({
                 'success': False,
                 'message': '图表类型不存在'
             }), 404
 
-        # 分页查询图表数据
-        charts_query = ChartData.query.filter_by(chart_type_id=chart_type_id)
-        total_charts = charts_query.count()
-
-        # 分页处理
-        charts_pagination = charts_query.paginate(
-            page=page,
-            per_page=per_page,
-            error_out=False
-        )
+        # 一次连表查询获取本页图表
+        charts_page, next_cursor = query_chart_page(
+            project_id=project_id, chart_type_id=chart_type_id, cursor=cursor, limit=limit)
 
         # 格式化图表数据
         charts_list = []
-        for chart in charts_pagination.items:
+        for chart, type_name, chart_project_id in charts_page:
             charts_list.append({
                 'id': chart.id,
                 'name': chart.chart_name,
                 'path': chart.file_path or '未设置路径',
+                'project_id': chart_project_id,
                 'create_time': chart.created_at.strftime('%Y-%m-%d %H:%M') if chart.created_at else '未知'
             })
 
-        print(f"获取到图表类型 '{chart_type.type_name}' 下的图表数据，第{page}页，共{charts_pagination.pages}页")
+        pagination = {
+            'limit': limit,
+            'cursor': cursor or None,
+            'next_cursor': next_cursor,
+            'has_next': next_cursor is not None
+        }
+        if with_count:
+            pagination['total_charts'] = get_chart_count(project_id=project_id, chart_type_id=chart_type_id)
+
+        logger.debug("获取到图表类型 '%s' 下的 %s 个图表", chart_type.type_name, len(charts_list))
 
         return jsonify({
             'success': True,
@@ -1205,23 +1449,11 @@ def get_charts_by_type_with_pagination(chart_type_id):
                 'description': chart_type.description
             },
             'charts': charts_list,
-            'pagination': {
-                'current_page': page,
-                'per_page': per_page,
-                'total_pages': charts_pagination.pages,
-                'total_charts': total_charts,
-                'has_prev': charts_pagination.has_prev,
-                'has_next': charts_pagination.has_next,
-                'prev_num': charts_pagination.prev_num,
-                'next_num': charts_pagination.next_num
-            }
+            'pagination': pagination
         }), 200
 
     except Exception as e:
-        print(f"=== 获取图表分页数据时发生异常 ===")
-        print(f"错误信息: {str(e)}")
-        import traceback
-        print(f"堆栈跟踪: {traceback.format_exc()}")
+        logger.exception("获取图表分页数据时发生异常")
         return jsonify({
             'success': False,
             'message': f'获取图表数据失败: {str(e)}'
@@ -1231,8 +1463,8 @@ def get_charts_by_type_with_pagination(chart_type_id):
 def get_project_sheets(project_id):
     """获取项目下的所有Sheet列表"""
     try:
-        print(f"=== 获取项目Sheet列表请求 ===")
-        print(f"项目ID: {project_id}")
+        logger.debug("=== 获取项目Sheet列表请求 ===")
+        logger.debug("项目ID: %s", project_id)
 
         # 验证项目是否存在
         project = DataProject.query.get(project_id)
@@ -1242,9 +1474,9 @@ def get_project_sheets(project_id):
                 'message': '项目不存在'
             }), 404
 
-        # 获取项目关联的Sheet
+        # 获取项目关联的最新Sheet（命中 (project_id, created_at) 索引）
         sheet_project = SheetProject.query.filter_by(project_id=project_id).order_by(
-            SheetProject.sheet_id.desc()).first()
+            SheetProject.created_at.desc(), SheetProject.id.desc()).first()
         sheet = Sheet.query.filter(Sheet.id == sheet_project.sheet_id).first()
         # 获取文件下的sheets
         sheets = ExcelExec.get_table_sheets(sheet.file_path)
@@ -1262,21 +1494,19 @@ def get_project_sheets(project_id):
         )
 
     except Exception as e:
-        print(f"=== 获取项目Sheet列表时发生异常 ===")
-        print(f"错误信息: {str(e)}")
-        import traceback
-        print(f"堆栈跟踪: {traceback.format_exc()}")
+        logger.exception("获取项目Sheet列表时发生异常")
         return jsonify({
             'success': False,
             'message': f'获取Sheet列表失败: {str(e)}'
         }), 500
 
 
+@locked_project(READ, key=_sheet_lock_key)
 def get_sheet_headers(sheet_id):
     """获取Sheet的表头信息"""
     try:
-        print(f"=== 获取Sheet表头请求 ===")
-        print(f"Sheet ID: {sheet_id}")
+        logger.debug("=== 获取Sheet表头请求 ===")
+        logger.debug("Sheet ID: %s", sheet_id)
 
         # 验证Sheet是否存在
         sheet = Sheet.query.get(sheet_id)
@@ -1293,30 +1523,31 @@ def get_sheet_headers(sheet_id):
                 'message': 'Sheet文件不存在'
             }), 404
 
-        # 读取Excel文件
-        excel_file = pd.ExcelFile(sheet.file_path)
-
         headers_list = []
 
-        # 读取每个工作表的表头
-        for sheet_name in excel_file.sheet_names:
-            try:
-                # 读取前几行获取表头
-                df = pd.read_excel(sheet.file_path, sheet_name=sheet_name, nrows=5)
-
-                for col_name in df.columns:
-                    headers_list.append({
-                        'sheet_name': sheet_name,
-                        'name': str(col_name),
-                        'type': str(df[col_name].dtype),
-                        'sample_data': df[col_name].dropna().head(3).tolist() if not df[col_name].dropna().empty else []
-                    })
+        # 读取Excel文件（只读取每个工作表的前几行，工作簿只打开一次）
+        with ExcelReader.open(sheet.file_path, nrows=5) as excel_file:
+            # 读取每个工作表的表头
+            for sheet_name in excel_file.sheet_names:
+                try:
+                    # 读取前几行获取表头
+                    with stage_timer('excel_read'):
+                        df = excel_file.parse(sheet_name, nrows=5)
+
+                    for col_name in df.columns:
+                        headers_list.append({
+                            'sheet_name': sheet_name,
+                            'name': str(col_name),
+                            'type': str(df[col_name].dtype),
+                            'sample_data': df[col_name].dropna().head(3).tolist()
+                            if not df[col_name].dropna().empty else []
+                        })
 
-            except Exception as e:
-                print(f"读取工作表 {sheet_name} 时出错: {str(e)}")
-                continue
+                except Exception as e:
+                    logger.warning("读取工作表 %s 时出错: %s", sheet_name, e)
+                    continue
 
-        print(f"从Sheet {sheet.name} 中读取到 {len(headers_list)} 个表头字段")
+        logger.debug("从Sheet %s 中读取到 %s 个表头字段", sheet.name, len(headers_list))
         return jsonify({
             'success': True,
             'headers': headers_list,
@@ -1325,10 +1556,7 @@ def get_sheet_headers(sheet_id):
         }), 200
 
     except Exception as e:
-        print(f"=== 获取Sheet表头时发生异常 ===")
-        print(f"错误信息: {str(e)}")
-        import traceback
-        print(f"堆栈跟踪: {traceback.format_exc()}")
+        logger.exception("获取Sheet表头时发生异常")
         return jsonify({
             'success': False,
             'message': f'获取表头信息失败: {str(e)}'
@@ -1338,11 +1566,11 @@ def get_sheet_headers(sheet_id):
 def generate_chart():
     """根据配置生成图表（修复sheet_id和table_id逻辑）"""
     try:
-        print("=== 收到前端图表数据 ===")
+        logger.debug("=== 收到前端图表数据 ===")
 
         # 获取请求数据
         data = request.get_json()
-        print("获取到的数据为:", data)
+        logger.debug("获取到的数据为: %s", brief(data))
         # {'project_id': 4, 'chart_type_id': 1, 'sheet_id': 12,
         # 'table_id': 29, 'x_axis': '时间', 'y_axis': ['天气数据_综合温度'],
         # 'category': '彩椒种类', 'chart_name': '彩椒生长数据_图表_1766686594537'}
@@ -1377,22 +1605,25 @@ def generate_chart():
         category = data.get('category')
         chart_name = data['chart_name']
 
-        print(f"开始处理图表生成: 项目ID={project_id}, 图表类型ID={chart_type_id}")
-        print(f"Sheet ID: {sheet_id}, Table ID: {table_id}")
+        logger.debug("开始处理图表生成: 项目ID=%s, 图表类型ID=%s", project_id, chart_type_id)
+        logger.debug("Sheet ID: %s, Table ID: %s", sheet_id, table_id)
 
         project = DataProject.query.get(project_id)
-        chart_type = ChartType.query.get(chart_type_id)
+        chart_type = ReferenceCache.get_chart_type(chart_type_id)
         sheet = Sheet.query.get(sheet_id)
         table = Table.query.get(table_id)
         # 2. 读取Excel数据 - 使用table.name作为工作表名称
-        print(f"读取Excel文件: {sheet.file_path}, 工作表: {table.name}")
+        logger.debug("读取Excel文件: %s, 工作表: %s", sheet.file_path, table.name)
         try:
-            # 读取指定工作表
-            df = pd.read_excel(sheet.file_path, sheet_name=table.name)
-            print(f"成功读取数据，形状: {df.shape}")
-            print(f"数据列: {list(df.columns)}")
+            # 读取指定工作表：只在读取期间持有项目读锁，生成图表不占用锁
+            with project_lock(_sheet_lock_key({'sheet_id': sheet_id})).read(), stage_timer('excel_read'):
+                df = ExcelReader.read(sheet.file_path, sheet_name=table.name)
+            logger.debug("成功读取数据，形状: %s", df.shape)
+            logger.debug("数据列: %s", brief(list(df.columns)))
+        except ProjectLockTimeout as e:
+            return RequestsUtils.make_response(status_code=503, msg=str(e), success=False)
         except Exception as e:
-            print(f"读取Excel文件失败: {str(e)}")
+            logger.warning("读取Excel文件失败: %s", e)
             return RequestsUtils.make_response(
                 status_code=500,
                 msg=f'读取Excel文件失败: {str(e)}',
@@ -1403,23 +1634,23 @@ def generate_chart():
         data['data'] = df
         # 4. 生成图表（这里需要根据您的ChartUtils实现来调整）
         try:
-            plt = ChartUtils.gen_chart(
+            fig = ChartUtils.gen_chart(
                 chart_type_id,
                 params=data
             )
             # 生成图表文件路径
             chart_file_path = ChartUtils.save_chart(
-                plt=plt,
+                fig=fig,
                 project_id=project_id,
                 chart_type_name=chart_type.type_name,
                 chart_name=chart_name,
                 chart_id=0  # 临时ID，后面会用数据库ID
             )
 
-            print(f"图表生成成功: {chart_file_path}")
+            logger.info("图表生成成功: %s", chart_file_path)
 
         except Exception as e:
-            print(f"生成图表失败: {str(e)}")
+            logger.warning("生成图表失败: %s", e)
             return RequestsUtils.make_response(
                 status_code=500,
                 msg=f'生成图表失败: {str(e)}',
@@ -1448,6 +1679,7 @@ def generate_chart():
 
             # 提交所有数据库操作
             db.session.commit()
+            chart_count_cache.clear()
             return RequestsUtils.make_response(
                 status_code=200,
                 msg=f'图表生成成功',
@@ -1465,7 +1697,7 @@ def generate_chart():
 
         except Exception as e:
             db.session.rollback()
-            print(f"数据库操作失败: {str(e)}")
+            logger.warning("数据库操作失败: %s", e)
             return jsonify({
                 'success': False,
                 'message': f'数据库操作失败: {str(e)}'
@@ -1473,10 +1705,7 @@ def generate_chart():
 
     except Exception as e:
         db.session.rollback()
-        print(f"=== 生成图表时发生异常 ===")
-        print(f"错误信息: {str(e)}")
-        import traceback
-        print(f"堆栈跟踪: {traceback.format_exc()}")
+        logger.exception("生成图表时发生异常")
         return jsonify({
             'success': False,
             'message': f'生成图表失败: {str(e)}'
@@ -1486,8 +1715,8 @@ def generate_chart():
 def preview_chart(chart_id):
     """预览图表 - 返回图表图片流"""
     try:
-        print(f"=== 图表预览请求 ===")
-        print(f"图表ID: {chart_id}")
+        logger.debug("=== 图表预览请求 ===")
+        logger.debug("图表ID: %s", chart_id)
 
         # 验证图表是否存在
         chart = ChartData.query.get(chart_id)
@@ -1504,7 +1733,7 @@ def preview_chart(chart_id):
                 'message': '图表文件不存在'
             }), 404
 
-        print(f"找到图表文件: {chart.file_path}")
+        logger.debug("找到图表文件: %s", chart.file_path)
 
         # 返回图片文件流
         return send_file(
@@ -1515,10 +1744,7 @@ def preview_chart(chart_id):
         )
 
     except Exception as e:
-        print(f"=== 图表预览时发生异常 ===")
-        print(f"错误信息: {str(e)}")
-        import traceback
-        print(f"堆栈跟踪: {traceback.format_exc()}")
+        logger.exception("图表预览时发生异常")
         return jsonify({
             'success': False,
             'message': f'图表预览失败: {str(e)}'
@@ -1533,55 +1759,111 @@ def get_chart_file_path(chart_id):
             return None
         return chart.file_path
     except Exception as e:
-        print(f"获取图表文件路径失败: {str(e)}")
+        logger.warning("获取图表文件路径失败: %s", e)
         return None
 
 
 # -----------------------------图方法-----------------------------------------
+# 辅助函数
+def query_chart_page(project_id=None, chart_type_id=None, cursor='', limit=PaginationUtils.DEFAULT_LIMIT):
+    """
+    通过 chart_projects / chart_data / chart_types 一次连表查询获取一页图表
+    按 (created_at, id) 倒序做游标分页，返回 ([(ChartData, 类型名, 项目ID), ...], 下一页游标)
+    """
+    if project_id:
+        query = db.session.query(ChartData, ChartType.type_name, ChartProject.project_id).join(
+            ChartProject, ChartProject.chart_id == ChartData.id
+        ).filter(ChartProject.project_id == project_id)
+    else:
+        # 不按项目筛选时不连接 chart_projects：关联多个项目的图表只占一行，项目ID取关联的最小项目ID
+        first_project_id = db.session.query(func.min(ChartProject.project_id)).filter(
+            ChartProject.chart_id == ChartData.id).correlate(ChartData).scalar_subquery()
+        query = db.session.query(ChartData, ChartType.type_name, first_project_id)
+
+    query = query.outerjoin(ChartType, ChartType.id == ChartData.chart_type_id)
+
+    if chart_type_id:
+        query = query.filter(ChartData.chart_type_id == chart_type_id)
+
+    # 游标条件：排在上一页最后一条记录之后
+    query = PaginationUtils.filter_after_cursor(query, ChartData.created_at, ChartData.id, cursor)
+
+    rows = query.order_by(ChartData.created_at.desc(), ChartData.id.desc()).limit(limit + 1).all()
+    rows, has_more = PaginationUtils.split_page(rows, limit)
+
+    next_cursor = None
+    if has_more:
+        last_chart = rows[-1][0]
+        next_cursor = PaginationUtils.encode_cursor(last_chart.created_at, last_chart.id)
+    return rows, next_cursor
+
+
+def get_chart_count(project_id=None, chart_type_id=None):
+    """获取图表总数（结果按筛选条件缓存，新增/删除图表时清空）"""
+
+    def count_charts():
+        query = db.session.query(func.count(ChartData.id))
+        if project_id:
+            query = query.join(ChartProject, ChartProject.chart_id == ChartData.id).filter(
+                ChartProject.project_id == project_id)
+        if chart_type_id:
+            query = query.filter(ChartData.chart_type_id == chart_type_id)
+        return query.scalar() or 0
+
+    return chart_count_cache.get_or_set((project_id, chart_type_id), count_charts)
+
+
+def get_chart_counts_by_type():
+    """一次 GROUP BY 统计各图表类型下的图表数量，返回 {类型ID: 数量}（与总数共用缓存）"""
+
+    def count_by_type():
+        rows = db.session.query(ChartData.chart_type_id, func.count(ChartData.id)).group_by(
+            ChartData.chart_type_id).all()
+        return dict(rows)
+
+    return chart_count_cache.get_or_set('by_type', count_by_type)
+
+
 # 通过项目ID和图的typeid获取图的列表
 def get_chart_list_by_project_id_or_type_id(project_id):
     """
     1、从请求中获取到项目id和图的typeid
     2、先筛选项目id
     3、如果存在chart_type_id，则筛选chart_type_id
-    4、使用RequestsUtils.make_response打包返回值
+    4、按 (创建时间, ID) 游标分页：cursor、limit，with_count=1 时返回缓存的总数
+    5、使用RequestsUtils.make_response打包返回值
     """
     try:
-        print(f"=== 获取图表列表请求 ===")
-        print(f"项目ID: {project_id}")
+        logger.debug("=== 获取图表列表请求 ===")
+        logger.debug("项目ID: %s", project_id)
 
-        # 1. 从请求参数中获取chart_type_id（可选）
+        # 1. 从请求参数中获取chart_type_id（可选）和分页参数
         chart_type_id = request.args.get('chart_type_id', type=int)
-        print(f"请求参数 - chart_type_id: {chart_type_id}")
+        cursor = request.args.get('cursor', '')
+        limit = PaginationUtils.get_limit(request.args)
+        with_count = request.args.get('with_count', 0, type=int) == 1
+        logger.debug("请求参数 - chart_type_id: %s", chart_type_id)
+        if not PaginationUtils.is_valid_cursor(cursor):
+            return RequestsUtils.make_response(
+                status_code=400,
+                msg='分页游标无效',
+                success=False
+            )
 
         # 2. 验证项目是否存在
         project = DataProject.query.get(project_id)
         if not project:
-            print(f"错误: 项目ID {project_id} 不存在")
+            logger.warning("错误: 项目ID %s 不存在", project_id)
             return RequestsUtils.make_response(
                 status_code=404,
                 msg='项目不存在',
                 success=False
             )
 
-        # 3. 构建查询 - 先通过项目ID筛选
-        chart_projects = ChartProject.query.filter_by(project_id=project_id).all()
-        chart_ids = [cp.chart_id for cp in chart_projects]
-
-        if not chart_ids:
-            print(f"项目 {project_id} 下没有图表")
-            return RequestsUtils.make_response(
-                status_code=200,
-                msg='项目下暂无图表',
-                data=[],
-                success=True
-            )
-
-        # 4. 根据chart_type_id进一步筛选
+        # 3. 验证图表类型是否存在
         if chart_type_id:
-            print(f"按图表类型ID {chart_type_id} 进行筛选")
-            # 验证图表类型是否存在
-            chart_type = ChartType.query.get(chart_type_id)
+            logger.debug("按图表类型ID %s 进行筛选", chart_type_id)
+            chart_type = ReferenceCache.get_chart_type(chart_type_id)
             if not chart_type:
                 return RequestsUtils.make_response(
                     status_code=404,
@@ -1589,47 +1871,46 @@ def get_chart_list_by_project_id_or_type_id(project_id):
                     success=False
                 )
 
-            # 查询指定类型下的图表
-            charts = ChartData.query.filter(
-                ChartData.id.in_(chart_ids),
-                ChartData.chart_type_id == chart_type_id
-            ).all()
-        else:
-            # 查询项目下的所有图表
-            charts = ChartData.query.filter(ChartData.id.in_(chart_ids)).all()
+        # 4. 一次连表查询获取本页图表及其类型名
+        charts_page, next_cursor = query_chart_page(
+            project_id=project_id, chart_type_id=chart_type_id, cursor=cursor, limit=limit)
 
         # 5. 构建返回数据
         charts_list = []
-        for chart in charts:
-            # 获取图表类型信息
-            chart_type = ChartType.query.get(chart.chart_type_id)
-
+        for chart, type_name, _ in charts_page:
             chart_data = {
                 'id': chart.id,
                 'name': chart.chart_name,
                 'type_id': chart.chart_type_id,
-                'type_name': chart_type.type_name if chart_type else '未知类型',
+                'type_name': type_name or '未知类型',
                 'file_path': chart.file_path,
                 'create_time': chart.created_at.strftime('%Y-%m-%d %H:%M') if chart.created_at else '未知',
                 'project_id': project_id
             }
             charts_list.append(chart_data)
 
-        print(f"获取到 {len(charts_list)} 个图表")
+        pagination = {
+            'limit': limit,
+            'cursor': cursor or None,
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None
+        }
+        if with_count:
+            pagination['total'] = get_chart_count(project_id=project_id, chart_type_id=chart_type_id)
+
+        logger.debug("获取到 %s 个图表", len(charts_list))
 
         # 6. 使用RequestsUtils.make_response打包返回值
         return RequestsUtils.make_response(
             status_code=200,
-            msg='获取图表列表成功',
+            msg='获取图表列表成功' if charts_list or cursor else '项目下暂无图表',
             data=charts_list,
             success=True,
+            pagination=pagination
         )
 
     except Exception as e:
-        print(f"=== 获取图表列表时发生异常 ===")
-        print(f"错误信息: {str(e)}")
-        import traceback
-        print(f"堆栈跟踪: {traceback.format_exc()}")
+        logger.exception("获取图表列表时发生异常")
 
         return RequestsUtils.make_response(
             status_code=500,
@@ -1648,15 +1929,15 @@ def update_chart(chart_id):
     4、使用RequestsUtils.make_response打包返回值
     """
     try:
-        print(f"=== 更新图表信息请求 ===")
-        print(f"图表ID: {chart_id}")
+        logger.debug("=== 更新图表信息请求 ===")
+        logger.debug("图表ID: %s", chart_id)
 
         # 1. 获取请求数据
         data = request.get_json()
-        print(f"请求数据: {data}")
+        logger.debug("请求数据: %s", brief(data))
 
         if not data:
-            print("错误: 请求数据为空")
+            logger.warning("错误: 请求数据为空")
             return RequestsUtils.make_response(
                 status_code=400,
                 msg='请求数据不能为空',
@@ -1666,7 +1947,7 @@ def update_chart(chart_id):
         # 2. 验证必填字段
         chart_name = data.get('chart_name', '').strip()
         if not chart_name:
-            print("错误: 图表名称不能为空")
+            logger.warning("错误: 图表名称不能为空")
             return RequestsUtils.make_response(
                 status_code=400,
                 msg='图表名称不能为空',
@@ -1676,7 +1957,7 @@ def update_chart(chart_id):
         # 3. 验证图表是否存在
         chart = ChartData.query.get(chart_id)
         if not chart:
-            print(f"错误: 图表ID {chart_id} 不存在")
+            logger.warning("错误: 图表ID %s 不存在", chart_id)
             return RequestsUtils.make_response(
                 status_code=404,
                 msg='图表不存在',
@@ -1689,7 +1970,7 @@ def update_chart(chart_id):
             ChartData.id != chart_id
         ).first()
         if existing_chart:
-            print(f"错误: 图表名称 '{chart_name}' 已存在")
+            logger.warning("错误: 图表名称 '%s' 已存在", chart_name)
             return RequestsUtils.make_response(
                 status_code=400,
                 msg='图表名称已存在',
@@ -1706,10 +1987,10 @@ def update_chart(chart_id):
         # 7. 提交到数据库
         db.session.commit()
 
-        print(f"图表更新成功: ID={chart_id}, 旧名称='{old_name}' -> 新名称='{chart_name}'")
+        logger.info("图表更新成功: ID=%s, 旧名称='%s' -> 新名称='%s'", chart_id, old_name, chart_name)
 
         # 8. 获取更新后的图表信息
-        chart_type = ChartType.query.get(chart.chart_type_id)
+        chart_type = ReferenceCache.get_chart_type(chart.chart_type_id)
 
         updated_chart_data = {
             'id': chart.id,
@@ -1731,11 +2012,7 @@ def update_chart(chart_id):
 
     except Exception as e:
         db.session.rollback()
-        print(f"=== 更新图表信息时发生异常 ===")
-        print(f"错误类型: {type(e).__name__}")
-        print(f"错误信息: {str(e)}")
-        import traceback
-        print(f"堆栈跟踪: {traceback.format_exc()}")
+        logger.exception("更新图表信息时发生异常")
 
         return RequestsUtils.make_response(
             status_code=500,
@@ -1753,13 +2030,13 @@ def get_chart_by_id(chart_id):
     3、使用RequestsUtils.make_response打包返回值
     """
     try:
-        print(f"=== 获取图表详情请求 ===")
-        print(f"图表ID: {chart_id}")
+        logger.debug("=== 获取图表详情请求 ===")
+        logger.debug("图表ID: %s", chart_id)
 
         # 1. 验证图表是否存在
         chart = ChartData.query.get(chart_id)
         if not chart:
-            print(f"错误: 图表ID {chart_id} 不存在")
+            logger.warning("错误: 图表ID %s 不存在", chart_id)
             return RequestsUtils.make_response(
                 status_code=404,
                 msg='图表不存在',
@@ -1767,7 +2044,7 @@ def get_chart_by_id(chart_id):
             )
 
         # 2. 获取图表类型信息
-        chart_type = ChartType.query.get(chart.chart_type_id)
+        chart_type = ReferenceCache.get_chart_type(chart.chart_type_id)
 
         # 3. 获取图表关联的项目信息
         chart_project = ChartProject.query.filter_by(chart_id=chart_id).first()
@@ -1793,7 +2070,7 @@ def get_chart_by_id(chart_id):
             'project_info': project_info
         }
 
-        print(f"获取图表详情成功: {chart.chart_name}")
+        logger.debug("获取图表详情成功: %s", chart.chart_name)
 
         # 5. 使用RequestsUtils.make_response打包返回值
         return RequestsUtils.make_response(
@@ -1804,11 +2081,7 @@ def get_chart_by_id(chart_id):
         )
 
     except Exception as e:
-        print(f"=== 获取图表详情时发生异常 ===")
-        print(f"错误类型: {type(e).__name__}")
-        print(f"错误信息: {str(e)}")
-        import traceback
-        print(f"堆栈跟踪: {traceback.format_exc()}")
+        logger.exception("获取图表详情时发生异常")
 
         return RequestsUtils.make_response(
             status_code=500,
@@ -1827,13 +2100,13 @@ def get_img_pre_view(chart_id):
     4、使用RequestsUtils.make_response打包返回值
     """
     try:
-        print(f"=== 获取图表预览数据请求 ===")
-        print(f"图表ID: {chart_id}")
+        logger.debug("=== 获取图表预览数据请求 ===")
+        logger.debug("图表ID: %s", chart_id)
 
         # 1. 验证图表是否存在
         chart = ChartData.query.get(chart_id)
         if not chart:
-            print(f"错误: 图表ID {chart_id} 不存在")
+            logger.warning("错误: 图表ID %s 不存在", chart_id)
             return RequestsUtils.make_response(
                 status_code=404,
                 msg='图表不存在',
@@ -1842,14 +2115,14 @@ def get_img_pre_view(chart_id):
 
         # 2. 检查图表文件是否存在
         if not chart.file_path or not os.path.exists(chart.file_path):
-            print(f"错误: 图表文件不存在 - {chart.file_path}")
+            logger.warning("错误: 图表文件不存在 - %s", chart.file_path)
             return RequestsUtils.make_response(
                 status_code=404,
                 msg='图表文件不存在',
                 success=False
             )
 
-        print(f"找到图表文件: {chart.file_path}")
+        logger.debug("找到图表文件: %s", chart.file_path)
 
         # 3. 读取图片文件并转换为Base64编码
         try:
@@ -1872,10 +2145,10 @@ def get_img_pre_view(chart_id):
             # 构建完整的数据URL
             data_url = f"data:{mime_type};base64,{base64_encoded}"
 
-            print(f"图片转换成功，大小: {len(image_data)} 字节，MIME类型: {mime_type}")
+            logger.debug("图片转换成功，大小: %s 字节，MIME类型: %s", len(image_data), mime_type)
 
         except Exception as e:
-            print(f"图片文件读取失败: {str(e)}")
+            logger.warning("图片文件读取失败: %s", e)
             return RequestsUtils.make_response(
                 status_code=500,
                 msg=f'图片文件读取失败: {str(e)}',
@@ -1894,7 +2167,7 @@ def get_img_pre_view(chart_id):
             'preview_available': True
         }
 
-        print(f"图表预览数据生成成功: {chart.chart_name}")
+        logger.debug("图表预览数据生成成功: %s", chart.chart_name)
 
         # 5. 使用RequestsUtils.make_response打包返回值
         return RequestsUtils.make_response(
@@ -1905,11 +2178,7 @@ def get_img_pre_view(chart_id):
         )
 
     except Exception as e:
-        print(f"=== 获取图表预览数据时发生异常 ===")
-        print(f"错误类型: {type(e).__name__}")
-        print(f"错误信息: {str(e)}")
-        import traceback
-        print(f"堆栈跟踪: {traceback.format_exc()}")
+        logger.exception("获取图表预览数据时发生异常")
 
         return RequestsUtils.make_response(
             status_code=500,
@@ -1922,13 +2191,13 @@ def get_img_pre_view(chart_id):
 def delete_chart_by_id(chart_id):
     """通过图ID删除图表及其关联关系"""
     try:
-        print(f"=== 删除图表请求 ===")
-        print(f"图表ID: {chart_id}")
+        logger.debug("=== 删除图表请求 ===")
+        logger.debug("图表ID: %s", chart_id)
 
         # 1. 查询图表是否存在
         chart = ChartData.query.get(chart_id)
         if not chart:
-            print(f"错误: 图表ID {chart_id} 不存在")
+            logger.warning("错误: 图表ID %s 不存在", chart_id)
             return RequestsUtils.make_response(
                 status_code=404,
                 msg='图表不存在',
@@ -1939,7 +2208,7 @@ def delete_chart_by_id(chart_id):
         chart_projects = ChartProject.query.filter_by(chart_id=chart_id).all()
         for cp in chart_projects:
             db.session.delete(cp)
-            print(f"删除图表-项目关联: chart_id={chart_id}, project_id={cp.project_id}")
+            logger.debug("删除图表-项目关联: chart_id=%s, project_id=%s", chart_id, cp.project_id)
 
         # 3. 尝试删除物理文件（如果存在）
         file_deleted = False
@@ -1947,15 +2216,16 @@ def delete_chart_by_id(chart_id):
             try:
                 os.remove(chart.file_path)
                 file_deleted = True
-                print(f"物理图表文件已删除: {chart.file_path}")
+                logger.info("物理图表文件已删除: %s", chart.file_path)
             except OSError as e:
-                print(f"警告: 无法删除图表文件 {chart.file_path}: {e}")
+                logger.warning("警告: 无法删除图表文件 %s: %s", chart.file_path, e)
 
         # 4. 删除主图表记录
         db.session.delete(chart)
         db.session.commit()
+        chart_count_cache.clear()
 
-        print(f"图表删除成功: ID={chart_id}, 文件删除={'成功' if file_deleted else '跳过'}")
+        logger.info("图表删除成功: ID=%s, 文件删除=%s", chart_id, '成功' if file_deleted else '跳过')
 
         return RequestsUtils.make_response(
             status_code=200,
@@ -1970,11 +2240,7 @@ def delete_chart_by_id(chart_id):
 
     except Exception as e:
         db.session.rollback()
-        print(f"=== 删除图表时发生异常 ===")
-        print(f"错误类型: {type(e).__name__}")
-        print(f"错误信息: {str(e)}")
-        import traceback
-        print(f"堆栈跟踪: {traceback.format_exc()}")
+        logger.exception("删除图表时发生异常")
         return RequestsUtils.make_response(
             status_code=500,
             msg=f'删除图表失败: {str(e)}',
@@ -1986,13 +2252,13 @@ def delete_chart_by_id(chart_id):
 def download_chart(chart_id):
     """下载指定图表的文件"""
     try:
-        print(f"=== 下载图表请求 ===")
-        print(f"图表ID: {chart_id}")
+        logger.debug("=== 下载图表请求 ===")
+        logger.debug("图表ID: %s", chart_id)
 
         # 1. 查询图表是否存在
         chart = ChartData.query.get(chart_id)
         if not chart:
-            print(f"错误: 图表ID {chart_id} 不存在")
+            logger.warning("错误: 图表ID %s 不存在", chart_id)
             return RequestsUtils.make_response(
                 status_code=404,
                 msg='图表不存在',
@@ -2001,14 +2267,14 @@ def download_chart(chart_id):
 
         # 2. 检查图表文件是否存在
         if not chart.file_path or not os.path.exists(chart.file_path):
-            print(f"错误: 图表文件不存在 - {chart.file_path}")
+            logger.warning("错误: 图表文件不存在 - %s", chart.file_path)
             return RequestsUtils.make_response(
                 status_code=404,
                 msg='图表文件不存在',
                 success=False
             )
 
-        print(f"找到图表文件: {chart.file_path}")
+        logger.debug("找到图表文件: %s", chart.file_path)
 
         # 3. 获取文件名（处理中文字符问题）
         filename = os.path.basename(chart.file_path)
@@ -2038,11 +2304,7 @@ def download_chart(chart_id):
         )
 
     except Exception as e:
-        print(f"=== 下载图表时发生异常 ===")
-        print(f"错误类型: {type(e).__name__}")
-        print(f"错误信息: {str(e)}")
-        import traceback
-        print(f"堆栈跟踪: {traceback.format_exc()}")
+        logger.exception("下载图表时发生异常")
         return RequestsUtils.make_response(
             status_code=500,
             msg=f'下载图表失败: {str(e)}',
@@ -2062,8 +2324,8 @@ def get_tables_by_sheet_id(sheet_id):
     """
     try:
         # 原有逻辑保持不变，但移除手动获取sheet_id的代码
-        print(f"=== 获取工作表下的表格列表 ===")
-        print(f"工作表ID: {sheet_id}")
+        logger.debug("=== 获取工作表下的表格列表 ===")
+        logger.debug("工作表ID: %s", sheet_id)
 
         # 2. 查询该sheet_id对应的所有表格
         tables = Table.query.filter_by(sheet_id=sheet_id).all()
@@ -2077,7 +2339,7 @@ def get_tables_by_sheet_id(sheet_id):
                 'create_time': table.created_at.strftime('%Y-%m-%d %H:%M') if table.created_at else None
             })
 
-        print(f"找到表格数量: {len(table_list)}")
+        logger.debug("找到表格数量: %s", len(table_list))
 
         # 4. 使用RequestsUtils.make_response打包返回值
         return RequestsUtils.make_response(
@@ -2088,11 +2350,7 @@ def get_tables_by_sheet_id(sheet_id):
         )
 
     except Exception as e:
-        print(f"=== 获取表格列表时发生异常 ===")
-        print(f"错误类型: {type(e).__name__}")
-        print(f"错误信息: {str(e)}")
-        import traceback
-        print(f"堆栈跟踪: {traceback.format_exc()}")
+        logger.exception("获取表格列表时发生异常")
         return RequestsUtils.make_response(
             status_code=500,
             msg=f'获取表格列表失败: {str(e)}',
@@ -2100,6 +2358,7 @@ def get_tables_by_sheet_id(sheet_id):
         )
 
 
+@locked_project(READ, key=_table_lock_key)
 def get_table_headers_by_table_id(table_id):
     """
     通过table_id获取table下的headers
@@ -2109,13 +2368,13 @@ def get_table_headers_by_table_id(table_id):
     4、使用RequestsUtils.make_response打包返回值
     """
     try:
-        print(f"=== 获取表格表头请求 ===")
-        print(f"表格ID: {table_id}")
+        logger.debug("=== 获取表格表头请求 ===")
+        logger.debug("表格ID: %s", table_id)
 
         # 2. 基于table_id获取对应的table
         table = Table.query.get(table_id)
         if not table:
-            print(f"错误: 表格ID {table_id} 不存在")
+            logger.warning("错误: 表格ID %s 不存在", table_id)
             return RequestsUtils.make_response(
                 status_code=404,
                 msg='表格不存在',
@@ -2125,19 +2384,20 @@ def get_table_headers_by_table_id(table_id):
         # 获取关联的Sheet信息（用于读取Excel文件）
         sheet = Sheet.query.get(table.sheet_id)
         if not sheet or not sheet.file_path or not os.path.exists(sheet.file_path):
-            print(f"错误: 表格 {table.name} 对应的Sheet文件不存在")
+            logger.warning("错误: 表格 %s 对应的Sheet文件不存在", table.name)
             return RequestsUtils.make_response(
                 status_code=404,
                 msg='表格文件不存在',
                 success=False
             )
 
-        print(f"找到表格: {table.name}, 文件路径: {sheet.file_path}")
+        logger.debug("找到表格: %s, 文件路径: %s", table.name, sheet.file_path)
 
         # 3. 基于table获取表头
         try:
             # 读取Excel文件中的对应工作表
-            df = pd.read_excel(sheet.file_path, sheet_name=table.name)
+            with stage_timer('excel_read'):
+                df = ExcelReader.read(sheet.file_path, sheet_name=table.name)
 
             # 获取列名作为表头
             headers_list = []
@@ -2148,10 +2408,10 @@ def get_table_headers_by_table_id(table_id):
                     'sample_data': df[col_name].dropna().head(3).tolist() if not df[col_name].dropna().empty else []
                 })
 
-            print(f"获取到表头数量: {len(headers_list)}")
+            logger.debug("获取到表头数量: %s", len(headers_list))
 
         except Exception as e:
-            print(f"读取表格文件失败: {str(e)}")
+            logger.warning("读取表格文件失败: %s", e)
             return RequestsUtils.make_response(
                 status_code=500,
                 msg=f'读取表格文件失败: {str(e)}',
@@ -2172,11 +2432,7 @@ def get_table_headers_by_table_id(table_id):
         )
 
     except Exception as e:
-        print(f"=== 获取表头时发生异常 ===")
-        print(f"错误类型: {type(e).__name__}")
-        print(f"错误信息: {str(e)}")
-        import traceback
-        print(f"堆栈跟踪: {traceback.format_exc()}")
+        logger.exception("获取表头时发生异常")
         return RequestsUtils.make_response(
             status_code=500,
             msg=f'获取表头失败: {str(e)}',
@@ -2185,21 +2441,23 @@ def get_table_headers_by_table_id(table_id):
 
 
 # 导入sheet数据
+@locked_project(WRITE, key=_sheet_lock_key)
 def load_sheet_data_to_data(sheet_id):
     """
     导入sheet数据到现有Excel文件
-    1、从请求中获取到sheet_id、传入的excel文件、table_name
+    1、从请求中获取到sheet_id、传入的excel/csv文件（可多个）、table_name
     2、从sheet_id获取到sheet对象，sheet对象中存在文件路径
     3、读取sheet_id对应的excel文件，获取sheet名的列表a
     4、读取传入的excel文件获取sheet名的列表b
         4.1 遍历b
             4.1.1、b的sheet名如果在a中，则重命名为sheet_name_1 2 3以此类推，追加为a的新sheet
             4.1.2、b的sheet名如果不在a中，则正常追加到a的新sheet中
+        4.2 CSV/TSV文件直接解析（不经过xlsx），每个文件作为一个新sheet，名称为table_name（仅上传一个文件时）或文件名
     5、使用RequestsUtils.make_response打包返回值
     """
     try:
-        print(f"=== 导入Sheet数据请求 ===")
-        print(f"目标Sheet ID: {sheet_id}")
+        logger.debug("=== 导入Sheet数据请求 ===")
+        logger.debug("目标Sheet ID: %s", sheet_id)
 
         # 1. 验证请求参数和文件
         if 'file' not in request.files:
@@ -2209,20 +2467,21 @@ def load_sheet_data_to_data(sheet_id):
                 success=False
             )
 
-        file = request.files['file']
-        if file.filename == '':
+        files = [file for file in request.files.getlist('file') if file.filename]
+        if not files:
             return RequestsUtils.make_response(
                 status_code=400,
                 msg='没有选择文件',
                 success=False
             )
 
-        if not file.filename.lower().endswith(('.xlsx', '.xls')):
-            return RequestsUtils.make_response(
-                status_code=400,
-                msg='只支持.xlsx/.xls格式文件',
-                success=False
-            )
+        for file in files:
+            if not file.filename.lower().endswith(('.xlsx', '.xls')) and not CsvUtils.is_csv_file(file.filename):
+                return RequestsUtils.make_response(
+                    status_code=400,
+                    msg='只支持.xlsx/.xls/.csv/.tsv/.txt格式文件',
+                    success=False
+                )
 
         # 获取可选的table_name参数
         table_name = request.form.get('table_name', '').strip()
@@ -2243,15 +2502,15 @@ def load_sheet_data_to_data(sheet_id):
                 success=False
             )
 
-        print(f"目标Sheet文件: {target_sheet.file_path}")
-        print(f"上传文件名: {file.filename}")
-        print(f"可选表名: {table_name}")
+        logger.debug("目标Sheet文件: %s", target_sheet.file_path)
+        logger.debug("上传文件名: %s", brief([file.filename for file in files]))
+        logger.debug("可选表名: %s", table_name)
 
-        # 3. 读取目标Excel文件的sheet列表
+        # 3. 读取目标Excel文件的sheet列表（只读模式，不解析单元格）
         try:
-            target_excel = pd.ExcelFile(target_sheet.file_path)
-            target_sheets = set(target_excel.sheet_names)
-            print(f"目标文件中的Sheet列表: {list(target_sheets)}")
+            sheet_names = ExcelReader.sheet_names(target_sheet.file_path)
+            target_sheets = set(sheet_names)
+            logger.debug("目标文件中的Sheet列表: %s", brief(sheet_names))
         except Exception as e:
             return RequestsUtils.make_response(
                 status_code=500,
@@ -2259,117 +2518,104 @@ def load_sheet_data_to_data(sheet_id):
                 success=False
             )
 
-        # 4. 读取上传Excel文件的sheet列表
+        # 4. 读取上传文件的sheet列表：[(sheet名, 读取数据的函数)]
+        # 上传文件已由 UploadRequest 分块写入 UPLOAD_FOLDER，直接按路径读取，请求结束时自动删除
+        source_files = ExitStack()
+        source_sheets = []
         try:
-            # 保存上传的临时文件
-            temp_dir = os.path.join(current_app.config.get('TEMP_DIR', '/tmp'), 'sheet_import')
-            os.makedirs(temp_dir, exist_ok=True)
-
-            temp_file_path = os.path.join(temp_dir,
-                                          f"upload_{datetime.now().strftime('%Y%m%d%H%M%S')}_{secure_filename(file.filename)}")
-            file.save(temp_file_path)
-
-            source_excel = pd.ExcelFile(temp_file_path)
-            source_sheets = source_excel.sheet_names
-            print(f"上传文件中的Sheet列表: {source_sheets}")
+            for file in files:
+                upload_path = stored_upload_path(file)
+                if CsvUtils.is_csv_file(file.filename):
+                    name = table_name if table_name and len(files) == 1 else file.filename
+                    source_sheets.append((CsvUtils.table_name(name),
+                                          lambda path=upload_path: CsvUtils.read_csv(path)))
+                else:
+                    # 复用已打开的上传工作簿，每个sheet只解析一次
+                    source_excel = source_files.enter_context(ExcelReader.open(upload_path))
+                    source_sheets.extend((name, lambda name=name, excel=source_excel: excel.parse(name))
+                                         for name in source_excel.sheet_names)
+            logger.debug("上传文件中的Sheet列表: %s", brief([name for name, _ in source_sheets]))
         except Exception as e:
+            source_files.close()
             return RequestsUtils.make_response(
                 status_code=500,
-                msg=f'读取上传Excel文件失败: {str(e)}',
+                msg=f'读取上传文件失败: {str(e)}',
                 success=False
             )
 
-        # 5. 使用ExcelWriter来合并文件
-        try:
-            with pd.ExcelWriter(target_sheet.file_path, engine='openpyxl', mode='a',
-                                if_sheet_exists='replace') as writer:
-                # 先读取并保留目标文件的所有现有sheet
-                for sheet_name in target_sheets:
-                    try:
-                        df_existing = pd.read_excel(target_sheet.file_path, sheet_name=sheet_name)
-                        df_existing.to_excel(writer, sheet_name=sheet_name, index=False)
-                        print(f"保留现有Sheet: {sheet_name}")
-                    except Exception as e:
-                        print(f"读取现有Sheet {sheet_name} 失败: {str(e)}")
-                        continue
-
-                # 处理上传文件的每个sheet
-                imported_sheets = []
-                skipped_sheets = []
-
-                for source_sheet_name in source_sheets:
-                    try:
-                        df_source = pd.read_excel(temp_file_path, sheet_name=source_sheet_name)
-
-                        # 确定目标sheet名称
-                        target_sheet_name = source_sheet_name
-                        counter = 1
-
-                        # 检查sheet名是否已存在，如果存在则重命名
-                        while target_sheet_name in target_sheets:
-                            target_sheet_name = f"{source_sheet_name}_{counter}"
-                            counter += 1
-
-                        # 写入数据
-                        df_source.to_excel(writer, sheet_name=target_sheet_name, index=False)
-
-                        if target_sheet_name != source_sheet_name:
-                            print(f"Sheet重命名: {source_sheet_name} -> {target_sheet_name}")
-                            imported_sheets.append({
-                                'original_name': source_sheet_name,
-                                'new_name': target_sheet_name,
-                                'reason': '重命名（名称冲突）'
-                            })
-                        else:
-                            imported_sheets.append({
-                                'original_name': source_sheet_name,
-                                'new_name': target_sheet_name,
-                                'reason': '新增'
-                            })
-
-                        target_sheets.add(target_sheet_name)  # 更新已存在sheet列表
-                        print(f"成功导入Sheet: {source_sheet_name} -> {target_sheet_name}")
-
-                    except Exception as e:
-                        print(f"导入Sheet {source_sheet_name} 失败: {str(e)}")
-                        skipped_sheets.append({
-                            'sheet_name': source_sheet_name,
-                            'reason': str(e)
-                        })
-                        continue
+        # 5. 逐个sheet读取并流式追加到目标文件（现有Sheet按zip条目原样复制，不解析；同一时刻只保留一个sheet的数据）
+        imported_sheets = []
+        skipped_sheets = []
+
+        def imported_frames():
+            for source_sheet_name, read_source in source_sheets:
+                try:
+                    df_source = read_source()
+                except Exception as e:
+                    logger.warning("导入Sheet %s 失败: %s", source_sheet_name, e)
+                    skipped_sheets.append({
+                        'sheet_name': source_sheet_name,
+                        'reason': str(e)
+                    })
+                    continue
+
+                # 确定目标sheet名称：已存在（不区分大小写）时重命名为 _1、_2…，超长时先截断
+                target_sheet_name = unique_sheet_name(source_sheet_name, target_sheets)
+
+                if target_sheet_name != source_sheet_name:
+                    logger.debug("Sheet重命名: %s -> %s", source_sheet_name, target_sheet_name)
+                    imported_sheets.append({
+                        'original_name': source_sheet_name,
+                        'new_name': target_sheet_name,
+                        'reason': '重命名（名称冲突）'
+                    })
+                else:
+                    imported_sheets.append({
+                        'original_name': source_sheet_name,
+                        'new_name': target_sheet_name,
+                        'reason': '新增'
+                    })
+
+                target_sheets.add(target_sheet_name)  # 更新已存在sheet列表
+                sheet_names.append(target_sheet_name)  # 新sheet追加在末尾
+                logger.debug("成功导入Sheet: %s -> %s", source_sheet_name, target_sheet_name)
+                yield target_sheet_name, frame_rows(df_source)
 
-            print("Excel文件合并完成")
+        try:
+            with source_files, stage_timer('excel_write'):
+                try:
+                    ExcelStreamWriter.update(target_sheet.file_path, imported_frames())
+                except UnsupportedWorkbookError as e:
+                    # 在读取任何上传sheet之前抛出，生成器尚未开始
+                    logger.debug("无法增量更新工作簿(%s)，改用ExcelWriter追加模式", e)
+                    with atomic_replace(target_sheet.file_path, copy=True) as temp_path, \
+                            pd.ExcelWriter(temp_path, engine='openpyxl', mode='a',
+                                           if_sheet_exists='replace') as writer:
+                        for target_sheet_name, rows in imported_frames():
+                            header = next(rows)
+                            pd.DataFrame(list(rows), columns=header).to_excel(
+                                writer, sheet_name=target_sheet_name, index=False)
+
+            logger.info("Excel文件合并完成")
 
             # 6. 更新数据库中的Table记录
             try:
                 # 删除该sheet下原有的table记录
                 Table.query.filter_by(sheet_id=sheet_id).delete()
 
-                # 重新读取合并后的sheet列表并创建table记录
-                updated_excel = pd.ExcelFile(target_sheet.file_path)
-                for sheet_name in updated_excel.sheet_names:
-                    table = Table(
-                        name=sheet_name,
-                        sheet_id=sheet_id
-                    )
-                    db.session.add(table)
+                # 按合并后的sheet列表批量创建table记录（与写入顺序一致，无需重新打开文件）
+                db.session.bulk_insert_mappings(Table, [
+                    {'name': sheet_name, 'sheet_id': sheet_id} for sheet_name in sheet_names
+                ])
 
                 db.session.commit()
-                print(f"更新数据库Table记录，共{len(updated_excel.sheet_names)}个表")
+                logger.debug("更新数据库Table记录，共%s个表", len(sheet_names))
 
             except Exception as db_error:
                 db.session.rollback()
-                print(f"更新数据库失败: {str(db_error)}")
+                logger.warning("更新数据库失败: %s", db_error)
                 # 不返回错误，继续执行
 
-            # 清理临时文件
-            try:
-                if os.path.exists(temp_file_path):
-                    os.remove(temp_file_path)
-                    print("临时文件已清理")
-            except Exception as cleanup_error:
-                print(f"清理临时文件失败: {str(cleanup_error)}")
-
             # 7. 返回成功响应
             return RequestsUtils.make_response(
                 status_code=200,
@@ -2399,11 +2645,7 @@ def load_sheet_data_to_data(sheet_id):
             )
 
     except Exception as e:
-        print(f"=== 导入Sheet数据时发生异常 ===")
-        print(f"错误类型: {type(e).__name__}")
-        print(f"错误信息: {str(e)}")
-        import traceback
-        print(f"堆栈跟踪: {traceback.format_exc()}")
+        logger.exception("导入Sheet数据时发生异常")
 
         return RequestsUtils.make_response(
             status_code=500,
@@ -2421,8 +2663,8 @@ def get_sheet_by_project_id(project_id):
     3、使用RequestsUtils.make_response打包返回值
     """
     try:
-        print(f"=== 获取项目Sheet基本信息请求 ===")
-        print(f"项目ID: {project_id}")
+        logger.debug("=== 获取项目Sheet基本信息请求 ===")
+        logger.debug("项目ID: %s", project_id)
 
         # 1. 验证项目是否存在
         project = DataProject.query.get(project_id)
@@ -2457,7 +2699,7 @@ def get_sheet_by_project_id(project_id):
                     'create_time': sheet.created_at.strftime('%Y-%m-%d %H:%M') if sheet.created_at else None
                 })
 
-        print(f"获取到项目 {project_id} 下的 {len(sheets_list)} 个Sheet")
+        logger.debug("获取到项目 %s 下的 %s 个Sheet", project_id, len(sheets_list))
 
         # 4. 返回简化响应
         return RequestsUtils.make_response(
@@ -2469,7 +2711,7 @@ def get_sheet_by_project_id(project_id):
 
 
     except Exception as e:
-        print(f"获取项目Sheet信息时发生异常: {str(e)}")
+        logger.exception("获取项目Sheet信息时发生异常")
         return RequestsUtils.make_response(
             status_code=500,
             msg=f'获取项目Sheet信息失败: {str(e)}',
@@ -2486,10 +2728,10 @@ def get_data_ana_types():
     2、使用RequestsUtils.make_response打包返回值
     """
     try:
-        print("=== 获取数据分析类型列表请求 ===")
+        logger.debug("=== 获取数据分析类型列表请求 ===")
 
-        # 1. 从数据库获取所有数据分析类型
-        data_ana_types = DataAnaType.query.all()
+        # 1. 获取所有数据分析类型（参考数据缓存）
+        data_ana_types = ReferenceCache.get_data_ana_types()
 
         # 2. 构建返回数据列表
         data_ana_types_list = []
@@ -2505,7 +2747,7 @@ def get_data_ana_types():
                 # 'analysis_count': analysis_count  # 如果有相关模型可以添加计数
             })
 
-        print(f"获取到 {len(data_ana_types_list)} 个数据分析类型")
+        logger.debug("获取到 %s 个数据分析类型", len(data_ana_types_list))
 
         # 3. 使用RequestsUtils.make_response打包返回值
         return RequestsUtils.make_response(
@@ -2516,11 +2758,7 @@ def get_data_ana_types():
         )
 
     except Exception as e:
-        print(f"=== 获取数据分析类型列表时发生异常 ===")
-        print(f"错误类型: {type(e).__name__}")
-        print(f"错误信息: {str(e)}")
-        import traceback
-        print(f"堆栈跟踪: {traceback.format_exc()}")
+        logger.exception("获取数据分析类型列表时发生异常")
 
         return RequestsUtils.make_response(
             status_code=500,
@@ -2539,14 +2777,14 @@ def post_data_ana_types():
     4、使用RequestsUtils.make_response打包返回值
     """
     try:
-        print("=== 新增数据分析类型请求 ===")
+        logger.debug("=== 新增数据分析类型请求 ===")
 
         # 1. 获取请求数据
         data = request.get_json()
-        print(f"请求数据: {data}")
+        logger.debug("请求数据: %s", brief(data))
 
         if not data:
-            print("错误: 请求数据为空")
+            logger.warning("错误: 请求数据为空")
             return RequestsUtils.make_response(
                 status_code=400,
                 msg='请求数据不能为空',
@@ -2558,7 +2796,7 @@ def post_data_ana_types():
         description = data.get('description', '').strip()
 
         if not type_name:
-            print("错误: 数据分析类型名称不能为空")
+            logger.warning("错误: 数据分析类型名称不能为空")
             return RequestsUtils.make_response(
                 status_code=400,
                 msg='数据分析类型名称不能为空',
@@ -2568,7 +2806,7 @@ def post_data_ana_types():
         # 3. 检查类型名称是否已存在
         existing_type = DataAnaType.query.filter_by(type_name=type_name).first()
         if existing_type:
-            print(f"错误: 数据分析类型名称 '{type_name}' 已存在")
+            logger.warning("错误: 数据分析类型名称 '%s' 已存在", type_name)
             return RequestsUtils.make_response(
                 status_code=400,
                 msg='数据分析类型名称已存在',
@@ -2583,8 +2821,9 @@ def post_data_ana_types():
 
         db.session.add(new_data_ana_type)
         db.session.commit()
+        ReferenceCache.invalidate_data_ana_types()
 
-        print(f"数据分析类型创建成功: ID={new_data_ana_type.id}, 名称={type_name}")
+        logger.info("数据分析类型创建成功: ID=%s, 名称=%s", new_data_ana_type.id, type_name)
 
         # 5. 构建返回数据
         created_type_data = {
@@ -2605,11 +2844,7 @@ def post_data_ana_types():
 
     except Exception as e:
         db.session.rollback()
-        print(f"=== 新增数据分析类型时发生异常 ===")
-        print(f"错误类型: {type(e).__name__}")
-        print(f"错误信息: {str(e)}")
-        import traceback
-        print(f"堆栈跟踪: {traceback.format_exc()}")
+        logger.exception("新增数据分析类型时发生异常")
 
         return RequestsUtils.make_response(
             status_code=500,
@@ -2625,16 +2860,27 @@ def get_data_anas():
     1、从请求中获取数据分析类型id和项目id
         1.1 如果存在分析类型ID则基于分析类型id筛选
         1.2 如果不存在分析类型ID则不筛选
-    2、使用RequestsUtils.make_response打包返回值
+    2、从同一组请求参数中获取分页参数：cursor、limit，with_count=1 时返回符合条件的总数 total_count
+    3、类型、项目、表格按本页去重后的ID批量查询
+    4、使用RequestsUtils.make_response打包返回值
     """
     try:
-        print("=== 获取数据分析列表请求 ===")
+        logger.debug("=== 获取数据分析列表请求 ===")
 
         # 1. 从请求参数中获取数据分析类型ID和项目ID
         data_ana_type_id = request.args.get('type_id', type=int)  # 数据分析类型ID（可选）
         project_id = request.args.get('project_id', type=int)  # 项目ID（可选）
+        cursor = request.args.get('cursor', '')  # 上一页返回的游标（可选）
+        limit = PaginationUtils.get_limit(request.args)
+        with_count = request.args.get('with_count', 0, type=int) == 1  # 是否统计符合筛选条件的总数
 
-        print(f"请求参数 - 数据分析类型ID: {data_ana_type_id}, 项目ID: {project_id}")
+        logger.debug("请求参数 - 数据分析类型ID: %s, 项目ID: %s", data_ana_type_id, project_id)
+        if not PaginationUtils.is_valid_cursor(cursor):
+            return RequestsUtils.make_response(
+                status_code=400,
+                msg='分页游标无效',
+                success=False
+            )
 
         # 2. 构建查询条件
         query = DataAnaModel.query
@@ -2644,21 +2890,21 @@ def get_data_anas():
             # 验证项目是否存在
             project = DataProject.query.get(project_id)
             if not project:
-                print(f"错误: 项目ID {project_id} 不存在")
+                logger.warning("错误: 项目ID %s 不存在", project_id)
                 return RequestsUtils.make_response(
                     status_code=404,
                     msg='项目不存在',
                     success=False
                 )
             query = query.filter(DataAnaModel.project_id == project_id)
-            print(f"按项目ID筛选: {project_id}")
+            logger.debug("按项目ID筛选: %s", project_id)
 
         # 2.2 如果提供了数据分析类型ID，则按类型ID筛选
         if data_ana_type_id:
             # 验证数据分析类型是否存在
-            data_ana_type = DataAnaType.query.get(data_ana_type_id)
+            data_ana_type = ReferenceCache.get_data_ana_type(data_ana_type_id)
             if not data_ana_type:
-                print(f"错误: 数据分析类型ID {data_ana_type_id} 不存在")
+                logger.warning("错误: 数据分析类型ID %s 不存在", data_ana_type_id)
                 return RequestsUtils.make_response(
                     status_code=404,
                     msg='数据分析类型不存在',
@@ -2671,73 +2917,95 @@ def get_data_anas():
             ).subquery()
 
             query = query.filter(DataAnaModel.id.in_(analysis_ids_with_type))
-            print(f"按数据分析类型ID筛选: {data_ana_type_id}")
-
-        # 3. 执行查询并获取结果
-        data_analyses = query.order_by(DataAnaModel.created_at.desc()).all()
-
-        # 4. 构建返回数据列表
+            logger.debug("按数据分析类型ID筛选: %s", data_ana_type_id)
+
+        # 符合筛选条件的总数需要额外一次count查询，只在 with_count=1 时统计
+        total_count = query.order_by(None).count() if with_count else None
+
+        # 3. 按 (创建时间, ID) 倒序游标分页获取本页模型
+        query = PaginationUtils.filter_after_cursor(query, DataAnaModel.created_at, DataAnaModel.id, cursor)
+        data_analyses, has_more = PaginationUtils.split_page(
+            query.order_by(DataAnaModel.created_at.desc(), DataAnaModel.id.desc()).limit(limit + 1).all(), limit)
+        next_cursor = PaginationUtils.encode_cursor(
+            data_analyses[-1].created_at, data_analyses[-1].id) if has_more else None
+
+        # 4. 按去重后的ID批量查询关联数据，查询次数与本页条数无关
+        model_ids = [analysis.id for analysis in data_analyses]
+        project_ids = {analysis.project_id for analysis in data_analyses}
+        table_ids = {analysis.table_id for analysis in data_analyses}
+
+        # 4.1 模型关联的分析类型（关联表连表类型表，一次查询）
+        types_by_model = {}
+        if model_ids:
+            type_rows = db.session.query(
+                DataAnaModelsTypes.model_id, DataAnaModelsTypes.type_id, DataAnaType.type_name
+            ).outerjoin(
+                DataAnaType, DataAnaType.id == DataAnaModelsTypes.type_id
+            ).filter(
+                DataAnaModelsTypes.model_id.in_(model_ids)
+            ).order_by(DataAnaModelsTypes.id.asc()).all()
+
+            for model_id, type_id, type_name in type_rows:
+                types_by_model.setdefault(model_id, []).append((type_id, type_name))
+
+        # 4.2 关联的项目名称和表格名称
+        project_names = dict(db.session.query(DataProject.id, DataProject.name).filter(
+            DataProject.id.in_(project_ids)).all()) if project_ids else {}
+        table_names = dict(db.session.query(Table.id, Table.name).filter(
+            Table.id.in_(table_ids)).all()) if table_ids else {}
+
+        # 5. 构建返回数据列表
         analyses_list = []
         for analysis in data_analyses:
-            # 获取关联的数据分析类型
-            analysis_types = DataAnaModelsTypes.query.filter_by(model_id=analysis.id).all()
-            type_ids = [at.type_id for at in analysis_types]
-
-            # 获取类型名称
-            type_names = []
-            for type_id in type_ids:
-                ana_type = DataAnaType.query.get(type_id)
-                if ana_type:
-                    type_names.append(ana_type.type_name)
-
-            # 获取关联的项目信息
-            project = DataProject.query.get(analysis.project_id)
-            project_name = project.name if project else "未知项目"
-
-            # 获取关联的表格信息
-            table = Table.query.get(analysis.table_id)
-            table_name = table.name if table else "未知表格"
+            analysis_types = types_by_model.get(analysis.id, [])
 
             analysis_data = {
                 'id': analysis.id,
                 'name': analysis.name,
                 'description': analysis.description,
                 'file_path': analysis.file_path,
-                'file_exists': os.path.exists(analysis.file_path) if analysis.file_path else False,
+                'file_exists': FilsSystemUtils.check_file_exists_cached(analysis.file_path),
                 'project_id': analysis.project_id,
-                'project_name': project_name,
+                'project_name': project_names.get(analysis.project_id, "未知项目"),
                 'table_id': analysis.table_id,
-                'table_name': table_name,
-                'type_ids': type_ids,
-                'type_names': type_names,
+                'table_name': table_names.get(analysis.table_id, "未知表格"),
+                'type_ids': [type_id for type_id, _ in analysis_types],
+                'type_names': [type_name for _, type_name in analysis_types if type_name],
                 'create_time': analysis.created_at.strftime('%Y-%m-%d %H:%M:%S') if analysis.created_at else '未知',
                 'update_time': analysis.updated_at.strftime('%Y-%m-%d %H:%M:%S') if analysis.updated_at else '未知'
             }
             analyses_list.append(analysis_data)
 
-        print(f"获取到 {len(analyses_list)} 个数据分析记录")
+        logger.debug("获取到 %s 个数据分析记录", len(analyses_list))
+
+        # 6. 使用RequestsUtils.make_response打包返回值
+        # count 为本页条数；total_count（符合筛选条件的总数，分页前的含义）只在 with_count=1 时返回
+        data = {
+            'analyses': analyses_list,
+            'count': len(analyses_list),
+            'filters': {
+                'applied_type_id': data_ana_type_id,
+                'applied_project_id': project_id
+            },
+            'pagination': {
+                'limit': limit,
+                'cursor': cursor or None,
+                'next_cursor': next_cursor,
+                'has_more': has_more
+            }
+        }
+        if with_count:
+            data['total_count'] = total_count
 
-        # 5. 使用RequestsUtils.make_response打包返回值
         return RequestsUtils.make_response(
             status_code=200,
             msg='获取数据分析列表成功',
-            data={
-                'analyses': analyses_list,
-                'total_count': len(analyses_list),
-                'filters': {
-                    'applied_type_id': data_ana_type_id,
-                    'applied_project_id': project_id
-                }
-            },
+            data=data,
             success=True
         )
 
     except Exception as e:
-        print(f"=== 获取数据分析列表时发生异常 ===")
-        print(f"错误类型: {type(e).__name__}")
-        print(f"错误信息: {str(e)}")
-        import traceback
-        print(f"堆栈跟踪: {traceback.format_exc()}")
+        logger.exception("获取数据分析列表时发生异常")
 
         return RequestsUtils.make_response(
             status_code=500,
@@ -1,6 +1,10 @@
+import logging
+
 from flask import render_template
 
-from app.DataProject.modules import ChartType
+from app.Utils.reference_cache import ReferenceCache
+
+logger = logging.getLogger(__name__)
 
 
 def project_add():
@@ -41,11 +45,11 @@ def chart_table_detail(project_id, chart_type_id):
         chart_type_id = int(chart_type_id)
 
         # 获取图表类型信息
-        chart_type = ChartType.query.get(chart_type_id)
+        chart_type = ReferenceCache.get_chart_type(chart_type_id)
         if not chart_type:
             return "图表类型不存在", 404
 
-        print(f"渲染图表详情页面: project_id={project_id}, chart_type_id={chart_type_id}")
+        logger.debug("渲染图表详情页面: project_id=%s, chart_type_id=%s", project_id, chart_type_id)
 
         return render_template(
             'Project_detail/chart_table_detail.html',
@@ -55,7 +59,7 @@ def chart_table_detail(project_id, chart_type_id):
         )
 
     except (ValueError, TypeError) as e:
-        print(f"参数错误: project_id={project_id}, chart_type_id={chart_type_id}, 错误: {e}")
+        logger.warning("参数错误: project_id=%s, chart_type_id=%s, 错误: %s", project_id, chart_type_id, e)
         return "参数错误", 400
 
 # -----------------------------数据分析页面路由-----------------------------------------
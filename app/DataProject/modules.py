@@ -26,6 +26,9 @@ class DataProject(db.Model):
 class ProjectUser(db.Model):
     """项目-用户对应关系模型"""
     __tablename__ = 'project_users'
+    __table_args__ = (
+        db.Index('ix_project_users_project_id_user_id', 'project_id', 'user_id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, nullable=False)  # 用户ID
@@ -70,6 +73,10 @@ class Sheet(db.Model):
 class SheetProject(db.Model):
     """Sheet-项目对应关系模型"""
     __tablename__ = 'sheet_projects'
+    __table_args__ = (
+        # 查询项目最新的Sheet：WHERE project_id = ? ORDER BY created_at DESC
+        db.Index('ix_sheet_projects_project_id_created_at', 'project_id', 'created_at'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     sheet_id = db.Column(db.Integer, nullable=False)  # 表ID
@@ -89,9 +96,30 @@ class SheetProject(db.Model):
         }
 
 
+class ProjectWorkbook(db.Model):
+    """项目当前工作簿指针（每个项目一行，保存/导入时与工作簿记录在同一事务中更新）"""
+    __tablename__ = 'project_workbooks'
+    __table_args__ = (
+        # 按项目查找当前工作簿：WHERE project_id = ?
+        db.Index('ix_project_workbooks_project_id', 'project_id', unique=True),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    project_id = db.Column(db.Integer, nullable=False)  # 项目ID
+    sheet_id = db.Column(db.Integer)  # 对应的Sheet记录ID（导入的数据文件没有Sheet记录时为空）
+    file_path = db.Column(db.String(500), nullable=False)  # 工作簿文件地址
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)  # 更新时间
+
+    def __repr__(self):
+        return f'<ProjectWorkbook project_id={self.project_id}, file_path={self.file_path}>'
+
+
 class Table(db.Model):
     """Table表模型"""
     __tablename__ = 'tables'
+    __table_args__ = (
+        db.Index('ix_tables_sheet_id', 'sheet_id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(255), nullable=False)  # 页签名
     sheet_id = db.Column(db.Integer, nullable=False)
@@ -125,6 +153,10 @@ class ChartType(db.Model):
 class ChartData(db.Model):
     """需求二：简化版图表数据表（无外键）"""
     __tablename__ = 'chart_data'
+    __table_args__ = (
+        # 按类型分页：WHERE chart_type_id = ? ORDER BY created_at DESC, id DESC
+        db.Index('ix_chart_data_chart_type_id_created_at', 'chart_type_id', 'created_at'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     chart_type_id = db.Column(db.Integer, nullable=False)  # 仅存储类型ID，无外键约束
@@ -139,6 +171,10 @@ class ChartData(db.Model):
 class ChartProject(db.Model):
     """需求三：简化版图表-项目关系表（无外键）"""
     __tablename__ = 'chart_projects'
+    __table_args__ = (
+        db.Index('ix_chart_projects_project_id_chart_id', 'project_id', 'chart_id'),
+        db.Index('ix_chart_projects_chart_id', 'chart_id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     chart_id = db.Column(db.Integer, nullable=False)  # 仅存储图表ID，无外键约束
@@ -177,6 +213,9 @@ class DataAnaType(db.Model):
 class DataAnaModel(db.Model):
     """数据分析模型表"""
     __tablename__ = 'data_ana_models'
+    __table_args__ = (
+        db.Index('ix_data_ana_models_project_id_created_at', 'project_id', 'created_at'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(255), nullable=False)  # 模型名称
@@ -208,6 +247,10 @@ class DataAnaModel(db.Model):
 class DataAnaModelsTypes(db.Model):
     """数据分析模型与类型关联表（多对多关系）"""
     __tablename__ = 'data_ana_models_types'
+    __table_args__ = (
+        db.Index('ix_data_ana_models_types_model_id_type_id', 'model_id', 'type_id'),
+        db.Index('ix_data_ana_models_types_type_id_model_id', 'type_id', 'model_id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     model_id = db.Column(db.Integer, nullable=False)  # 模型ID
@@ -60,6 +60,17 @@ data_project_bp.route('/api/project/<int:project_id>/workbook/load', methods=['G
 # 添加Excel文件导入路由
 data_project_bp.route('/api/project/<int:project_id>/import-excel', methods=['POST'], endpoint='api_import_excel')(
     func_views.import_excel_file)
+# Excel断点续传导入：创建会话、查询状态（续传偏移量）、上传分片、完成、取消
+data_project_bp.route('/api/project/<int:project_id>/import-excel/uploads', methods=['POST'],
+                      endpoint='api_import_excel_upload_init')(func_views.init_chunked_import)
+data_project_bp.route('/api/project/<int:project_id>/import-excel/uploads/<upload_id>', methods=['GET'],
+                      endpoint='api_import_excel_upload_status')(func_views.get_chunked_import)
+data_project_bp.route('/api/project/<int:project_id>/import-excel/uploads/<upload_id>', methods=['PUT'],
+                      endpoint='api_import_excel_upload_part')(func_views.upload_chunked_import_part)
+data_project_bp.route('/api/project/<int:project_id>/import-excel/uploads/<upload_id>/complete', methods=['POST'],
+                      endpoint='api_import_excel_upload_complete')(func_views.complete_chunked_import)
+data_project_bp.route('/api/project/<int:project_id>/import-excel/uploads/<upload_id>', methods=['DELETE'],
+                      endpoint='api_import_excel_upload_abort')(func_views.abort_chunked_import)
 
 # 添加数据制图页面路由
 data_project_bp.route('/project/<int:project_id>/chart-table', methods=['GET'], endpoint='page_project_chart_table')(
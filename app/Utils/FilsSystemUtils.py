@@ -1,8 +1,26 @@
 import os
 
+from app.core.config import config
+from app.Utils.cache_utils import TTLCache
+
 
 class FilsSystemUtils:
+    # 文件存在性缓存：短时间内重复判断同一路径时不再发起stat系统调用；
+    # 不做主动失效（各worker进程各有一份缓存，无法互相通知），结果最多滞后 FILE_EXISTS_CACHE_TTL 秒
+    _exists_cache = TTLCache(ttl=config.FILE_EXISTS_CACHE_TTL, maxsize=4096)
+
     @classmethod
     def check_file_dir_exists(cls, file_path):
         res = os.path.exists(file_path)
         return res
+
+    @classmethod
+    def check_file_exists_cached(cls, file_path):
+        """
+        判断文件是否存在（结果短时缓存，适合列表接口批量判断）
+
+        文件新增或删除后，最多 FILE_EXISTS_CACHE_TTL 秒内仍返回旧结果
+        """
+        if not file_path:
+            return False
+        return cls._exists_cache.get_or_set(file_path, lambda: os.path.exists(file_path))
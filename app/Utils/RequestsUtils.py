@@ -8,11 +8,14 @@ class RequestsUtils:
             status_code=200,
             msg="",
             data=None,
-            success=True
+            success=True,
+            **extra
     ):
         res = {
             "success": success,
             "msg": msg,
             "data": data
         }
+        # 附加字段（如分页信息），不影响原有的 data 结构
+        res.update(extra)
         return jsonify(res), status_code
@@ -1,10 +1,44 @@
+import logging
 import os
-import matplotlib.pyplot as plt
-import pandas as pd
-import numpy as np
+import threading
 from datetime import datetime
-import seaborn as sns
 from app.core.config import config
+from app.core.metrics import timed_stage
+from app.core.utils import lazy_import
+
+# 绘图相关的重型依赖延迟到首次生成图表时再导入，避免拖慢应用启动
+mpl = lazy_import('matplotlib')
+mpl_figure = lazy_import('matplotlib.figure')
+pd = lazy_import('pandas')
+np = lazy_import('numpy')
+sns = lazy_import('seaborn')
+
+logger = logging.getLogger(__name__)
+
+# 中文字体；rcParams 是进程级全局状态，只在首次绘图前设置一次，请求中不再修改
+CHART_RC_PARAMS = {
+    'font.sans-serif': ['SimHei', 'Arial Unicode MS', 'DejaVu Sans'],
+    'axes.unicode_minus': False,
+}
+_rc_lock = threading.Lock()
+_rc_applied = False
+
+
+def _new_figure(figsize=(12, 8)):
+    """
+    创建独立的 Figure/Axes，不经过 pyplot
+
+    pyplot 的“当前图表”是进程内所有线程共享的全局状态，gthread/waitress 的多个线程同时绘图会互相干扰
+    （RendererAgg 错误、保存出空白或别人的图），每个请求使用自己的 Figure 对象即可并发渲染
+    """
+    global _rc_applied
+    if not _rc_applied:
+        with _rc_lock:
+            if not _rc_applied:
+                mpl.rcParams.update(CHART_RC_PARAMS)
+                _rc_applied = True
+    fig = mpl_figure.Figure(figsize=figsize)
+    return fig, fig.subplots()
 
 
 class ChartUtils:
@@ -36,6 +70,7 @@ class ChartUtils:
         return chart_types.get(chart_type_id)
 
     @staticmethod
+    @timed_stage('chart_plot')
     def scatter_chart(data, x_axis, y_axis, category=None, chart_name="散点图", **kwargs):
         """
         生成散点图
@@ -44,16 +79,9 @@ class ChartUtils:
         :param y_axis: Y轴字段名列表
         :param category: 分类字段名（可选）
         :param chart_name: 图表名称
-        :return: 图表文件路径
+        :return: 图表对象（Figure）
         """
         try:
-            # 设置中文字体
-            plt.rcParams['font.sans-serif'] = ['SimHei', 'Arial Unicode MS', 'DejaVu Sans']
-            plt.rcParams['axes.unicode_minus'] = False
-
-            # 创建图表
-            plt.figure(figsize=(12, 8))
-
             # 检查数据列是否存在
             if x_axis not in data.columns:
                 raise ValueError(f"X轴字段 '{x_axis}' 不存在于数据中")
@@ -64,7 +92,7 @@ class ChartUtils:
                 if y_field in data.columns:
                     y_columns.append(y_field)
                 else:
-                    print(f"警告: Y轴字段 '{y_field}' 不存在于数据中，已跳过")
+                    logger.warning("警告: Y轴字段 '%s' 不存在于数据中，已跳过", y_field)
 
             if not y_columns:
                 raise ValueError("没有有效的Y轴字段")
@@ -80,42 +108,46 @@ class ChartUtils:
             if plot_data.empty:
                 raise ValueError("清理后的数据为空，无法生成图表")
 
+            # 创建图表
+            fig, ax = _new_figure()
+
             # 生成散点图
             if category and category in plot_data.columns:
                 # 按分类字段分组绘制
                 categories = plot_data[category].unique()
-                colors = plt.cm.Set3(np.linspace(0, 1, len(categories)))
+                colors = mpl.colormaps['Set3'](np.linspace(0, 1, len(categories)))
 
                 for i, cat in enumerate(categories):
                     cat_data = plot_data[plot_data[category] == cat]
                     for y_col in y_columns:
-                        plt.scatter(cat_data[x_axis], cat_data[y_col],
-                                    c=[colors[i]], label=f'{cat}-{y_col}',
-                                    alpha=0.7, s=60, edgecolors='w', linewidth=0.5)
+                        ax.scatter(cat_data[x_axis], cat_data[y_col],
+                                   c=[colors[i]], label=f'{cat}-{y_col}',
+                                   alpha=0.7, s=60, edgecolors='w', linewidth=0.5)
             else:
                 # 不分类，直接绘制
                 for y_col in y_columns:
-                    plt.scatter(plot_data[x_axis], plot_data[y_col],
-                                label=y_col, alpha=0.7, s=60, edgecolors='w', linewidth=0.5)
+                    ax.scatter(plot_data[x_axis], plot_data[y_col],
+                               label=y_col, alpha=0.7, s=60, edgecolors='w', linewidth=0.5)
 
             # 设置图表属性
-            plt.xlabel(x_axis, fontsize=12)
-            plt.ylabel('值', fontsize=12)
-            plt.title(f'{chart_name}\nX轴: {x_axis}, Y轴: {", ".join(y_columns)}', fontsize=14)
-            plt.legend()
-            plt.grid(True, alpha=0.3)
+            ax.set_xlabel(x_axis, fontsize=12)
+            ax.set_ylabel('值', fontsize=12)
+            ax.set_title(f'{chart_name}\nX轴: {x_axis}, Y轴: {", ".join(y_columns)}', fontsize=14)
+            ax.legend()
+            ax.grid(True, alpha=0.3)
 
             # 自动调整刻度标签
-            plt.xticks(rotation=45)
-            plt.tight_layout()
+            ax.tick_params(axis='x', labelrotation=45)
+            fig.tight_layout()
 
-            return plt
+            return fig
 
         except Exception as e:
-            print(f"生成散点图时出错: {str(e)}")
+            logger.warning("生成散点图时出错: %s", e)
             raise
 
     @staticmethod
+    @timed_stage('chart_plot')
     def line_chart(data, x_axis, y_axis, category=None, chart_name="折线图", **kwargs):
         """
         生成折线图（修复版）
@@ -127,17 +159,6 @@ class ChartUtils:
         :return: 图表对象
         """
         try:
-            import numpy as np
-            import pandas as pd
-            import matplotlib.pyplot as plt
-
-            # 设置中文字体
-            plt.rcParams['font.sans-serif'] = ['Arial Unicode MS', 'SimHei', 'DejaVu Sans']
-            plt.rcParams['axes.unicode_minus'] = False
-
-            # 创建图表
-            plt.figure(figsize=(12, 8))
-
             # 检查数据列是否存在
             required_columns = [x_axis] + y_axis
             if category:
@@ -155,10 +176,13 @@ class ChartUtils:
             # 对X轴数据进行排序（折线图需要有序的X轴）
             plot_data = plot_data.sort_values(by=x_axis)
 
+            # 创建图表
+            fig, ax = _new_figure()
+
             # 显式转换为numpy数组避免多维索引问题
             if category:
                 categories = plot_data[category].unique()
-                colors = plt.cm.Set3(np.linspace(0, 1, len(categories)))
+                colors = mpl.colormaps['Set3'](np.linspace(0, 1, len(categories)))
 
                 for i, cat in enumerate(categories):
                     cat_data = plot_data[plot_data[category] == cat]
@@ -166,48 +190,47 @@ class ChartUtils:
 
                     for y_col in y_axis:
                         y_values = cat_data[y_col].to_numpy()  # 显式转换为numpy数组
-                        plt.plot(x_values, y_values,
-                                 color=colors[i],
-                                 marker='o',
-                                 markersize=4,
-                                 linewidth=2,
-                                 label=f'{cat}-{y_col}' if len(y_axis) > 1 else f'{cat}')
+                        ax.plot(x_values, y_values,
+                                color=colors[i],
+                                marker='o',
+                                markersize=4,
+                                linewidth=2,
+                                label=f'{cat}-{y_col}' if len(y_axis) > 1 else f'{cat}')
             else:
                 x_values = plot_data[x_axis].to_numpy()  # 显式转换为numpy数组
-                colors = plt.cm.tab10(np.linspace(0, 1, len(y_axis)))
+                colors = mpl.colormaps['tab10'](np.linspace(0, 1, len(y_axis)))
 
                 for i, y_col in enumerate(y_axis):
                     y_values = plot_data[y_col].to_numpy()  # 显式转换为numpy数组
-                    plt.plot(x_values, y_values,
-                             color=colors[i],
-                             marker='o',
-                             markersize=4,
-                             linewidth=2,
-                             label=y_col)
+                    ax.plot(x_values, y_values,
+                            color=colors[i],
+                            marker='o',
+                            markersize=4,
+                            linewidth=2,
+                            label=y_col)
 
             # 设置图表属性
-            plt.xlabel(x_axis, fontsize=12)
-            plt.ylabel('值', fontsize=12)
-            plt.title(f'{chart_name}\nX轴: {x_axis}, Y轴: {", ".join(y_axis)}', fontsize=14)
-            plt.legend()
-            plt.grid(True, alpha=0.3)
+            ax.set_xlabel(x_axis, fontsize=12)
+            ax.set_ylabel('值', fontsize=12)
+            ax.set_title(f'{chart_name}\nX轴: {x_axis}, Y轴: {", ".join(y_axis)}', fontsize=14)
+            ax.legend()
+            ax.grid(True, alpha=0.3)
 
             # 自动调整刻度标签
+            ax.tick_params(axis='x', labelrotation=45)
             if pd.api.types.is_datetime64_any_dtype(plot_data[x_axis]):
-                plt.xticks(rotation=45)
-                plt.gcf().autofmt_xdate()
-            else:
-                plt.xticks(rotation=45)
+                fig.autofmt_xdate()
 
-            plt.tight_layout()
-            return plt
+            fig.tight_layout()
+            return fig
 
         except Exception as e:
-            print(f"生成折线图时出错: {str(e)}")
+            logger.warning("生成折线图时出错: %s", e)
             raise
 
     @staticmethod
-    def save_chart(plt, project_id, chart_type_name, chart_name, chart_id):
+    @timed_stage('chart_render')
+    def save_chart(fig, project_id, chart_type_name, chart_name, chart_id):
         """
         保存图表到指定路径
         """
@@ -221,12 +244,12 @@ class ChartUtils:
             filepath = os.path.join(save_dir, filename)
 
             # 保存图表
-            plt.savefig(filepath, dpi=300, bbox_inches='tight', format='png')
-            plt.close()
+            # Figure 不在 pyplot 中登记，保存后随引用释放，无需 close
+            fig.savefig(filepath, dpi=300, bbox_inches='tight', format='png')
 
-            print(f"图表已保存到: {filepath}")
+            logger.info("图表已保存到: %s", filepath)
             return filepath
 
         except Exception as e:
-            print(f"保存图表时出错: {str(e)}")
+            logger.warning("保存图表时出错: %s", e)
             raise
\ No newline at end of file
@@ -0,0 +1,96 @@
+"""
+CSV/TSV 导入
+
+传感器导出的CSV/TSV/TXT直接用pandas解析（安装了可选依赖pyarrow时使用其多线程解析器，否则用C解析器一次读取），
+不需要用户先转换为Excel再由openpyxl逐个单元格解析。
+"""
+import codecs
+import csv
+import logging
+import os
+
+from app.core.metrics import timed_stage
+from app.core.utils import lazy_import
+from app.Utils.excel_writer import unique_sheet_name
+
+pd = lazy_import('pandas')
+
+logger = logging.getLogger(__name__)
+
+CSV_EXTENSIONS = ('.csv', '.tsv', '.txt')
+# Excel单个页签的最大行数（含表头）
+EXCEL_MAX_ROWS = 1048576
+
+
+def _has_pyarrow():
+    try:
+        import pyarrow.csv  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class CsvUtils:
+    """CSV/TSV 文件解析工具类"""
+
+    @staticmethod
+    def is_csv_file(filename):
+        return (filename or '').lower().endswith(CSV_EXTENSIONS)
+
+    @staticmethod
+    def detect_encoding(file_path, sample_size=64 * 1024):
+        """
+        检测文件编码：带BOM的UTF-8、UTF-8，否则按GB18030（兼容GBK/GB2312，国产设备导出的CSV多为GBK）
+        """
+        with open(file_path, 'rb') as f:
+            sample = f.read(sample_size)
+        if sample.startswith(codecs.BOM_UTF8):
+            return 'utf-8-sig'
+        try:
+            # 采样可能截断在多字节字符中间，使用增量解码且不要求结尾完整
+            codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+            return 'utf-8'
+        except UnicodeDecodeError:
+            return 'gb18030'
+
+    @staticmethod
+    def detect_delimiter(file_path, encoding, sample_size=64 * 1024):
+        """.tsv 使用制表符，其余根据前几行推断（逗号/制表符/分号/竖线），推断失败时使用逗号"""
+        if file_path.lower().endswith('.tsv'):
+            return '\t'
+        with open(file_path, 'r', encoding=encoding, errors='replace', newline='') as f:
+            sample = f.read(sample_size)
+        # 只用完整的行推断，避免最后半行干扰
+        if '\n' in sample:
+            sample = sample[:sample.rindex('\n')]
+        try:
+            return csv.Sniffer().sniff(sample, delimiters=',\t;|').delimiter
+        except csv.Error:
+            return ','
+
+    @staticmethod
+    def table_name(filename, existing=()):
+        """由文件名生成合法且不重复的页签名"""
+        return unique_sheet_name(os.path.splitext(os.path.basename(filename or ''))[0], existing)
+
+    @classmethod
+    @timed_stage('csv_read')
+    def read_csv(cls, file_path, encoding=None, delimiter=None):
+        """
+        读取CSV/TSV/TXT为DataFrame，编码和分隔符未指定时自动检测
+
+        超过Excel页签行数上限时抛出 ValueError
+        """
+        encoding = encoding or cls.detect_encoding(file_path)
+        delimiter = delimiter or cls.detect_delimiter(file_path, encoding)
+        logger.debug("读取CSV %s: 编码=%s, 分隔符=%r", file_path, encoding, delimiter)
+
+        # 一次解析直接得到完整的DataFrame：分块读取再拼接时所有块和拼接结果同时在内存中，峰值约为两倍
+        if _has_pyarrow():
+            df = pd.read_csv(file_path, sep=delimiter, encoding=encoding, engine='pyarrow')
+        else:
+            df = pd.read_csv(file_path, sep=delimiter, encoding=encoding, low_memory=False)
+
+        if len(df) >= EXCEL_MAX_ROWS:
+            raise ValueError(f'数据行数 {len(df)} 超过Excel页签上限 {EXCEL_MAX_ROWS - 1}')
+        return df
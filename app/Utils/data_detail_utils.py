@@ -1,18 +1,27 @@
-import pandas as pd
+import logging
 
+from app.core.logger import brief
+from app.core.metrics import stage_timer, timed_stage
+from app.core.utils import lazy_import
 from app.Utils.FilsSystemUtils import FilsSystemUtils
+from app.Utils.excel_reader import ExcelReader
+from app.Utils.excel_writer import ExcelStreamWriter, UnsupportedWorkbookError, atomic_replace, frame_rows
+
+pd = lazy_import('pandas')
+
+logger = logging.getLogger(__name__)
 
 
 class ExcelExec:
     @classmethod
     def get_table_sheets(cls, file_path):
-        excel_file = pd.ExcelFile(file_path)
-        return excel_file.sheet_names
+        return ExcelReader.sheet_names(file_path)
 
     @classmethod
+    @timed_stage('excel_read')
     def get_table_sheet_columns(cls, file_path, sheet_name):
-        df = pd.read_excel(file_path, sheet_name=sheet_name)
-        return df.columns.values.tolist()
+        # 只读取表头行
+        return ExcelReader.columns(file_path, sheet_name)
 
     @classmethod
     def join_excels(cls, param_data, project_id, excel_file_path):
@@ -35,20 +44,20 @@ class ExcelExec:
         # 检查文件是否存在
         file_check_res = FilsSystemUtils.check_file_dir_exists(excel_file_path)
         if not file_check_res:
-            print("文件不存在")
+            logger.warning("文件不存在")
             return False
 
         # 检查目标表是否存在
         target_table = param_data.get('targetTableName')
         if not cls.check_table_sheets(excel_file_path, target_table):
-            print(f"目标表 {target_table} 不存在")
+            logger.warning("目标表 %s 不存在", target_table)
             return False
 
         # 检查源表是否存在
         source_tables = param_data.get('sourceTableNames', [])
         for sheet_name in source_tables:
             if not cls.check_table_sheets(excel_file_path, sheet_name):
-                print(f"源表 {sheet_name} 不存在")
+                logger.warning("源表 %s 不存在", sheet_name)
                 return False
 
         # 检查目标表的列是否存在
@@ -57,7 +66,7 @@ class ExcelExec:
             target_check, missing = cls.check_sheet_column(excel_file_path, target_table,
                                                            param_data.get('matchColumns'))
             if not target_check:
-                print(f"目标表 {target_table} 缺失列: {missing}")
+                logger.warning("目标表 %s 缺失列: %s", target_table, missing)
                 return False
 
         # 检查源表的列是否存在
@@ -65,14 +74,14 @@ class ExcelExec:
             if required_columns:
                 source_check, missing = cls.check_sheet_column(excel_file_path, sheet_name, required_columns)
                 if not source_check:
-                    print(f"源表 {sheet_name} 缺失列: {missing}")
+                    logger.warning("源表 %s 缺失列: %s", sheet_name, missing)
                     return False
 
         # 执行合并表
         try:
             return cls.merge_tables(excel_file_path, param_data)
         except Exception as e:
-            print(f"合并表格时出错: {str(e)}")
+            logger.warning("合并表格时出错: %s", e)
             return False
 
     @classmethod
@@ -88,26 +97,33 @@ class ExcelExec:
             bool: 合并成功返回True，否则返回False
         """
         try:
-            # 读取目标表
             target_table_name = param_data['targetTableName']
-            target_df = pd.read_excel(excel_file_path, sheet_name=target_table_name)
 
             # 获取匹配列和合并列配置
             match_columns = param_data.get('matchColumns', [])
             merge_columns_config = param_data.get('mergeColumns', [])
 
-            # 处理每个源表
-            for source_table_name in param_data.get('sourceTableNames', []):
-                # 读取源表
-                source_df = pd.read_excel(excel_file_path, sheet_name=source_table_name)
+            # 工作簿只打开一次，读取目标表和各源表（源表只读取匹配列和合并列，缺少的列由下面的检查报错）
+            source_tables = []
+            with ExcelReader.open(excel_file_path) as excel_file:
+                with stage_timer('excel_read'):
+                    target_df = excel_file.parse(target_table_name)
 
-                # 获取该源表需要合并的列
-                source_merge_columns = cls.get_merge_columns_for_table(merge_columns_config, source_table_name)
+                for source_table_name in param_data.get('sourceTableNames', []):
+                    # 获取该源表需要合并的列
+                    source_merge_columns = cls.get_merge_columns_for_table(merge_columns_config, source_table_name)
 
-                if not source_merge_columns:
-                    print(f"源表 {source_table_name} 没有配置需要合并的列")
-                    continue
+                    if not source_merge_columns:
+                        logger.debug("源表 %s 没有配置需要合并的列", source_table_name)
+                        continue
 
+                    wanted_columns = set(match_columns) | set(source_merge_columns)
+                    with stage_timer('excel_read'):
+                        source_df = excel_file.parse(source_table_name, usecols=lambda col: col in wanted_columns)
+                    source_tables.append((source_table_name, source_merge_columns, source_df))
+
+            # 处理每个源表
+            for source_table_name, source_merge_columns, source_df in source_tables:
                 # 检查匹配列是否存在
                 for col in match_columns:
                     if col not in target_df.columns:
@@ -121,18 +137,26 @@ class ExcelExec:
                         raise ValueError(f"源表 {source_table_name} 中不存在合并列: {col}")
 
                 # 执行合并
-                target_df = cls.perform_merge(target_df, source_df, match_columns, source_merge_columns,
-                                              source_table_name)
-
-            # 保存合并后的数据
-            with pd.ExcelWriter(excel_file_path, mode='a', if_sheet_exists='replace') as writer:
-                target_df.to_excel(writer, sheet_name=target_table_name, index=False)
-
-            print(f"表格合并完成，目标表: {target_table_name}")
+                with stage_timer('transform'):
+                    target_df = cls.perform_merge(target_df, source_df, match_columns, source_merge_columns,
+                                                  source_table_name)
+
+            # 保存合并后的数据：只重写目标表，其余页签按zip条目原样复制
+            with stage_timer('excel_write'):
+                try:
+                    ExcelStreamWriter.update(excel_file_path, [(target_table_name, frame_rows(target_df))])
+                except UnsupportedWorkbookError as e:
+                    logger.debug("无法增量更新工作簿(%s)，改用ExcelWriter追加模式", e)
+                    with atomic_replace(excel_file_path, copy=True) as temp_path, \
+                            pd.ExcelWriter(temp_path, engine='openpyxl', mode='a',
+                                           if_sheet_exists='replace') as writer:
+                        target_df.to_excel(writer, sheet_name=target_table_name, index=False)
+
+            logger.info("表格合并完成，目标表: %s", target_table_name)
             return True
 
         except Exception as e:
-            print(f"合并表格时出错: {str(e)}")
+            logger.warning("合并表格时出错: %s", e)
             return False
 
     @classmethod
@@ -185,8 +209,8 @@ class ExcelExec:
             suffixes=('', f'_{source_table_name}')
         )
 
-        print(f"从表 {source_table_name} 合并了 {len(merged_df)} 行数据")
-        print(f"合并的列: {list(renamed_columns.values())}")
+        logger.debug("从表 %s 合并了 %s 行数据", source_table_name, len(merged_df))
+        logger.debug("合并的列: %s", brief(list(renamed_columns.values())))
 
         return merged_df
 
@@ -203,12 +227,8 @@ class ExcelExec:
             bool: 如果工作表存在返回True，否则返回False
         """
         try:
-            # 使用ExcelFile读取文件但不加载数据
-            with pd.ExcelFile(excel_file_path) as xls:
-                # 检查工作表是否存在
-                if sheet_name in xls.sheet_names:
-                    return True
-                return False
+            # 只读取页签列表，不加载数据
+            return sheet_name in ExcelReader.sheet_names(excel_file_path)
         except FileNotFoundError:
             raise FileNotFoundError(f"Excel文件不存在: {excel_file_path}")
         except Exception as e:
@@ -229,11 +249,9 @@ class ExcelExec:
             list: 不存在的列名列表
         """
         try:
-            # 读取指定工作表
-            df = pd.read_excel(excel_file_path, sheet_name=sheet_name)
-
-            # 获取工作表中实际存在的列名
-            existing_columns = set(df.columns)
+            # 只读取指定工作表的表头行
+            with stage_timer('excel_read'):
+                existing_columns = set(ExcelReader.columns(excel_file_path, sheet_name))
 
             # 检查所有指定的列是否存在
             missing_columns = [col for col in columns if col not in existing_columns]
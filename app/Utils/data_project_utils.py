@@ -1,14 +1,48 @@
 # app/Utils/data_project_utils.py
 import os
 import json
-import pandas as pd
+import logging
 from datetime import datetime
 
+from app.core.metrics import timed_stage
+from app.core.utils import lazy_import
+from app.Utils.excel_reader import ExcelReader
+from app.Utils.excel_writer import SHEET_NAME_MAX_LENGTH, ExcelStreamWriter, frame_rows, sheet_name_error
+
+pd = lazy_import('pandas')
+
+logger = logging.getLogger(__name__)
+
 
 class DataProjectUtils:
     """数据项目工具类"""
 
     @staticmethod
+    def workbook_sheet_rows(workbook_data):
+        """
+        前端工作簿数据 {'sheets': [{'name', 'columns', 'rows'}]} -> [(页签名, 行迭代器)]，供 ExcelStreamWriter 逐行写入
+
+        行数据中的键是列索引的字符串（前端存储的格式），空字符串按空单元格写入
+        """
+        for sheet in workbook_data.get('sheets', []):
+            sheet_name = sheet.get('name', 'Sheet1')[:SHEET_NAME_MAX_LENGTH]  # 限制sheet名称长度
+            columns = sheet.get('columns', [])
+            rows = sheet.get('rows', [])
+            logger.debug("已转换表格: %s -> 行数: %s, 列数: %s", sheet_name, len(rows), len(columns))
+
+            def sheet_rows(columns=columns, rows=rows):
+                # 没有列时为空的工作表
+                if not columns:
+                    return
+                yield [col.get('name', f'列{i + 1}') for i, col in enumerate(columns)]
+                keys = [str(i) for i in range(len(columns))]
+                for row in rows:
+                    yield [None if row.get(key, '') == '' else row.get(key) for key in keys]
+
+            yield sheet_name, sheet_rows()
+
+    @staticmethod
+    @timed_stage('excel_write')
     def convert_json_to_excel(json_file_path, excel_file_path):
         """将JSON数据转换为Excel文件"""
         try:
@@ -16,58 +50,29 @@ class DataProjectUtils:
             with open(json_file_path, 'r', encoding='utf-8') as f:
                 workbook_data = json.load(f)
 
-            # 创建Excel写入器
-            with pd.ExcelWriter(excel_file_path, engine='openpyxl') as writer:
-                for sheet in workbook_data.get('sheets', []):
-                    sheet_name = sheet.get('name', 'Sheet1')
-                    columns = sheet.get('columns', [])
-                    rows = sheet.get('rows', [])
-
-                    # 如果没有数据，创建空的工作表
-                    if not columns and not rows:
-                        df = pd.DataFrame()
-                    else:
-                        # 提取列名
-                        headers = [col.get('name', f'列{i + 1}') for i, col in enumerate(columns)]
-
-                        # 准备数据行
-                        data_rows = []
-                        for row in rows:
-                            # 按照列的顺序提取数据
-                            row_data = []
-                            for i, col in enumerate(columns):
-                                # 使用列索引作为键来获取单元格值
-                                cell_value = row.get(str(i), '')  # 注意：前端存储的键是字符串
-                                row_data.append(cell_value)
-                            data_rows.append(row_data)
-
-                        # 创建DataFrame
-                        df = pd.DataFrame(data_rows, columns=headers)
-
-                    # 写入Excel
-                    df.to_excel(writer, sheet_name=sheet_name[:31], index=False)  # 限制sheet名称长度
-
-                    print(f"已转换表格: {sheet_name} -> 行数: {len(rows)}, 列数: {len(columns)}")
-
-            print(f"Excel文件已保存: {excel_file_path}")
+            # 逐行流式写入，不在内存中构建DataFrame和openpyxl工作簿
+            ExcelStreamWriter.write(excel_file_path, DataProjectUtils.workbook_sheet_rows(workbook_data))
+
+            logger.info("Excel文件已保存: %s", excel_file_path)
 
         except Exception as e:
-            print(f"转换文件时发生错误: {str(e)}")
+            logger.warning("转换文件时发生错误: %s", e)
             raise
 
     @staticmethod
+    @timed_stage('excel_read')
     def convert_excel_to_json(excel_file_path):
         """将Excel文件转换为JSON格式数据"""
         try:
-            print(f"开始转换Excel文件为JSON: {excel_file_path}")
+            logger.debug("开始转换Excel文件为JSON: %s", excel_file_path)
 
             # 读取Excel文件中的所有sheet
-            excel_data = pd.read_excel(excel_file_path, sheet_name=None, engine='openpyxl')
+            excel_data = ExcelReader.read(excel_file_path, sheet_name=None)
 
             sheets_data = []
 
             for sheet_name, df in excel_data.items():
-                print(f"处理工作表: {sheet_name}")
+                logger.debug("处理工作表: %s", sheet_name)
 
                 # 处理列数据
                 columns = []
@@ -95,7 +100,7 @@ class DataProjectUtils:
                 }
 
                 sheets_data.append(sheet_data)
-                print(f"工作表 {sheet_name} 转换完成: {len(columns)} 列, {len(rows)} 行")
+                logger.debug("工作表 %s 转换完成: %s 列, %s 行", sheet_name, len(columns), len(rows))
 
             # 从文件名提取工作簿名称
             workbook_name = os.path.splitext(os.path.basename(excel_file_path))[0]
@@ -107,11 +112,11 @@ class DataProjectUtils:
                 'sheets': sheets_data
             }
 
-            print(f"Excel文件转换完成: 共 {len(sheets_data)} 个工作表")
+            logger.info("Excel文件转换完成: 共 %s 个工作表", len(sheets_data))
             return workbook_data
 
         except Exception as e:
-            print(f"转换Excel文件为JSON时发生错误: {str(e)}")
+            logger.warning("转换Excel文件为JSON时发生错误: %s", e)
             raise
 
     @staticmethod
@@ -120,11 +125,11 @@ class DataProjectUtils:
         try:
             if os.path.exists(json_file_path):
                 os.remove(json_file_path)
-                print(f"已清理JSON文件: {json_file_path}")
+                logger.debug("已清理JSON文件: %s", json_file_path)
                 return True
             return False
         except Exception as e:
-            print(f"清理JSON文件失败: {str(e)}")
+            logger.warning("清理JSON文件失败: %s", e)
             return False
 
     @staticmethod
@@ -147,6 +152,18 @@ class DataProjectUtils:
             if 'rows' not in sheet:
                 return False, f"第{i + 1}个sheet缺少rows字段"
 
+        # 页签名按写入时的规则截断后校验：非法字符、空名称、重复（Excel不区分大小写）
+        sheet_names = set()
+        for i, sheet in enumerate(data.get('sheets', [])):
+            name = sheet['name'][:SHEET_NAME_MAX_LENGTH] if isinstance(sheet['name'], str) else sheet['name']
+            error = sheet_name_error(name)
+            if error:
+                return False, f"第{i + 1}个sheet的{error}"
+            if name.casefold() in sheet_names:
+                return False, (f"第{i + 1}个sheet的名称与其他sheet重复"
+                               f"（截断为{SHEET_NAME_MAX_LENGTH}个字符、不区分大小写）: {name}")
+            sheet_names.add(name.casefold())
+
         return True, "验证通过"
 
     @staticmethod
@@ -163,7 +180,8 @@ class DataProjectUtils:
             if not os.path.exists(project_dir):
                 return None
 
-            excel_files = [f for f in os.listdir(project_dir) if f.endswith('.xlsx')]
+            # 跳过 . 开头的写入中的临时文件（见 excel_writer.atomic_replace）
+            excel_files = [f for f in os.listdir(project_dir) if f.endswith('.xlsx') and not f.startswith('.')]
             if not excel_files:
                 return None
 
@@ -172,49 +190,30 @@ class DataProjectUtils:
             return os.path.join(project_dir, latest_file)
 
         except Exception as e:
-            print(f"获取最新Excel文件时出错: {str(e)}")
+            logger.warning("获取最新Excel文件时出错: %s", e)
             return None
 
     @staticmethod
+    @timed_stage('excel_write')
+    def write_frames_to_excel(frames, excel_file_path):
+        """将 {页签名: DataFrame} 写入Excel文件（先写同目录临时文件再替换，读取方不会看到写了一半的文件）"""
+        written = ExcelStreamWriter.write(excel_file_path,
+                                          ((sheet_name, frame_rows(df)) for sheet_name, df in frames.items()))
+        logger.debug("已写入页签: %s", written)
+        logger.info("Excel文件已保存: %s", excel_file_path)
+        return True
+
+    @staticmethod
+    @timed_stage('excel_write')
     def convert_dict_to_excel(workbook_dict, excel_file_path):
         """将字典数据直接转换为Excel文件"""
         try:
-            # 创建Excel写入器
-            with pd.ExcelWriter(excel_file_path, engine='openpyxl') as writer:
-                for sheet in workbook_dict.get('sheets', []):
-                    sheet_name = sheet.get('name', 'Sheet1')
-                    columns = sheet.get('columns', [])
-                    rows = sheet.get('rows', [])
-
-                    # 如果没有数据，创建空的工作表
-                    if not columns and not rows:
-                        df = pd.DataFrame()
-                    else:
-                        # 提取列名
-                        headers = [col.get('name', f'列{i + 1}') for i, col in enumerate(columns)]
-
-                        # 准备数据行
-                        data_rows = []
-                        for row in rows:
-                            # 按照列的顺序提取数据
-                            row_data = []
-                            for i, col in enumerate(columns):
-                                # 使用列索引作为键来获取单元格值
-                                cell_value = row.get(str(i), '')  # 注意：前端存储的键是字符串
-                                row_data.append(cell_value)
-                            data_rows.append(row_data)
-
-                        # 创建DataFrame
-                        df = pd.DataFrame(data_rows, columns=headers)
-
-                    # 写入Excel
-                    df.to_excel(writer, sheet_name=sheet_name[:31], index=False)  # 限制sheet名称长度
-
-                    print(f"已转换表格: {sheet_name} -> 行数: {len(rows)}, 列数: {len(columns)}")
-
-            print(f"Excel文件已保存: {excel_file_path}")
+            # 逐行流式写入，不在内存中构建DataFrame和openpyxl工作簿
+            ExcelStreamWriter.write(excel_file_path, DataProjectUtils.workbook_sheet_rows(workbook_dict))
+
+            logger.info("Excel文件已保存: %s", excel_file_path)
             return True
 
         except Exception as e:
-            print(f"转换字典数据到Excel时发生错误: {str(e)}")
+            logger.warning("转换字典数据到Excel时发生错误: %s", e)
             raise
@@ -0,0 +1,96 @@
+"""
+Excel 读取引擎选择
+
+所有读取工作簿的地方（convert_excel_to_json、ExcelExec、表头/图表接口、导入）都通过 ExcelReader，
+由 EXCEL_READER_ENGINE 决定 pandas 使用的引擎：
+
+- calamine：Rust 实现（python-calamine），解析整张工作表比 openpyxl 快数倍，但总是解析完整的工作表
+- openpyxl：pandas 以 read_only 模式逐行读取，只取前几行（表头、样例数据）时只解析这几行
+- auto（默认）：只读前 EXCEL_READER_STREAM_ROWS 行时用 openpyxl；文件不小于 EXCEL_READER_CALAMINE_MIN_KB
+  且安装了 python-calamine 时用 calamine；其余用 openpyxl。.xls 优先 calamine，否则交给 pandas 默认引擎（xlrd）
+
+引擎对比见 test/test_benchmark/bench_excel_readers.py。
+"""
+import importlib.util
+import logging
+import os
+from functools import lru_cache
+
+from app.core.config import config
+from app.core.utils import lazy_import
+
+pd = lazy_import('pandas')
+
+logger = logging.getLogger(__name__)
+
+ENGINES = ('auto', 'calamine', 'openpyxl')
+OPENPYXL_EXTENSIONS = ('.xlsx', '.xlsm')
+
+
+@lru_cache(maxsize=None)
+def engine_available(engine):
+    """引擎依赖是否已安装（只检查不导入）"""
+    module = {'calamine': 'python_calamine', 'openpyxl': 'openpyxl'}.get(engine, engine)
+    return importlib.util.find_spec(module) is not None
+
+
+class ExcelReader:
+    """按文件大小和读取方式选择 pandas 读取引擎"""
+
+    @staticmethod
+    def select_engine(file_path, nrows=None, engine=None):
+        """
+        返回 pandas 的 engine 参数（None 表示 pandas 默认引擎）
+
+        参数:
+            nrows: 只读取的行数，None 表示读取整张工作表
+            engine: 指定引擎，默认使用配置 EXCEL_READER_ENGINE
+        """
+        engine = engine or getattr(config, 'EXCEL_READER_ENGINE', 'auto')
+        if engine not in ENGINES:
+            raise ValueError(f"不支持的Excel读取引擎: {engine}")
+        is_openpyxl_format = str(file_path).lower().endswith(OPENPYXL_EXTENSIONS)
+
+        if engine == 'calamine':
+            return 'calamine'
+        if engine == 'openpyxl':
+            return 'openpyxl' if is_openpyxl_format else None
+
+        calamine = engine_available('calamine')
+        if not is_openpyxl_format:
+            return 'calamine' if calamine else None
+        if nrows is not None and nrows <= getattr(config, 'EXCEL_READER_STREAM_ROWS', 100):
+            return 'openpyxl'
+        if calamine:
+            try:
+                size_kb = os.path.getsize(file_path) / 1024
+            except OSError:
+                size_kb = 0
+            if size_kb >= getattr(config, 'EXCEL_READER_CALAMINE_MIN_KB', 64):
+                return 'calamine'
+        return 'openpyxl'
+
+    @classmethod
+    def read(cls, file_path, sheet_name=0, nrows=None, engine=None, **kwargs):
+        """读取工作表，参数同 pd.read_excel；sheet_name=None 时返回 {页签名: DataFrame}"""
+        selected = cls.select_engine(file_path, nrows, engine)
+        logger.debug("读取Excel %s (sheet=%s, nrows=%s) 使用引擎 %s", file_path, sheet_name, nrows, selected)
+        return pd.read_excel(file_path, sheet_name=sheet_name, nrows=nrows, engine=selected, **kwargs)
+
+    @classmethod
+    def open(cls, file_path, nrows=None, engine=None):
+        """
+        打开工作簿用于读取多个页签（pd.ExcelFile，支持 with），nrows 为之后每次 parse 预计读取的行数
+        """
+        return pd.ExcelFile(file_path, engine=cls.select_engine(file_path, nrows, engine))
+
+    @classmethod
+    def sheet_names(cls, file_path, engine=None):
+        """页签名列表（不解析单元格）"""
+        with cls.open(file_path, nrows=0, engine=engine) as excel_file:
+            return list(excel_file.sheet_names)
+
+    @classmethod
+    def columns(cls, file_path, sheet_name, engine=None):
+        """页签的列名（只读取表头行）"""
+        return cls.read(file_path, sheet_name=sheet_name, nrows=0, engine=engine).columns.tolist()
@@ -0,0 +1,491 @@
+"""
+流式写入 Excel
+
+pd.ExcelWriter（openpyxl）先在内存中构建整个工作簿的对象树再保存，内存与工作簿大小成正比；
+追加/替换页签时还要先把整个现有工作簿加载进来。ExcelStreamWriter 直接按行生成工作表XML并写入zip：
+
+- write：新建工作簿，逐行写入（字符串使用内联字符串，不需要在内存中维护共享字符串表）
+- update：替换同名页签、追加新页签，其余页签按zip条目原样流式复制，不解析其内容
+
+两者都通过 atomic_replace 先写到同目录的临时文件再原子替换目标文件，读取方不会看到写了一半的文件。
+内存占用只与写缓冲区（WRITE_BUFFER_SIZE）、页签暂存（SHEET_SPOOL_MEMORY，超出后转存临时文件）和单行数据有关，
+与工作簿大小无关。
+"""
+import logging
+import os
+import re
+import shutil
+import tempfile
+import zipfile
+from contextlib import contextmanager
+from datetime import date, datetime, time, timedelta
+from numbers import Number
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape, quoteattr, unescape
+
+logger = logging.getLogger(__name__)
+
+MAIN_NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+REL_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+PACKAGE_REL_NS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+CONTENT_TYPES_NS = 'http://schemas.openxmlformats.org/package/2006/content-types'
+WORKSHEET_REL_TYPE = REL_NS + '/worksheet'
+CALC_CHAIN_REL_TYPE = REL_NS + '/calcChain'
+WORKSHEET_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml'
+
+# 与 pandas 写入日期时的格式一致
+DATETIME_FORMAT = 'YYYY-MM-DD HH:MM:SS'
+DATE_FORMAT = 'YYYY-MM-DD'
+EXCEL_EPOCH = datetime(1899, 12, 30)
+
+WRITE_BUFFER_SIZE = 256 * 1024
+# 单个页签的sheetData先暂存再写入（<dimension> 要写在 sheetData 之前），超过该大小时转存到临时文件
+SHEET_SPOOL_MEMORY = 4 * 1024 * 1024
+ZIP64_LIMIT = (1 << 31) - 1
+ILLEGAL_XML_CHARS = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f]')
+# Excel页签名的限制：1~31个字符，不能包含 []:*?/\，不能以单引号开头或结尾，History 为保留名；比较时不区分大小写
+SHEET_NAME_MAX_LENGTH = 31
+SHEET_NAME_INVALID_CHARS = re.compile(r'[\[\]:*?/\\]')
+SHEET_NAME_RESERVED = 'history'
+
+CONTENT_TYPES_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '{overrides}</Types>'
+)
+ROOT_RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/'
+    'officeDocument" Target="xl/workbook.xml"/></Relationships>'
+)
+# 新建工作簿的样式：0 默认，1 日期时间，2 日期
+STYLES_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    f'<styleSheet xmlns="{MAIN_NS}">'
+    f'<numFmts count="2"><numFmt numFmtId="164" formatCode="{DATETIME_FORMAT}"/>'
+    f'<numFmt numFmtId="165" formatCode="{DATE_FORMAT}"/></numFmts>'
+    '<fonts count="1"><font><sz val="11"/><name val="Calibri"/><family val="2"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="3"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="165" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+
+
+class UnsupportedWorkbookError(Exception):
+    """现有工作簿的结构无法按zip条目增量更新（调用方可退回 pd.ExcelWriter）"""
+
+
+def sheet_name_error(name):
+    """页签名不合法时返回原因，合法时返回 None"""
+    if not isinstance(name, str) or not name.strip():
+        return '页签名不能为空'
+    if len(name) > SHEET_NAME_MAX_LENGTH:
+        return f'页签名 {name} 超过{SHEET_NAME_MAX_LENGTH}个字符'
+    if SHEET_NAME_INVALID_CHARS.search(name):
+        return f'页签名 {name} 不能包含 [ ] : * ? / \\ 字符'
+    if name.startswith("'") or name.endswith("'"):
+        return f'页签名 {name} 不能以单引号开头或结尾'
+    if name.casefold() == SHEET_NAME_RESERVED:
+        return f'页签名 {name} 是Excel保留名称'
+    return None
+
+
+def unique_sheet_name(name, existing=()):
+    """将任意字符串整理为合法、且与 existing 不重复（不区分大小写）的页签名：替换非法字符、截断、追加 _1、_2…"""
+    name = SHEET_NAME_INVALID_CHARS.sub('_', name or '').strip()
+    name = name[:SHEET_NAME_MAX_LENGTH].strip().strip("'") or 'Sheet'
+    if name.casefold() == SHEET_NAME_RESERVED:
+        name += '_'
+    taken = {sheet_name.casefold() for sheet_name in existing}
+    candidate, counter = name, 1
+    while candidate.casefold() in taken:
+        suffix = f'_{counter}'
+        candidate = name[:SHEET_NAME_MAX_LENGTH - len(suffix)] + suffix
+        counter += 1
+    return candidate
+
+
+def _check_sheet_name(name, taken):
+    """写入前校验页签名，taken 为已写入页签名的 casefold 集合"""
+    error = sheet_name_error(name)
+    if error:
+        raise ValueError(error)
+    if name.casefold() in taken:
+        raise ValueError(f'页签重复: {name}')
+    taken.add(name.casefold())
+
+
+def frame_rows(df):
+    """DataFrame -> 表头行 + 逐行数据（不复制整个DataFrame）"""
+    yield [str(column) for column in df.columns]
+    yield from df.itertuples(index=False, name=None)
+
+
+def _column_letter(index):
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def _cell_xml(ref, value, styles):
+    """单元格XML，空值返回空字符串（不写入单元格）"""
+    if value is None:
+        return ''
+    if isinstance(value, str):
+        if not value:
+            return ''
+        if value.startswith('=') and len(value) > 1:
+            # 与 openpyxl 一致：以 = 开头的字符串作为公式写入
+            return f'<c r="{ref}"><f>{escape(ILLEGAL_XML_CHARS.sub("", value[1:]))}</f></c>'
+        text = escape(ILLEGAL_XML_CHARS.sub('', value))
+        space = ' xml:space="preserve"' if text != text.strip() else ''
+        return f'<c r="{ref}" t="inlineStr"><is><t{space}>{text}</t></is></c>'
+    if getattr(value, 'dtype', None) is not None and value.dtype.kind == 'b' or isinstance(value, bool):
+        return f'<c r="{ref}" t="b"><v>{int(bool(value))}</v></c>'
+    if value != value:  # NaN / NaT
+        return ''
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            raise ValueError('Excel不支持带时区的时间，请先转换为本地时间')
+        serial = (value - EXCEL_EPOCH) / timedelta(days=1)
+        return f'<c r="{ref}" s="{styles["datetime"]}"><v>{serial!r}</v></c>'
+    if isinstance(value, date):
+        return f'<c r="{ref}" s="{styles["date"]}"><v>{(value - EXCEL_EPOCH.date()).days}</v></c>'
+    if isinstance(value, Number) and not isinstance(value, complex):
+        if isinstance(value, float) or getattr(value, 'dtype', None) is not None and value.dtype.kind == 'f':
+            value = float(value)
+            if value in (float('inf'), float('-inf')):
+                return _cell_xml(ref, 'inf' if value > 0 else '-inf', styles)
+            return f'<c r="{ref}"><v>{value!r}</v></c>'
+        return f'<c r="{ref}"><v>{value}</v></c>'
+    if isinstance(value, time):
+        return _cell_xml(ref, value.isoformat(), styles)
+    return _cell_xml(ref, str(value), styles)
+
+
+def _write_sheet(handle, rows, styles):
+    """
+    把行数据写成工作表XML，按 WRITE_BUFFER_SIZE 分批写入，返回行数（含表头）
+
+    <dimension>（已用区域，openpyxl 只读模式据此得到 max_row/max_column）必须位于 <sheetData> 之前，
+    而行数和列数写完才知道，因此 sheetData 先写入暂存文件，再依次写出 dimension 和 sheetData
+    """
+    with tempfile.SpooledTemporaryFile(max_size=SHEET_SPOOL_MEMORY) as body:
+        buffer, buffered = [], 0
+        letters = []
+        count = 0
+        for count, row in enumerate(rows, start=1):
+            while len(letters) < len(row):
+                letters.append(_column_letter(len(letters)))
+            cells = ''.join(_cell_xml(f'{letters[i]}{count}', value, styles) for i, value in enumerate(row))
+            buffer.append(f'<row r="{count}">{cells}</row>')
+            buffered += len(buffer[-1])
+            if buffered >= WRITE_BUFFER_SIZE:
+                body.write(''.join(buffer).encode('utf-8'))
+                buffer, buffered = [], 0
+        body.write(''.join(buffer).encode('utf-8'))
+
+        dimension = f'A1:{letters[-1]}{count}' if count and letters else 'A1'
+        handle.write(f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                     f'<worksheet xmlns="{MAIN_NS}" xmlns:r="{REL_NS}"><dimension ref="{dimension}"/>'
+                     f'<sheetData>'.encode('utf-8'))
+        body.seek(0)
+        shutil.copyfileobj(body, handle, WRITE_BUFFER_SIZE)
+        handle.write(b'</sheetData></worksheet>')
+    return count
+
+
+def _xml_attr(element, name):
+    """开始标签中的属性值（属性值可以用双引号或单引号）"""
+    match = re.search(r'(?:^|\s)' + re.escape(name) + r'\s*=\s*(?:"([^"]*)"|\'([^\']*)\')', element)
+    if not match:
+        return None
+    value = match.group(1) if match.group(1) is not None else match.group(2)
+    return unescape(value, {'&quot;': '"', '&apos;': "'"})
+
+
+def _append_child(xml, parent_tag, child_tag, child_xml):
+    """在 <parent_tag> 末尾追加子元素并更新count，返回 (新xml, 子元素序号)"""
+    match = re.search(rf'<{parent_tag}\b[^>]*?(/?)>', xml)
+    if not match:
+        raise UnsupportedWorkbookError(f'styles.xml 中缺少 {parent_tag}')
+    if match.group(1):
+        # 自闭合的空元素，如 <numFmts count="0" />
+        return xml[:match.start()] + f'<{parent_tag} count="1">{child_xml}</{parent_tag}>' + xml[match.end():], 0
+    end = xml.index(f'</{parent_tag}>', match.end())
+    index = len(re.findall(rf'<{child_tag}[\s/>]', xml[match.end():end]))
+    opening = re.sub(r'\scount\s*=\s*(["\'])\d+\1', '', match.group(0)[:-1]) + f' count="{index + 1}">'
+    return xml[:match.start()] + opening + xml[match.end():end] + child_xml + xml[end:], index
+
+
+def _cell_xfs(styles_xml):
+    """cellXfs 中各 xf 的开始标签（按序号排列）"""
+    match = re.search(r'<cellXfs\b[^>]*?(/?)>', styles_xml)
+    if not match or match.group(1):
+        return []
+    end = styles_xml.index('</cellXfs>', match.end())
+    return re.findall(r'<xf\b[^>]*>', styles_xml[match.end():end])
+
+
+def _find_number_style(styles_xml, format_code):
+    """
+    查找已有的数字格式，返回 (numFmtId, xf序号)：没有该格式时均为 None；
+    有格式但没有引用它的默认字体/填充/边框的 xf 时，xf序号为 None
+    """
+    for element in re.findall(r'<numFmt\b[^>]*>', styles_xml):
+        if _xml_attr(element, 'formatCode') != format_code:
+            continue
+        num_fmt_id = _xml_attr(element, 'numFmtId')
+        for index, xf in enumerate(_cell_xfs(styles_xml)):
+            if _xml_attr(xf, 'numFmtId') == num_fmt_id and \
+                    all(_xml_attr(xf, name) in (None, '0') for name in ('fontId', 'fillId', 'borderId')):
+                return num_fmt_id, index
+        return num_fmt_id, None
+    return None, None
+
+
+def _add_date_styles(styles_xml):
+    """
+    确保 styles.xml 中有日期时间、日期两种单元格格式，返回 (新xml, {'datetime': 序号, 'date': 序号})
+
+    已有相同 formatCode 的格式时直接复用，反复增量更新同一工作簿不会让样式表无限增长
+    （Excel 对自定义数字格式的数量有上限）
+    """
+    if not re.search(rf'\sxmlns\s*=\s*(["\']){re.escape(MAIN_NS)}\1', styles_xml):
+        raise UnsupportedWorkbookError('styles.xml 使用了非默认命名空间前缀')
+    existing_ids = [int(_xml_attr(element, 'numFmtId') or 0)
+                    for element in re.findall(r'<numFmt\b[^>]*>', styles_xml)]
+    next_id = max(existing_ids + [163]) + 1
+    styles = {}
+    for key, format_code in (('datetime', DATETIME_FORMAT), ('date', DATE_FORMAT)):
+        num_fmt_id, styles[key] = _find_number_style(styles_xml, format_code)
+        if styles[key] is not None:
+            continue
+        if num_fmt_id is None:
+            if not re.search(r'<numFmts\b', styles_xml):
+                styles_xml = re.sub(r'(<styleSheet\b[^>]*>)', r'\1<numFmts count="0"/>', styles_xml, count=1)
+            num_fmt_id = next_id
+            next_id += 1
+            styles_xml, _ = _append_child(styles_xml, 'numFmts', 'numFmt',
+                                          f'<numFmt numFmtId="{num_fmt_id}" formatCode={quoteattr(format_code)}/>')
+        styles_xml, styles[key] = _append_child(
+            styles_xml, 'cellXfs', 'xf',
+            f'<xf numFmtId="{num_fmt_id}" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>')
+    return styles_xml, styles
+
+
+def _parse_xml(data, name):
+    try:
+        return ElementTree.fromstring(data)
+    except ElementTree.ParseError as e:
+        raise UnsupportedWorkbookError(f'无法解析 {name}: {e}')
+
+
+def _package_items(data, name, namespace, tags):
+    """读取关系文件/[Content_Types].xml 中的条目，返回 [(标签, 属性字典)]"""
+    return [(child.tag.split('}')[-1], dict(child.attrib)) for child in _parse_xml(data, name)
+            if child.tag in {f'{{{namespace}}}{tag}' for tag in tags}]
+
+
+def _package_xml(root_tag, namespace, items):
+    """按条目重新生成关系文件/[Content_Types].xml（这两类文件只有一层不带命名空间属性的子元素）"""
+    children = ''.join(f'<{tag} ' + ' '.join(f'{key}={quoteattr(value)}' for key, value in attrs.items()) + '/>'
+                       for tag, attrs in items)
+    return (f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            f'<{root_tag} xmlns="{namespace}">{children}</{root_tag}>')
+
+
+def _part_name(target, base='xl/'):
+    """关系中的 Target 转换为zip条目名"""
+    return target.lstrip('/') if target.startswith('/') else os.path.normpath(base + target).replace(os.sep, '/')
+
+
+def _copy_entry(zin, zout, info):
+    """按zip条目流式复制（不整体读入内存）"""
+    out_info = zipfile.ZipInfo(info.filename, date_time=info.date_time)
+    out_info.compress_type = info.compress_type
+    out_info.external_attr = info.external_attr
+    with zin.open(info) as src, zout.open(out_info, 'w', force_zip64=info.file_size > ZIP64_LIMIT) as dst:
+        while True:
+            block = src.read(WRITE_BUFFER_SIZE)
+            if not block:
+                break
+            dst.write(block)
+
+
+@contextmanager
+def atomic_replace(excel_file_path, copy=False):
+    """
+    在同目录的临时文件上写入，正常退出时原子替换目标文件，异常时删除临时文件，读取方不会看到写了一半的文件
+
+    copy=True 时临时文件先复制一份原文件（供 pd.ExcelWriter 追加模式使用）。临时文件名以 . 开头
+    （get_latest_excel_file 跳过），扩展名保持 .xlsx（openpyxl 按扩展名校验文件格式）
+    """
+    directory = os.path.dirname(os.path.abspath(excel_file_path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.', suffix='.tmp.xlsx')
+    os.close(fd)
+    try:
+        if copy:
+            shutil.copyfile(excel_file_path, temp_path)
+        yield temp_path
+        os.replace(temp_path, excel_file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+class ExcelStreamWriter:
+    """按行流式写入Excel，sheets 为 [(页签名, 行迭代器)]，行迭代器的第一行为表头"""
+
+    @staticmethod
+    def write(excel_file_path, sheets):
+        """新建（覆盖）工作簿，返回 {页签名: 行数（不含表头）}"""
+        styles = {'datetime': 1, 'date': 2}
+        written, taken = {}, set()
+        with atomic_replace(excel_file_path) as temp_path:
+            with zipfile.ZipFile(temp_path, 'w', zipfile.ZIP_DEFLATED, allowZip64=True) as zout:
+                sheet_entries, rels, overrides = [], [], []
+                for index, (sheet_name, rows) in enumerate(sheets, start=1):
+                    _check_sheet_name(sheet_name, taken)
+                    part = f'xl/worksheets/sheet{index}.xml'
+                    with zout.open(part, 'w', force_zip64=True) as handle:
+                        written[sheet_name] = max(_write_sheet(handle, rows, styles) - 1, 0)
+                    sheet_entries.append(f'<sheet name={quoteattr(sheet_name)} sheetId="{index}" r:id="rId{index}"/>')
+                    rels.append(f'<Relationship Id="rId{index}" Type="{WORKSHEET_REL_TYPE}" '
+                                f'Target="worksheets/sheet{index}.xml"/>')
+                    overrides.append(f'<Override PartName="/{part}" ContentType="{WORKSHEET_CONTENT_TYPE}"/>')
+                if not sheet_entries:
+                    raise ValueError('工作簿至少需要一个页签')
+
+                rels.append(f'<Relationship Id="rId{len(rels) + 1}" Type="{REL_NS}/styles" Target="styles.xml"/>')
+                zout.writestr('[Content_Types].xml', CONTENT_TYPES_XML.format(overrides=''.join(overrides)))
+                zout.writestr('_rels/.rels', ROOT_RELS_XML)
+                zout.writestr('xl/workbook.xml',
+                              '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                              f'<workbook xmlns="{MAIN_NS}" xmlns:r="{REL_NS}">'
+                              f'<sheets>{"".join(sheet_entries)}</sheets></workbook>')
+                zout.writestr('xl/_rels/workbook.xml.rels',
+                              '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                              '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                              f'{"".join(rels)}</Relationships>')
+                zout.writestr('xl/styles.xml', STYLES_XML)
+        logger.debug("流式写入工作簿 %s: %s", excel_file_path, written)
+        return written
+
+    @staticmethod
+    def update(excel_file_path, sheets):
+        """
+        替换同名页签、在末尾追加新页签，其余页签原样复制；返回 {页签名: 行数（不含表头）}
+
+        现有工作簿结构无法增量更新时抛出 UnsupportedWorkbookError（此时目标文件未被修改）
+        """
+        written = {}
+        with atomic_replace(excel_file_path) as temp_path:
+            with zipfile.ZipFile(excel_file_path) as zin, \
+                    zipfile.ZipFile(temp_path, 'w', zipfile.ZIP_DEFLATED, allowZip64=True) as zout:
+                names = set(zin.namelist())
+                for required in ('[Content_Types].xml', 'xl/workbook.xml', 'xl/_rels/workbook.xml.rels',
+                                 'xl/styles.xml'):
+                    if required not in names:
+                        raise UnsupportedWorkbookError(f'工作簿中缺少 {required}')
+                workbook_data = zin.read('xl/workbook.xml')
+                workbook_xml = workbook_data.decode('utf-8')
+                relationships = [attrs for _, attrs in _package_items(
+                    zin.read('xl/_rels/workbook.xml.rels'), 'workbook.xml.rels', PACKAGE_REL_NS, ('Relationship',))]
+                content_types = _package_items(
+                    zin.read('[Content_Types].xml'), '[Content_Types].xml', CONTENT_TYPES_NS, ('Default', 'Override'))
+                styles_xml, styles = _add_date_styles(zin.read('xl/styles.xml').decode('utf-8'))
+
+                # workbook.xml 用 ElementTree 读取（不依赖引号风格、是否自闭合）；其中可能有扩展命名空间，
+                # 写回时只在 </sheets> 前插入新页签，其余内容保持原样
+                sheets_element = _parse_xml(workbook_data, 'workbook.xml').find(f'{{{MAIN_NS}}}sheets')
+                sheets_end = re.search(r'</(?:([\w.-]+):)?sheets\s*>', workbook_xml)
+                if sheets_element is None or sheets_end is None:
+                    raise UnsupportedWorkbookError('无法解析 workbook.xml')
+                sheet_tag = f'{sheets_end.group(1)}:sheet' if sheets_end.group(1) else 'sheet'
+
+                rels_by_id = {rel.get('Id'): rel for rel in relationships}
+                existing = {}
+                sheet_ids = []
+                for element in sheets_element.findall(f'{{{MAIN_NS}}}sheet'):
+                    rel = rels_by_id.get(element.get(f'{{{REL_NS}}}id'))
+                    if rel is None or not rel.get('Target'):
+                        raise UnsupportedWorkbookError('页签缺少对应的关系')
+                    # Excel 比较页签名不区分大小写
+                    existing[element.get('name', '').casefold()] = _part_name(rel['Target'])
+                    sheet_ids.append(int(element.get('sheetId') or 0))
+
+                # 逐个页签写入（sheets 可以是生成器，调用方每次只需在内存中保留一个页签的数据）
+                replaced, overwritten, new_sheets = set(), set(), []
+                next_sheet_id = max(sheet_ids + [0]) + 1
+                next_rel = max([int(rel['Id'][3:]) for rel in relationships
+                                if re.fullmatch(r'rId\d+', rel.get('Id', ''))] + [0]) + 1
+                next_part = 1
+                taken = set()
+                for sheet_name, rows in sheets:
+                    _check_sheet_name(sheet_name, taken)
+                    if sheet_name.casefold() in existing:
+                        part = existing[sheet_name.casefold()]
+                        overwritten.add(part)
+                    else:
+                        while f'xl/worksheets/sheet{next_part}.xml' in names:
+                            next_part += 1
+                        part = f'xl/worksheets/sheet{next_part}.xml'
+                        names.add(part)
+                        new_sheets.append(f'<{sheet_tag} xmlns:r="{REL_NS}" name={quoteattr(sheet_name)} '
+                                          f'sheetId="{next_sheet_id}" r:id="rId{next_rel}"/>')
+                        relationships.append({'Id': f'rId{next_rel}', 'Type': WORKSHEET_REL_TYPE, 'Target': f'/{part}'})
+                        content_types.append(
+                            ('Override', {'PartName': f'/{part}', 'ContentType': WORKSHEET_CONTENT_TYPE}))
+                        next_sheet_id += 1
+                        next_rel += 1
+                    replaced.add(part)
+                    with zout.open(part, 'w', force_zip64=True) as handle:
+                        written[sheet_name] = max(_write_sheet(handle, rows, styles) - 1, 0)
+                insert_at = sheets_end.start()
+                workbook_xml = workbook_xml[:insert_at] + ''.join(new_sheets) + workbook_xml[insert_at:]
+
+                # 被替换页签原有的关系（绘图、批注等）不再引用；计算链引用了旧单元格，删除后由Excel重建
+                skipped = set(overwritten)
+                skipped.update(f'{os.path.dirname(part)}/_rels/{os.path.basename(part)}.rels' for part in overwritten)
+                if overwritten:
+                    for rel in [rel for rel in relationships if rel.get('Type') == CALC_CHAIN_REL_TYPE]:
+                        calc_chain = _part_name(rel['Target'])
+                        skipped.add(calc_chain)
+                        relationships.remove(rel)
+                        content_types = [(tag, attrs) for tag, attrs in content_types
+                                         if attrs.get('PartName', '').lstrip('/') != calc_chain]
+
+                modified = {
+                    '[Content_Types].xml': _package_xml('Types', CONTENT_TYPES_NS, content_types),
+                    'xl/workbook.xml': workbook_xml,
+                    'xl/_rels/workbook.xml.rels': _package_xml(
+                        'Relationships', PACKAGE_REL_NS, [('Relationship', rel) for rel in relationships]),
+                    'xl/styles.xml': styles_xml,
+                }
+                for info in zin.infolist():
+                    if info.filename in skipped or info.filename in modified:
+                        continue
+                    _copy_entry(zin, zout, info)
+                for name, xml in modified.items():
+                    zout.writestr(name, xml)
+        logger.debug("增量更新工作簿 %s: %s", excel_file_path, written)
+        return written
@@ -0,0 +1,75 @@
+import base64
+from datetime import datetime
+
+from sqlalchemy import and_, or_
+
+
+class PaginationUtils:
+    """游标（keyset）分页工具类"""
+
+    DEFAULT_LIMIT = 50
+    MAX_LIMIT = 200
+
+    @classmethod
+    def get_limit(cls, args, default=None, max_limit=None):
+        """从请求参数中读取每页条数，并限制在 [1, max_limit] 范围内"""
+        default = default or cls.DEFAULT_LIMIT
+        max_limit = max_limit or cls.MAX_LIMIT
+
+        limit = args.get('limit', default, type=int)
+        if limit is None or limit < 1:
+            limit = default
+        return min(limit, max_limit)
+
+    @classmethod
+    def get_after_id(cls, args):
+        """从请求参数中读取上一页最后一条记录的ID"""
+        after_id = args.get('after_id', type=int)
+        return after_id if after_id and after_id > 0 else None
+
+    @classmethod
+    def split_page(cls, rows, limit):
+        """
+        拆分多查询出的一条记录
+        查询时取 limit + 1 条，多出的一条只用来判断是否还有下一页
+        """
+        has_more = len(rows) > limit
+        return rows[:limit], has_more
+
+    @classmethod
+    def encode_cursor(cls, created_at, record_id):
+        """将 (created_at, id) 编码为不透明的游标字符串"""
+        created_text = created_at.isoformat() if created_at else ''
+        raw = f"{created_text}|{record_id}".encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii')
+
+    @classmethod
+    def decode_cursor(cls, cursor):
+        """解析游标字符串，返回 (created_at, id)，游标无效时返回 (None, None)"""
+        if not cursor:
+            return None, None
+        try:
+            raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+            created_text, record_id = raw.rsplit('|', 1)
+            created_at = datetime.fromisoformat(created_text) if created_text else None
+            return created_at, int(record_id)
+        except (ValueError, UnicodeError):
+            return None, None
+
+    @classmethod
+    def is_valid_cursor(cls, cursor):
+        """游标为空（第一页）或可以解析时有效；无法解析的游标应返回400，而不是悄悄回到第一页"""
+        return not cursor or cls.decode_cursor(cursor)[1] is not None
+
+    @classmethod
+    def filter_after_cursor(cls, query, created_at_column, id_column, cursor):
+        """按 (created_at, id) 倒序分页时，筛选出排在游标记录之后的数据"""
+        cursor_created_at, cursor_id = cls.decode_cursor(cursor)
+        if cursor_id is None:
+            return query
+        if cursor_created_at is None:
+            return query.filter(id_column < cursor_id)
+        return query.filter(or_(
+            created_at_column < cursor_created_at,
+            and_(created_at_column == cursor_created_at, id_column < cursor_id)
+        ))
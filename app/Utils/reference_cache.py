@@ -0,0 +1,78 @@
+from types import SimpleNamespace
+
+from app.core.config import config
+from app.Utils.cache_utils import TTLCache
+
+
+class ReferenceCache:
+    """
+    参考数据（图表类型、数据分析类型）的进程内缓存
+    这些表数据量小且极少修改，写入后由对应接口调用 invalidate_* 清除；
+    多进程部署时其他进程的缓存依靠过期时间刷新
+    """
+
+    _cache = TTLCache(ttl=config.REFERENCE_CACHE_TTL, maxsize=16)
+
+    @staticmethod
+    def _snapshot(record):
+        """把ORM对象转换为只读快照，避免跨请求共享会话中的对象"""
+        return SimpleNamespace(
+            id=record.id,
+            type_name=record.type_name,
+            description=record.description,
+            created_at=record.created_at
+        )
+
+    @staticmethod
+    def _to_id(record_id):
+        """请求参数中的ID可能是字符串，统一转换为整数，无法转换时返回None"""
+        try:
+            return int(record_id)
+        except (TypeError, ValueError):
+            return None
+
+    @classmethod
+    def _load(cls, key, model):
+        """加载整张参考表，返回 (按ID排序的列表, ID->记录 字典)"""
+
+        def load_table():
+            records = [cls._snapshot(record) for record in model.query.order_by(model.id.asc()).all()]
+            return records, {record.id: record for record in records}
+
+        return cls._cache.get_or_set(key, load_table)
+
+    # -------------------------图表类型-------------------------------
+    @classmethod
+    def get_chart_types(cls):
+        """获取全部图表类型"""
+        from app.DataProject.modules import ChartType
+        return cls._load('chart_types', ChartType)[0]
+
+    @classmethod
+    def get_chart_type(cls, chart_type_id):
+        """根据ID获取图表类型，不存在时返回None"""
+        from app.DataProject.modules import ChartType
+        return cls._load('chart_types', ChartType)[1].get(cls._to_id(chart_type_id))
+
+    @classmethod
+    def invalidate_chart_types(cls):
+        """图表类型变更后清除缓存"""
+        cls._cache.invalidate('chart_types')
+
+    # -------------------------数据分析类型-------------------------------
+    @classmethod
+    def get_data_ana_types(cls):
+        """获取全部数据分析类型"""
+        from app.DataProject.modules import DataAnaType
+        return cls._load('data_ana_types', DataAnaType)[0]
+
+    @classmethod
+    def get_data_ana_type(cls, data_ana_type_id):
+        """根据ID获取数据分析类型，不存在时返回None"""
+        from app.DataProject.modules import DataAnaType
+        return cls._load('data_ana_types', DataAnaType)[1].get(cls._to_id(data_ana_type_id))
+
+    @classmethod
+    def invalidate_data_ana_types(cls):
+        """数据分析类型变更后清除缓存"""
+        cls._cache.invalidate('data_ana_types')
@@ -2,12 +2,18 @@ import os
 import logging
 from flask import Flask
 from flask_migrate import Migrate
-from sqlalchemy import exc
+from sqlalchemy import exc, text
+
+from app.core.config import config, ensure_data_dirs
+from app.core.db_pool import apply_sqlite_pragmas, build_engine_options, get_pool_report
+from app.core.logger import setup_logging
+from app.core.query_budget import init_query_budget
+from app.core.slow_query import init_slow_query_log
+from app.core.metrics import init_metrics
+from app.core.profiler import init_profiler
+from app.core.memory_profile import init_memory_profile
+from app.core.uploads import init_uploads
 
-from app.core.config import config
-
-# 配置日志
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # 创建扩展实例
@@ -25,21 +31,45 @@ def create_app():
     app.config.from_object(config)
     app.debug = config.DEBUG
 
+    # 配置日志（级别、采样、截断、异步输出）
+    setup_logging(app.config)
+
+    # 确保数据目录存在（原先在导入config时执行，现改为创建应用时执行）
+    ensure_data_dirs()
+
     # 初始化扩展
     from flask_sqlalchemy import SQLAlchemy
     from flask_migrate import Migrate
 
     db = SQLAlchemy()
 
+    # 确保模型被导入（建表前必须导入，否则 create_all 不会创建任何表）
+    from app.DataProject import modules as data_project_modules  # noqa: F401
+    from app.user import modules as user_modules  # noqa: F401
+
     # 初始化数据库
     init_db(app, db)
 
     # 初始化 Flask-Migrate
     migrate = Migrate(app, db)
 
-    # 确保模型被导入
-    from app.DataProject.modules import (
-        DataProject, ProjectUser, Sheet, SheetProject, Table)
+    # 按请求统计SQL数量与耗时
+    init_query_budget(app)
+
+    # 慢查询日志
+    init_slow_query_log(app)
+
+    # 请求延迟、处理阶段耗时指标及 /metrics 端点
+    init_metrics(app)
+
+    # 管理员按需开启的单请求性能分析
+    init_profiler(app)
+
+    # 按需的分阶段内存分析
+    init_memory_profile(app)
+
+    # 上传大小限制、上传文件直接落盘及过期临时文件清理
+    init_uploads(app)
 
     # 注册蓝图（从独立的urls模块导入）
     register_blueprints(app)
@@ -49,8 +79,9 @@ def create_app():
     def health_check():
         """健康检查端点"""
         try:
-            # 测试数据库连接
-            db.engine.connect()
+            # 测试数据库连接，用完立即归还连接池
+            with db.engine.connect() as connection:
+                connection.execute(text('SELECT 1'))
             return {
                 'status': 'healthy',
                 'database': 'connected',
@@ -63,27 +94,44 @@ def create_app():
                 'error': str(e)
             }, 500
 
-    logger.info(f"🚀 Flask应用创建成功，调试模式: {app.debug}")
+    @app.route('/health/pool')
+    def health_pool():
+        """连接池状态（当前worker进程），用于根据worker数量调整连接池大小"""
+        return get_pool_report(db.engine)
+
+    logger.info("🚀 Flask应用创建成功，调试模式: %s", app.debug)
     return app
 
 def init_db(app, db_instance):
     """初始化数据库并测试连接"""
     try:
+        # 连接池参数（pool_size、pool_recycle、pool_pre_ping等）来自配置
+        app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', build_engine_options(app.config))
         db_instance.init_app(app)
 
+        # SQLite（FLASK_CONFIG=sqlite）每个连接设置 WAL 等 PRAGMA
+        with app.app_context():
+            apply_sqlite_pragmas(db_instance.engine, app.config.get('SQLITE_PRAGMAS'))
+
+        # 允许跳过启动时的连接测试，首个请求时再建立连接
+        if not app.config.get('DB_CHECK_ON_STARTUP', True):
+            logger.info("⏭️ 已跳过启动时的数据库连接测试")
+            return
+
         with app.app_context():
-            db_instance.engine.connect()
+            with db_instance.engine.connect():
+                pass
             logger.info("✅ 数据库连接测试成功")
 
-            if app.config.get('DEBUG'):
+            if app.config.get('DEBUG') or app.config.get('DB_CREATE_TABLES'):
                 db_instance.create_all()
                 logger.info("✅ 数据库表创建完成")
 
     except exc.OperationalError as e:
-        logger.error(f"❌ 数据库连接失败: {str(e)}")
+        logger.error("❌ 数据库连接失败: %s", e)
         raise
     except Exception as e:
-        logger.error(f"❌ 数据库初始化异常: {str(e)}")
+        logger.error("❌ 数据库初始化异常: %s", e)
         raise
 
 def register_blueprints(app):
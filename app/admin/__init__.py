@@ -0,0 +1 @@
+# 运维管理模块初始化文件（慢查询、性能分析等仅管理员可访问的接口）
@@ -0,0 +1,34 @@
+import hmac
+from functools import wraps
+
+from flask import current_app, request
+
+from app.Utils.RequestsUtils import RequestsUtils
+
+
+def is_admin_request():
+    """
+    判断当前请求是否来自管理员
+    配置了 ADMIN_TOKEN 时校验请求头 X-Admin-Token；未配置时仅调试模式下允许访问
+    """
+    admin_token = current_app.config.get('ADMIN_TOKEN')
+    if not admin_token:
+        return current_app.debug
+    request_token = request.headers.get('X-Admin-Token', '')
+    return hmac.compare_digest(request_token.encode('utf-8'), admin_token.encode('utf-8'))
+
+
+def admin_required(view_func):
+    """管理员接口装饰器"""
+
+    @wraps(view_func)
+    def wrapper(*args, **kwargs):
+        if not is_admin_request():
+            return RequestsUtils.make_response(
+                status_code=403,
+                msg='需要管理员权限',
+                success=False
+            )
+        return view_func(*args, **kwargs)
+
+    return wrapper
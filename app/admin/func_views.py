@@ -0,0 +1,68 @@
+import os
+
+from flask import current_app, request, send_file
+from werkzeug.utils import secure_filename
+
+from app.admin.auth import admin_required
+from app.core.profiler import list_profiles
+from app.core.slow_query import slow_query_log
+from app.Utils.RequestsUtils import RequestsUtils
+
+
+@admin_required
+def get_slow_queries():
+    """
+    获取慢查询记录（当前worker进程），按耗时从高到低排序
+    参数: limit 返回条数，默认50
+    """
+    limit = request.args.get('limit', 50, type=int)
+    records = slow_query_log.records(limit=limit)
+    return RequestsUtils.make_response(
+        status_code=200,
+        msg='获取慢查询记录成功',
+        data=records,
+        success=True,
+        total=slow_query_log.total
+    )
+
+
+@admin_required
+def clear_slow_queries():
+    """清空慢查询记录"""
+    slow_query_log.clear()
+    return RequestsUtils.make_response(
+        status_code=200,
+        msg='慢查询记录已清空',
+        success=True
+    )
+
+
+@admin_required
+def get_profiles():
+    """
+    获取最近的性能分析结果（所有worker共用 PROFILE_DIR）
+    参数: limit 返回条数，默认50
+    """
+    limit = request.args.get('limit', 50, type=int)
+    profiles = list_profiles(current_app.config['PROFILE_DIR'])
+    return RequestsUtils.make_response(
+        status_code=200,
+        msg='获取性能分析列表成功',
+        data=profiles[:limit],
+        success=True
+    )
+
+
+@admin_required
+def download_profile(file_name):
+    """下载性能分析文件（.collapsed 折叠栈 / .prof cProfile统计）"""
+    profile_dir = current_app.config['PROFILE_DIR']
+    safe_name = secure_filename(file_name)
+    file_path = os.path.join(profile_dir, safe_name)
+    if safe_name != file_name or not safe_name.endswith(('.collapsed', '.prof')) or not os.path.isfile(file_path):
+        return RequestsUtils.make_response(
+            status_code=404,
+            msg='性能分析文件不存在',
+            success=False
+        )
+    return send_file(os.path.abspath(file_path), as_attachment=True, download_name=safe_name)
@@ -0,0 +1,13 @@
+from flask import Blueprint
+from . import func_views
+
+# 创建运维管理蓝图
+admin_bp = Blueprint('admin', __name__)
+
+# API路由（后端逻辑）
+admin_bp.route('/api/slow_queries', methods=['GET'], endpoint='api_slow_queries')(func_views.get_slow_queries)
+admin_bp.route('/api/slow_queries', methods=['DELETE'], endpoint='api_slow_queries_clear')(
+    func_views.clear_slow_queries)
+admin_bp.route('/api/profiles', methods=['GET'], endpoint='api_profiles')(func_views.get_profiles)
+admin_bp.route('/api/profiles/<file_name>', methods=['GET'], endpoint='api_profile_download')(
+    func_views.download_profile)
@@ -21,4 +21,9 @@ def register_urls(app):
     # 注册数据项目蓝图
     from app.DataProject.urls import data_project_bp
     app.register_blueprint(data_project_bp, url_prefix='/data')
-    logger.info("✅ 数据项目蓝图注册完成")
\ No newline at end of file
+    logger.info("✅ 数据项目蓝图注册完成")
+
+    # 注册运维管理蓝图
+    from app.admin.urls import admin_bp
+    app.register_blueprint(admin_bp, url_prefix='/admin')
+    logger.info("✅ 运维管理蓝图注册完成")
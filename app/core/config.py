@@ -1,4 +1,5 @@
 import os
+import tempfile
 
 basedir = os.path.abspath(os.path.dirname(__file__))
 
@@ -20,23 +21,167 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_ECHO = False
 
+    # 连接池配置，均可通过同名环境变量覆盖；每个worker进程各有一个连接池，
+    # 数据库总连接数约为 WSGI_WORKERS * (DB_POOL_SIZE + DB_MAX_OVERFLOW)
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', '5'))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', '10'))
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', '30'))  # 获取连接的最长等待时间（秒）
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', '1800'))  # 小于MySQL的wait_timeout，避免使用已被服务端断开的连接
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', '1') == '1'
+
+    # 日志配置：逐请求的调试信息为DEBUG级别，默认INFO下不会格式化和输出
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+    LOG_FORMAT = os.environ.get('LOG_FORMAT', 'text')  # text 或 json
+    LOG_MAX_MESSAGE_LENGTH = int(os.environ.get('LOG_MAX_MESSAGE_LENGTH', '2000'))
+    # 按logger名前缀设置DEBUG/INFO日志的采样比例，如 "app.DataProject.func_views=0.1,app.Utils=0.5"
+    LOG_SAMPLE_RATES = os.environ.get('LOG_SAMPLE_RATES', '')
+
+    # 按请求统计SQL数量：同一语句形状在一次请求中超过该次数时记录N+1警告，调试模式下返回 X-DB-Queries/X-DB-Time 响应头
+    QUERY_BUDGET_ENABLED = os.environ.get('QUERY_BUDGET_ENABLED', '1') == '1'
+    QUERY_REPEAT_THRESHOLD = int(os.environ.get('QUERY_REPEAT_THRESHOLD', '10'))
+
+    # 慢查询日志：超过阈值的SQL记录语句、脱敏参数、视图函数及EXPLAIN结果，通过 /admin/api/slow_queries 查看
+    SLOW_QUERY_LOG_ENABLED = os.environ.get('SLOW_QUERY_LOG_ENABLED', '1') == '1'
+    SLOW_QUERY_THRESHOLD_MS = int(os.environ.get('SLOW_QUERY_THRESHOLD_MS', '200'))
+    SLOW_QUERY_EXPLAIN = os.environ.get('SLOW_QUERY_EXPLAIN', '1') == '1'
+    SLOW_QUERY_LOG_SIZE = int(os.environ.get('SLOW_QUERY_LOG_SIZE', '200'))
+
+    # 是否开启 /metrics（Prometheus文本格式的请求与阶段耗时指标）
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') == '1'
+
+    # 按需性能分析：管理员请求携带 X-Profile 头或 __profile 参数时记录该请求的调用栈，结果通过 /admin/api/profiles 查看
+    PROFILE_ENABLED = os.environ.get('PROFILE_ENABLED', '1') == '1'
+    PROFILE_MODE = os.environ.get('PROFILE_MODE', 'sampling')  # sampling（折叠栈，可生成火焰图）或 cprofile
+    PROFILE_SAMPLE_INTERVAL_MS = int(os.environ.get('PROFILE_SAMPLE_INTERVAL_MS', '5'))
+    PROFILE_KEEP = int(os.environ.get('PROFILE_KEEP', '50'))
+    PROFILE_DIR = os.environ.get('PROFILE_DIR', os.path.join(basedir, '..', 'src_Data', 'Profiles'))
+
+    # 按需内存分析（tracemalloc）：开启后管理员请求携带 X-Memory-Profile 头或 __memprofile 参数时统计各处理阶段的内存峰值
+    MEMORY_PROFILE_ENABLED = os.environ.get('MEMORY_PROFILE_ENABLED', '0') == '1'
+    MEMORY_PROFILE_ALL = os.environ.get('MEMORY_PROFILE_ALL', '0') == '1'  # 分析所有请求，开销较大
+    MEMORY_PROFILE_TOP_N = int(os.environ.get('MEMORY_PROFILE_TOP_N', '10'))
+    MEMORY_PROFILE_FRAMES = int(os.environ.get('MEMORY_PROFILE_FRAMES', '1'))  # 每次分配记录的调用栈深度
+
+    # 管理员接口令牌（请求头 X-Admin-Token），未设置时管理员接口仅在调试模式下可访问
+    ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN', '')
+
+    # 使用SQLite时每个连接执行的PRAGMA（见 SQLiteConfig）
+    SQLITE_PRAGMAS = {}
+    # SQLite数据库及数据文件所在目录，仅 SQLiteConfig 使用
+    SQLITE_DATA_DIR = None
+    # 启动时是否按模型建表（调试模式下始终建表）
+    DB_CREATE_TABLES = False
+
+    # 启动时是否测试数据库连接并建表，设置环境变量 DB_CHECK_ON_STARTUP=0 可跳过以加快启动
+    DB_CHECK_ON_STARTUP = os.environ.get('DB_CHECK_ON_STARTUP', '1') == '1'
+
     # 数据表存放路径
     SHEET_DATA_DIR = os.path.join(basedir, '..', 'src_Data', 'SheetData')
 
+    # 项目读写锁（跨进程文件锁）：锁文件目录（为空时使用 SHEET_DATA_DIR/.locks）和等待超时秒数
+    PROJECT_LOCK_DIR = os.environ.get('PROJECT_LOCK_DIR', '')
+    PROJECT_LOCK_TIMEOUT = float(os.environ.get('PROJECT_LOCK_TIMEOUT', '60'))
+
     # 上传数据表缓存路径
     UPLOAD_FOLDER = os.path.join(basedir, '..', 'src_Data', 'TempDir', "TempUploadDir")
 
+    # 上传限制：请求体最大字节数（超出返回413），上传文件按块写入 UPLOAD_FOLDER 的临时文件
+    MAX_CONTENT_LENGTH = int(os.environ.get('MAX_UPLOAD_MB', '100')) * 1024 * 1024
+    UPLOAD_CHUNK_SIZE = int(os.environ.get('UPLOAD_CHUNK_SIZE', str(1024 * 1024)))
+    # 定期清理 UPLOAD_FOLDER 中超过该时间（秒）未修改的遗留临时文件，间隔为0时不清理
+    UPLOAD_TEMP_MAX_AGE = int(os.environ.get('UPLOAD_TEMP_MAX_AGE', '3600'))
+    UPLOAD_SWEEP_INTERVAL = int(os.environ.get('UPLOAD_SWEEP_INTERVAL', '600'))
+    # 断点续传：分片大小（需小于请求体上限）和单个文件的最大大小
+    CHUNKED_UPLOAD_CHUNK_SIZE = int(os.environ.get('CHUNKED_UPLOAD_CHUNK_SIZE', str(8 * 1024 * 1024)))
+    CHUNKED_UPLOAD_MAX_MB = int(os.environ.get('CHUNKED_UPLOAD_MAX_MB', '2048'))
+
+    # Excel读取引擎：auto（按文件大小和读取行数选择）/ calamine / openpyxl，见 app/Utils/excel_reader.py
+    EXCEL_READER_ENGINE = os.environ.get('EXCEL_READER_ENGINE', 'auto')
+    # auto 模式下不小于该大小（KB）的文件使用 calamine（需安装 python-calamine）
+    EXCEL_READER_CALAMINE_MIN_KB = int(os.environ.get('EXCEL_READER_CALAMINE_MIN_KB', '64'))
+    # auto 模式下只读取不超过该行数（表头、样例数据）时使用 openpyxl 逐行读取
+    EXCEL_READER_STREAM_ROWS = int(os.environ.get('EXCEL_READER_STREAM_ROWS', '100'))
+
     # 数据图存放跟路径
     CHART_SAVE_ROOT_DIR = os.path.join(basedir, '..', 'src_Data', 'ChartData')
 
-# 创建配置实例
-config = Config()
+    # 图表列表总数缓存时间（秒），总数仅在请求 with_count=1 时计算
+    CHART_COUNT_CACHE_TTL = int(os.environ.get('CHART_COUNT_CACHE_TTL', '30'))
+
+    # 列表接口中文件存在性判断的缓存时间（秒），也是文件新增/删除后 file_exists 可能滞后的最长时间
+    FILE_EXISTS_CACHE_TTL = int(os.environ.get('FILE_EXISTS_CACHE_TTL', '5'))
+
+    # 图表类型、数据分析类型等参考数据的缓存时间（秒），本进程写入时会立即失效
+    REFERENCE_CACHE_TTL = int(os.environ.get('REFERENCE_CACHE_TTL', '300'))
+
+    # 生产WSGI服务配置（gunicorn.conf.py / wsgi.py 读取），均可通过同名环境变量覆盖
+    WSGI_BIND = os.environ.get('WSGI_BIND', '0.0.0.0:5000')
+    WSGI_WORKERS = int(os.environ.get('WSGI_WORKERS', (os.cpu_count() or 1) * 2 + 1))
+    WSGI_THREADS = int(os.environ.get('WSGI_THREADS', '4'))
+    WSGI_TIMEOUT = int(os.environ.get('WSGI_TIMEOUT', '120'))  # 制图、合并大表耗时较长
+    WSGI_GRACEFUL_TIMEOUT = int(os.environ.get('WSGI_GRACEFUL_TIMEOUT', '30'))
+    WSGI_KEEPALIVE = int(os.environ.get('WSGI_KEEPALIVE', '5'))
+    WSGI_MAX_REQUESTS = int(os.environ.get('WSGI_MAX_REQUESTS', '1000'))  # 处理N个请求后回收worker，抑制内存增长
+    WSGI_MAX_REQUESTS_JITTER = int(os.environ.get('WSGI_MAX_REQUESTS_JITTER', '100'))
+    # 预加载：在master进程中导入应用和重型依赖，fork后各worker以写时复制方式共享
+    WSGI_PRELOAD = os.environ.get('WSGI_PRELOAD', '1') == '1'
+    WSGI_PRELOAD_MODULES = ['pandas', 'numpy', 'matplotlib.figure', 'openpyxl']
+
+
+class DevelopmentConfig(Config):
+    """开发环境配置"""
+    DEBUG = True
+
+
+class ProductionConfig(Config):
+    """生产环境配置"""
+    DEBUG = False
+    SECRET_KEY = os.environ.get('SECRET_KEY', Config.SECRET_KEY)
+
+
+class SQLiteConfig(Config):
+    """
+    嵌入式SQLite配置（FLASK_CONFIG=sqlite），用于本机/CI上的压测与性能分析，不依赖MySQL
+    数据库文件和数据目录都放在 SQLITE_DATA_DIR（默认系统临时目录下），启动时自动建表，
+    可用 python -m app.core.seed 写入测试数据
+    """
+    DEBUG = os.environ.get('SQLITE_DEBUG', '0') == '1'  # 默认关闭调试模式，压测结果更接近生产
+    SQLITE_DATA_DIR = os.path.abspath(
+        os.environ.get('SQLITE_DATA_DIR', os.path.join(tempfile.gettempdir(), 'data_ana_sys_sqlite')))
+    SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(SQLITE_DATA_DIR, 'data_ana_sys.db')}"
+    DB_CREATE_TABLES = True
+
+    # WAL模式下读写互不阻塞；其余参数以少量持久性换取写入速度，仅用于测试数据
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', '5000')),
+        'cache_size': -64000,  # 负数表示KB，即64MB
+        'temp_store': 'MEMORY',
+        'mmap_size': 268435456,
+        'foreign_keys': 'OFF',
+    }
+
+    SHEET_DATA_DIR = os.path.join(SQLITE_DATA_DIR, 'SheetData')
+    UPLOAD_FOLDER = os.path.join(SQLITE_DATA_DIR, 'TempDir', 'TempUploadDir')
+    CHART_SAVE_ROOT_DIR = os.path.join(SQLITE_DATA_DIR, 'ChartData')
+    PROFILE_DIR = os.path.join(SQLITE_DATA_DIR, 'Profiles')
+
+
+config_map = {
+    'development': DevelopmentConfig,
+    'production': ProductionConfig,
+    'sqlite': SQLiteConfig,
+    'default': DevelopmentConfig,
+}
+
+# 创建配置实例，通过环境变量 FLASK_CONFIG 选择配置
+config = config_map.get(os.environ.get('FLASK_CONFIG', 'default'), DevelopmentConfig)()
 
 # 确保数据目录存在
 def ensure_data_dirs():
     """确保数据目录存在"""
+    if config.SQLITE_DATA_DIR:
+        os.makedirs(config.SQLITE_DATA_DIR, exist_ok=True)
     os.makedirs(config.SHEET_DATA_DIR, exist_ok=True)
-    os.makedirs(config.CHART_SAVE_ROOT_DIR, exist_ok=True)
-
-# 应用启动时调用
-ensure_data_dirs()
\ No newline at end of file
+    os.makedirs(config.CHART_SAVE_ROOT_DIR, exist_ok=True)
\ No newline at end of file
@@ -0,0 +1,184 @@
+import os
+import threading
+import time
+from collections import deque
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+
+
+class DurationStats:
+    """耗时统计（线程安全，仅保留最近N次样本用于计算分位数）"""
+
+    def __init__(self, sample_size=1000):
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=sample_size)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+            self.count += 1
+            self.total += seconds
+            self.max = max(self.max, seconds)
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self.count = 0
+            self.total = 0.0
+            self.max = 0.0
+
+    def snapshot(self, count_key):
+        """返回耗时统计（毫秒），次数使用 count_key 作为键名"""
+        with self._lock:
+            samples = sorted(self._samples)
+            count, total, max_seconds = self.count, self.total, self.max
+
+        def percentile(ratio):
+            if not samples:
+                return 0.0
+            return round(samples[min(int(len(samples) * ratio), len(samples) - 1)] * 1000, 3)
+
+        return {
+            count_key: count,
+            'avg_ms': round(total / count * 1000, 3) if count else 0.0,
+            'p50_ms': percentile(0.50),
+            'p95_ms': percentile(0.95),
+            'p99_ms': percentile(0.99),
+            'max_ms': round(max_seconds * 1000, 3),
+        }
+
+
+class PoolStats:
+    """
+    连接池统计：获取连接的排队等待时间、新建数据库连接的耗时和超时次数
+
+    等待时间不含新建连接的耗时，只反映连接池容量不足造成的排队；建连慢（网络、认证）单独体现在建连耗时中
+    """
+
+    def __init__(self, sample_size=1000):
+        self.wait = DurationStats(sample_size)
+        self.connect = DurationStats(sample_size)
+        self._lock = threading.Lock()
+        self.timeouts = 0
+
+    def record_wait(self, seconds):
+        self.wait.record(seconds)
+
+    def record_connect(self, seconds):
+        self.connect.record(seconds)
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def reset(self):
+        self.wait.reset()
+        self.connect.reset()
+        with self._lock:
+            self.timeouts = 0
+
+    def snapshot(self):
+        """返回获取连接的等待时间统计（毫秒）"""
+        report = self.wait.snapshot('checkouts')
+        report['timeouts'] = self.timeouts
+        return report
+
+    def connect_snapshot(self):
+        """返回新建数据库连接的耗时统计（毫秒）"""
+        return self.connect.snapshot('connects')
+
+
+# 每个进程只有一个数据库引擎，统计数据随进程存在；pool.recreate()（engine.dispose）后继续累计
+pool_stats = PoolStats()
+
+# 当前线程本次获取连接过程中新建连接的耗时，从等待时间中扣除
+_checkout = threading.local()
+
+
+class TimedQueuePool(QueuePool):
+    """分别记录从池中获取连接的等待时间和新建连接耗时的 QueuePool"""
+
+    def _do_get(self):
+        # QueuePool._do_get 在溢出名额被其他线程抢占时会递归调用自身，只在最外层计时
+        if getattr(_checkout, 'active', False):
+            return super()._do_get()
+        _checkout.active, _checkout.connect_time = True, 0.0
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            pool_stats.record_timeout()
+            raise
+        finally:
+            _checkout.active = False
+        pool_stats.record_wait(time.perf_counter() - start - _checkout.connect_time)
+        return connection
+
+    def _create_connection(self):
+        start = time.perf_counter()
+        try:
+            return super()._create_connection()
+        finally:
+            elapsed = time.perf_counter() - start
+            _checkout.connect_time = getattr(_checkout, 'connect_time', 0.0) + elapsed
+            pool_stats.record_connect(elapsed)
+
+
+def build_engine_options(app_config):
+    """根据配置生成 SQLALCHEMY_ENGINE_OPTIONS，SQLite 使用 SQLAlchemy 默认连接池"""
+    options = {
+        'pool_pre_ping': app_config.get('DB_POOL_PRE_PING', True),
+        'pool_recycle': app_config.get('DB_POOL_RECYCLE', 1800),
+    }
+    if app_config.get('SQLALCHEMY_DATABASE_URI', '').startswith('sqlite'):
+        return options
+
+    options.update({
+        'poolclass': TimedQueuePool,
+        'pool_size': app_config.get('DB_POOL_SIZE', 5),
+        'max_overflow': app_config.get('DB_MAX_OVERFLOW', 10),
+        'pool_timeout': app_config.get('DB_POOL_TIMEOUT', 30),
+    })
+    return options
+
+
+def get_pool_report(engine):
+    """连接池状态报告：当前签入/签出/溢出连接数、配置上限、获取连接的等待时间及新建连接耗时"""
+    pool = engine.pool
+    report = {
+        'pid': os.getpid(),
+        'pool_class': type(pool).__name__,
+    }
+    if isinstance(pool, QueuePool):
+        report.update({
+            'size': pool.size(),
+            'checked_in': pool.checkedin(),
+            'checked_out': pool.checkedout(),
+            # overflow() 在池未满时为负数（尚可新建的常驻连接数），这里只报告实际溢出的连接数
+            'overflow': max(pool.overflow(), 0),
+            'max_overflow': pool._max_overflow,
+            'timeout': pool.timeout(),
+        })
+    report['wait'] = pool_stats.snapshot()
+    report['connect'] = pool_stats.connect_snapshot()
+    return report
+
+
+def apply_sqlite_pragmas(engine, pragmas):
+    """SQLite 引擎每建立一个连接都执行配置的 PRAGMA（journal_mode=WAL 等）"""
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+    event.listen(engine, 'connect', set_pragmas)
@@ -0,0 +1,188 @@
+"""
+结构化日志配置
+
+- 级别：LOG_LEVEL（默认INFO），逐请求的调试信息使用DEBUG，默认级别下直接跳过，不做任何格式化
+- 截断：brief() 包装大对象（请求数据、工作簿、列配置等），只生成有限长度的摘要；消息整体再按 LOG_MAX_MESSAGE_LENGTH 截断
+- 采样：LOG_SAMPLE_RATES 按logger名前缀设置DEBUG/INFO日志的采样比例，WARNING及以上始终保留
+- 异步：日志记录放入队列，由后台线程格式化并写出，请求线程不争用stdout锁
+- 格式：LOG_FORMAT=json 输出每行一个JSON对象，默认为文本格式
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import reprlib
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+
+from flask import has_request_context, request
+
+# 日志记录中的标准属性，其余属性（通过 extra= 传入）作为结构化字段输出
+_RESERVED_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_brief_repr = reprlib.Repr()
+_brief_repr.maxstring = 200
+_brief_repr.maxother = 200
+_brief_repr.maxlist = 10
+_brief_repr.maxtuple = 10
+_brief_repr.maxset = 10
+_brief_repr.maxdict = 10
+_brief_repr.maxlevel = 3
+
+
+class Brief:
+    """延迟生成的有限长度摘要，只有日志真正输出时才格式化"""
+
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __str__(self):
+        if isinstance(self.value, str):
+            return _brief_repr.repr(self.value)[1:-1]
+        return _brief_repr.repr(self.value)
+
+    __repr__ = __str__
+
+
+def brief(value):
+    """包装日志参数中可能很大的对象"""
+    return Brief(value)
+
+
+def parse_sample_rates(text):
+    """解析 "app.DataProject=0.1,app.Utils=0.5" 格式的采样配置"""
+    rates = {}
+    for item in (text or '').split(','):
+        if '=' not in item:
+            continue
+        name, rate = item.split('=', 1)
+        try:
+            rates[name.strip()] = min(max(float(rate), 0.0), 1.0)
+        except ValueError:
+            continue
+    return rates
+
+
+class SamplingFilter(logging.Filter):
+    """按logger名前缀（最长匹配）对WARNING以下的日志采样"""
+
+    def __init__(self, rates):
+        super().__init__()
+        self.rates = sorted(rates.items(), key=lambda item: len(item[0]), reverse=True)
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or not self.rates:
+            return True
+        for prefix, rate in self.rates:
+            if record.name == prefix or record.name.startswith(prefix + '.'):
+                return rate >= 1.0 or random.random() < rate
+        return True
+
+
+class AsyncQueueHandler(QueueHandler):
+    """
+    入队前只做必须在请求线程完成的工作：生成（截断后的）消息文本、异常堆栈和请求上下文，
+    完整的格式化和写出由 QueueListener 的后台线程完成
+    """
+
+    def __init__(self, log_queue, max_message_length=2000):
+        super().__init__(log_queue)
+        self.max_message_length = max_message_length
+
+    def prepare(self, record):
+        message = record.getMessage()
+        if len(message) > self.max_message_length:
+            message = f"{message[:self.max_message_length]}...(共{len(message)}字符，已截断)"
+        record.msg = message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        if has_request_context():
+            record.http_method = request.method
+            record.http_path = request.path
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """每行输出一个JSON对象，extra= 传入的字段原样附带"""
+
+    def format(self, record):
+        payload = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED_ATTRS and not key.startswith('_'):
+                payload[key] = value
+        if record.exc_text:
+            payload['exc_info'] = record.exc_text
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """文本格式，extra= 传入的字段以 key=value 追加在消息后"""
+
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)s [%(name)s] %(message)s')
+
+    def format(self, record):
+        text = super().format(record)
+        fields = [f"{key}={value}" for key, value in vars(record).items()
+                  if key not in _RESERVED_ATTRS and not key.startswith('_')]
+        if fields:
+            first_line, _, rest = text.partition('\n')
+            text = f"{first_line} | {' '.join(fields)}" + (f"\n{rest}" if rest else '')
+        return text
+
+
+_listener = None
+
+
+def setup_logging(app_config):
+    """配置根logger：队列异步输出、采样、截断，重复调用时替换之前的配置"""
+    global _listener
+
+    root = logging.getLogger()
+    root.setLevel(app_config.get('LOG_LEVEL', 'INFO'))
+
+    _stop_listener()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(JsonFormatter() if app_config.get('LOG_FORMAT') == 'json' else TextFormatter())
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = AsyncQueueHandler(log_queue, app_config.get('LOG_MAX_MESSAGE_LENGTH', 2000))
+    queue_handler.addFilter(SamplingFilter(parse_sample_rates(app_config.get('LOG_SAMPLE_RATES', ''))))
+    root.addHandler(queue_handler)
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def _restart_listener_after_fork():
+    # fork（如gunicorn预加载后创建worker）不会复制后台线程，子进程中重新启动写日志的线程
+    global _listener
+    if _listener is not None:
+        _listener = QueueListener(_listener.queue, *_listener.handlers, respect_handler_level=True)
+        _listener.start()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_restart_listener_after_fork)
+
+
+@atexit.register
+def _stop_listener():
+    # 退出前把队列中剩余的日志写完；已停止的监听器不能再次stop
+    if _listener is not None and _listener._thread is not None:
+        _listener.stop()
@@ -0,0 +1,202 @@
+"""
+按需的分阶段内存分析（tracemalloc）
+
+开启方式：MEMORY_PROFILE_ENABLED=1 后，管理员请求携带请求头 X-Memory-Profile: 1 或查询参数 __memprofile=1；
+MEMORY_PROFILE_ALL=1 时分析所有请求（tracemalloc 会明显拖慢请求，仅用于压测/排查环境）。
+
+每个 stage_timer 阶段（excel_read、transform、chart_plot、chart_render、excel_write）记录：
+- peak_mb：阶段内相对阶段开始时的内存峰值增量
+- net_mb：阶段结束时仍未释放的内存
+- top：阶段内新增内存最多的代码位置（前 MEMORY_PROFILE_TOP_N 个）
+
+结果写入日志；调试模式或管理员请求时追加到JSON响应的 _memory_profile 字段，响应头 X-Memory-Peak 为整个请求的峰值（字节）。
+tracemalloc 统计的是整个进程，同一worker并发处理多个请求时结果会互相叠加，分析时建议使用单线程worker。
+"""
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from flask import g, request
+
+from app.admin.auth import is_admin_request
+
+logger = logging.getLogger(__name__)
+
+_MB = 1024 * 1024
+
+_active_profile = ContextVar('memory_profile', default=None)
+
+# 多个请求同时分析时共用 tracemalloc，最后一个结束的请求负责停止
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_tracing_started_here = False
+
+_PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+_IGNORED_FILES = (tracemalloc.__file__, __file__)
+
+
+def _short_path(file_name):
+    """去掉项目根目录和 site-packages 前缀，缩短日志中的文件路径"""
+    if file_name.startswith(_PROJECT_ROOT):
+        return os.path.relpath(file_name, _PROJECT_ROOT)
+    marker = 'site-packages' + os.sep
+    index = file_name.find(marker)
+    return file_name[index + len(marker):] if index >= 0 else file_name
+
+
+def _acquire_tracing(frames):
+    global _tracing_users, _tracing_started_here
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+            _tracing_started_here = True
+        _tracing_users += 1
+
+
+def _release_tracing():
+    global _tracing_users, _tracing_started_here
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0 and _tracing_started_here:
+            tracemalloc.stop()
+            _tracing_started_here = False
+
+
+class MemoryProfile:
+    """单个请求的分阶段内存统计"""
+
+    def __init__(self, top_n=10):
+        self.top_n = top_n
+        self.stages = []
+        self.peak = 0
+        self.start_current = 0
+        self._stack = []
+
+    def start(self):
+        self.start_current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+
+    def _fold_peak(self):
+        # 嵌套阶段开始时会 reset_peak，先把到目前为止的峰值计入外层阶段和整个请求
+        peak = tracemalloc.get_traced_memory()[1]
+        for frame in self._stack:
+            frame['peak'] = max(frame['peak'], peak)
+        self.peak = max(self.peak, peak)
+        tracemalloc.reset_peak()
+
+    def _top_allocations(self, before, after):
+        filters = [tracemalloc.Filter(False, file_name) for file_name in _IGNORED_FILES]
+        stats = after.filter_traces(filters).compare_to(before.filter_traces(filters), 'lineno')
+        top = []
+        for stat in stats:
+            if stat.size_diff <= 0:
+                continue
+            frame = stat.traceback[0]
+            top.append({
+                'location': f"{_short_path(frame.filename)}:{frame.lineno}",
+                'size_kb': round(stat.size_diff / 1024, 1),
+                'count': stat.count_diff,
+            })
+            if len(top) >= self.top_n:
+                break
+        return top
+
+    @contextmanager
+    def stage(self, name):
+        """统计代码块的内存峰值、净增和主要分配位置"""
+        self._fold_peak()
+        before = tracemalloc.take_snapshot()
+        start_current = tracemalloc.get_traced_memory()[0]
+        frame = {'peak': start_current}
+        self._stack.append(frame)
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start_time
+            self._fold_peak()
+            self._stack.pop()
+            end_current = tracemalloc.get_traced_memory()[0]
+            after = tracemalloc.take_snapshot()
+            self.stages.append({
+                'stage': name,
+                'duration_ms': round(duration * 1000, 1),
+                'peak_bytes': frame['peak'] - start_current,
+                'peak_mb': round((frame['peak'] - start_current) / _MB, 2),
+                'net_mb': round((end_current - start_current) / _MB, 2),
+                'top': self._top_allocations(before, after),
+            })
+            # 释放快照后再继续统计，快照本身不计入后续阶段的峰值
+            del before, after
+            tracemalloc.reset_peak()
+
+    def report(self):
+        self._fold_peak()
+        return {
+            'peak_mb': round((self.peak - self.start_current) / _MB, 2),
+            'peak_bytes': self.peak - self.start_current,
+            'stages': self.stages,
+        }
+
+
+def current_memory_profile():
+    """当前请求的内存分析对象，未开启时返回None"""
+    return _active_profile.get()
+
+
+def _requested():
+    value = request.headers.get('X-Memory-Profile') or request.args.get('__memprofile')
+    return bool(value) and value != '0'
+
+
+def init_memory_profile(app):
+    """注册按需内存分析钩子"""
+    if not app.config.get('MEMORY_PROFILE_ENABLED', False):
+        return
+
+    profile_all = app.config.get('MEMORY_PROFILE_ALL', False)
+    top_n = app.config.get('MEMORY_PROFILE_TOP_N', 10)
+    frames = app.config.get('MEMORY_PROFILE_FRAMES', 1)
+
+    @app.before_request
+    def start_memory_profile():
+        if not profile_all and not (_requested() and is_admin_request()):
+            return
+        _acquire_tracing(frames)
+        profile = MemoryProfile(top_n)
+        profile.start()
+        g.memory_profile = (profile, _active_profile.set(profile))
+
+    @app.after_request
+    def attach_memory_profile(response):
+        state = g.get('memory_profile')
+        if state is None:
+            return response
+        report = state[0].report()
+
+        logger.info("请求内存峰值 %.2fMB: %s %s", report['peak_mb'], request.method, request.path)
+        for stage in report['stages']:
+            top_sites = ', '.join(f"{site['location']}({site['size_kb']}KB)" for site in stage['top'][:3])
+            logger.info("阶段 %s 内存峰值 %.2fMB，净增 %.2fMB，主要分配位置: %s",
+                        stage['stage'], stage['peak_mb'], stage['net_mb'], top_sites or '-')
+
+        response.headers['X-Memory-Peak'] = str(report['peak_bytes'])
+        if (app.debug or is_admin_request()) and response.is_json:
+            payload = response.get_json(silent=True)
+            if isinstance(payload, dict):
+                payload['_memory_profile'] = report
+                response.set_data(app.json.dumps(payload))
+        return response
+
+    @app.teardown_request
+    def stop_memory_profile(exc=None):
+        state = g.pop('memory_profile', None)
+        if state is None:
+            return
+        _active_profile.reset(state[1])
+        _release_tracing()
+
@@ -0,0 +1,242 @@
+"""
+进程内指标注册表，以 Prometheus 文本格式在 /metrics 输出
+
+- 按路由统计请求数（含状态码）、延迟直方图、处理中请求数
+- stage_timer / timed_stage 统计各处理阶段耗时：excel_read、csv_read、transform、excel_write、chart_plot、chart_render、db
+- 开启内存分析（见 memory_profile）的请求同时统计各阶段的内存峰值
+
+多进程（gunicorn多worker）部署时每个worker各自统计，Prometheus 按实例分别抓取或在查询时聚合。
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+
+from flask import g, request
+
+from app.core.memory_profile import current_memory_profile
+
+# 请求延迟与阶段耗时的默认分桶（秒），覆盖毫秒级接口到数十秒的制图/大表合并
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labelnames, labelvalues, extra=()):
+    pairs = list(zip(labelnames, labelvalues)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape_label(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    metric_type = ''
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"指标 {self.name} 需要标签 {self.labelnames}，实际为 {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.metric_type}']
+        with self._lock:
+            items = sorted(self._values.items())
+        for labelvalues, value in items:
+            lines.extend(self._render_sample(labelvalues, value))
+        return lines
+
+    def _render_sample(self, labelvalues, value):
+        return [f'{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}']
+
+
+class Counter(_Metric):
+    metric_type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    metric_type = 'gauge'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    metric_type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [各分桶计数..., +Inf计数], 总和
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][bisect.bisect_left(self.buckets, value)] += 1
+            state[1] += value
+
+    def _render_sample(self, labelvalues, value):
+        bucket_counts, total = value
+        lines = []
+        cumulative = 0
+        for upper_bound, count in zip(self.buckets + (float('inf'),), bucket_counts):
+            cumulative += count
+            labels = _format_labels(self.labelnames, labelvalues, [('le', _format_value(upper_bound))])
+            lines.append(f'{self.name}_bucket{labels} {cumulative}')
+        labels = _format_labels(self.labelnames, labelvalues)
+        lines.append(f'{self.name}_sum{labels} {_format_value(total)}')
+        lines.append(f'{self.name}_count{labels} {cumulative}')
+        return lines
+
+
+class MetricsRegistry:
+    """进程内指标注册表"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric_class, name, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = metric_class(name, *args, **kwargs)
+            elif not isinstance(metric, metric_class):
+                raise ValueError(f"指标 {name} 已注册为 {metric.metric_type}")
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def render(self):
+        """输出 Prometheus 文本格式"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+REQUEST_COUNT = registry.counter(
+    'http_requests_total', '按路由和状态码统计的请求数', ('method', 'route', 'status'))
+REQUEST_LATENCY = registry.histogram(
+    'http_request_duration_seconds', '按路由统计的请求处理耗时（秒）', ('method', 'route'))
+REQUESTS_IN_FLIGHT = registry.gauge(
+    'http_requests_in_flight', '按路由统计的处理中请求数', ('method', 'route'))
+STAGE_LATENCY = registry.histogram(
+    'app_stage_duration_seconds', '各处理阶段耗时（秒）：excel_read/csv_read/transform/excel_write/chart_plot/chart_render/db',
+    ('stage',))
+STAGE_MEMORY_PEAK = registry.histogram(
+    'app_stage_memory_peak_bytes', '开启内存分析的请求中各处理阶段的内存峰值增量（字节）', ('stage',),
+    buckets=tuple(2 ** power * 1024 * 1024 for power in range(0, 12)))
+
+
+@contextmanager
+def stage_timer(stage):
+    """统计代码块耗时，计入 app_stage_duration_seconds{stage=...}；当前请求开启内存分析时同时统计内存"""
+    memory_profile = current_memory_profile()
+    start = time.perf_counter()
+    try:
+        with memory_profile.stage(stage) if memory_profile is not None else nullcontext():
+            yield
+    finally:
+        STAGE_LATENCY.observe(time.perf_counter() - start, stage=stage)
+        if memory_profile is not None and memory_profile.stages:
+            STAGE_MEMORY_PEAK.observe(memory_profile.stages[-1]['peak_bytes'], stage=stage)
+
+
+def timed_stage(stage):
+    """stage_timer 的装饰器形式"""
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage_timer(stage):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _route_label():
+    # 使用路由规则而不是实际路径，避免 /api/project/1、/api/project/2 产生无限多的标签
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+
+def init_metrics(app):
+    """注册请求指标钩子和 /metrics 端点"""
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+
+    @app.before_request
+    def start_request_metrics():
+        g.metrics_start = time.perf_counter()
+        g.metrics_labels = {'method': request.method, 'route': _route_label()}
+        REQUESTS_IN_FLIGHT.inc(**g.metrics_labels)
+
+    @app.after_request
+    def record_response_status(response):
+        g.metrics_status = response.status_code
+        return response
+
+    @app.teardown_request
+    def finish_request_metrics(exc=None):
+        labels = g.pop('metrics_labels', None)
+        if labels is None:
+            return
+        REQUESTS_IN_FLIGHT.dec(**labels)
+        REQUEST_LATENCY.observe(time.perf_counter() - g.pop('metrics_start'), **labels)
+        REQUEST_COUNT.inc(status=g.pop('metrics_status', 500), **labels)
+
+        # 本次请求的数据库总耗时（由 query_budget 统计）
+        tracker = g.get('query_tracker')
+        if tracker is not None and tracker.count:
+            STAGE_LATENCY.observe(tracker.total_time, stage='db')
+
+    @app.route('/metrics')
+    def metrics():
+        """Prometheus 指标"""
+        return registry.render(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
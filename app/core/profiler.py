@@ -0,0 +1,181 @@
+"""
+按需的单请求性能分析（仅管理员）
+
+请求头 X-Profile: sampling|cprofile 或查询参数 __profile=sampling|cprofile（值为1时使用 PROFILE_MODE）开启：
+- sampling：后台线程定时采集处理线程的调用栈，输出折叠栈文件（.collapsed），可直接拖入 speedscope 查看火焰图
+- cprofile：cProfile 确定性分析，输出 pstats 文件（.prof），可用 snakeviz 或 pstats 查看
+
+文件保存在 PROFILE_DIR，只保留最近 PROFILE_KEEP 份，通过 /admin/api/profiles 列出和下载。
+"""
+import cProfile
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from flask import g, request
+
+from app.admin.auth import is_admin_request
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MODES = ('sampling', 'cprofile')
+PROFILE_SUFFIXES = {'sampling': '.collapsed', 'cprofile': '.prof'}
+
+
+class StackSampler:
+    """采样分析器：每隔 interval 秒记录一次目标线程的调用栈"""
+
+    def __init__(self, thread_id, interval=0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+
+    @staticmethod
+    def _format_frame(frame):
+        code = frame.f_code
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(self._format_frame(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def write(self, file_path):
+        """写出折叠栈格式：每行“栈帧;栈帧;... 采样次数”"""
+        with open(file_path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class CProfileProfiler:
+    """cProfile 确定性分析器（只统计当前线程）"""
+
+    def __init__(self):
+        self._profile = cProfile.Profile()
+
+    def start(self):
+        self._profile.enable()
+
+    def stop(self):
+        self._profile.disable()
+
+    def write(self, file_path):
+        self._profile.dump_stats(file_path)
+
+
+def requested_profile_mode(default_mode):
+    """解析请求中的分析开关，未开启时返回None"""
+    value = request.headers.get('X-Profile') or request.args.get('__profile')
+    if not value or value == '0':
+        return None
+    return value if value in PROFILE_MODES else default_mode
+
+
+def list_profiles(profile_dir):
+    """按时间倒序列出已保存的分析结果"""
+    if not os.path.isdir(profile_dir):
+        return []
+    profiles = []
+    for file_name in os.listdir(profile_dir):
+        if not file_name.endswith('.json'):
+            continue
+        try:
+            with open(os.path.join(profile_dir, file_name), 'r', encoding='utf-8') as f:
+                profiles.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    profiles.sort(key=lambda profile: profile.get('id', ''), reverse=True)
+    return profiles
+
+
+def _prune_profiles(profile_dir, keep):
+    for profile in list_profiles(profile_dir)[keep:]:
+        for file_name in (profile.get('file_name'), f"{profile.get('id')}.json"):
+            if file_name:
+                try:
+                    os.remove(os.path.join(profile_dir, file_name))
+                except OSError:
+                    pass
+
+
+def init_profiler(app):
+    """注册按需分析钩子"""
+    if not app.config.get('PROFILE_ENABLED', True):
+        return
+
+    profile_dir = app.config['PROFILE_DIR']
+    default_mode = app.config.get('PROFILE_MODE', 'sampling')
+    interval = app.config.get('PROFILE_SAMPLE_INTERVAL_MS', 5) / 1000
+    keep = app.config.get('PROFILE_KEEP', 50)
+
+    @app.before_request
+    def start_profiling():
+        mode = requested_profile_mode(default_mode)
+        if mode is None or not is_admin_request():
+            return
+        profiler = StackSampler(threading.get_ident(), interval) if mode == 'sampling' else CProfileProfiler()
+        try:
+            profiler.start()
+        except ValueError as e:
+            # 同一进程同时只能启用一个cProfile
+            logger.warning("无法开启性能分析: %s", e)
+            return
+        g.profiler = (mode, profiler, time.perf_counter())
+
+    @app.after_request
+    def save_profile(response):
+        state = g.pop('profiler', None)
+        if state is None:
+            return response
+        mode, profiler, start = state
+        profiler.stop()
+        duration_ms = round((time.perf_counter() - start) * 1000, 1)
+
+        profile_id = f"{datetime.now().strftime('%Y%m%d%H%M%S%f')}_{os.getpid()}"
+        file_name = profile_id + PROFILE_SUFFIXES[mode]
+        try:
+            os.makedirs(profile_dir, exist_ok=True)
+            profiler.write(os.path.join(profile_dir, file_name))
+            with open(os.path.join(profile_dir, f"{profile_id}.json"), 'w', encoding='utf-8') as f:
+                json.dump({
+                    'id': profile_id,
+                    'file_name': file_name,
+                    'mode': mode,
+                    'method': request.method,
+                    'path': request.path,
+                    'endpoint': request.endpoint,
+                    'status': response.status_code,
+                    'duration_ms': duration_ms,
+                    'created_at': datetime.now().isoformat(timespec='seconds'),
+                }, f, ensure_ascii=False)
+            _prune_profiles(profile_dir, keep)
+            response.headers['X-Profile-Id'] = profile_id
+        except OSError as e:
+            logger.error("保存性能分析结果失败: %s", e)
+        return response
+
+    @app.teardown_request
+    def stop_profiling(exc=None):
+        # after_request 未执行（如请求处理中断）时也要停止采样线程
+        state = g.pop('profiler', None)
+        if state is not None:
+            state[1].stop()
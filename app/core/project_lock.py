@@ -0,0 +1,160 @@
+"""
+项目级读写锁（跨进程）
+
+gunicorn 的多个worker进程可能同时保存、导入、合并同一个项目的工作簿，线程锁无法在进程之间互斥。
+每个项目使用一个锁文件（默认 SHEET_DATA_DIR/.locks/<项目ID>.lock），用 fcntl.flock 加共享锁（读）或排他锁（写）：
+
+- 不同项目的锁互不影响，完全并行
+- 同一项目的写操作串行，读操作之间并行，读写互斥
+- 进程崩溃时锁由操作系统释放，不会遗留
+
+写入本身仍然先写同目录临时文件再原子替换（见 app/Utils/excel_writer.py），锁只负责让读-改-写的操作
+（合并表、追加页签）不互相覆盖，并保证读取方拿到的工作簿与当前工作簿指针一致。
+读取工作簿的接口（加载工作簿、Sheet/表格表头、生成图表、合并前校验列名）都持有读锁，
+Windows 上被打开的文件不能被 os.replace 替换，读写必须互斥。
+
+Windows（waitress）没有 flock，使用 msvcrt.locking 的排他锁，同一项目的读操作之间也会串行。
+锁在同一线程内可重入：持有写锁时再获取同一项目的读锁或写锁直接通过（如合并表在写锁内校验列名时读取工作簿）。
+"""
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import current_app, jsonify, request
+
+from app.core.metrics import stage_timer
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+READ = 'read'
+WRITE = 'write'
+
+# 当前线程持有的锁：{锁文件路径: READ/WRITE}
+_held = threading.local()
+
+
+def _held_locks():
+    locks = getattr(_held, 'locks', None)
+    if locks is None:
+        locks = _held.locks = {}
+    return locks
+
+
+class ProjectLockTimeout(Exception):
+    """等待项目锁超时（其他请求长时间占用同一项目）"""
+
+    def __init__(self, key, timeout):
+        super().__init__(f'项目 {key} 正在被其他操作占用，请稍后重试')
+        self.key = key
+        self.timeout = timeout
+
+
+class ProjectLock:
+    """单个项目的读写锁，用法：with ProjectLock(lock_dir, project_id).write(): ..."""
+
+    POLL_INTERVAL = 0.05
+
+    def __init__(self, lock_dir, key, timeout=60):
+        self.key = key
+        self.path = os.path.join(lock_dir, f'{key}.lock')
+        self.timeout = timeout
+
+    def read(self):
+        return self._locked(WRITE if fcntl is None else READ)
+
+    def write(self):
+        return self._locked(WRITE)
+
+    @contextmanager
+    def _locked(self, mode):
+        held = _held_locks()
+        current = held.get(self.path)
+        if current == WRITE or current == mode:
+            yield
+            return
+        if current == READ:
+            # 升级锁需要先释放读锁，期间其他写操作可能插入，调用方应一开始就获取写锁
+            raise RuntimeError(f'持有项目 {self.key} 的读锁时不能再获取写锁')
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            with stage_timer('lock_wait'):
+                self._acquire(fd, mode)
+            held[self.path] = mode
+            try:
+                yield
+            finally:
+                del held[self.path]
+                self._release(fd)
+        finally:
+            os.close(fd)
+
+    def _try_lock(self, fd, mode):
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, (fcntl.LOCK_EX if mode == WRITE else fcntl.LOCK_SH) | fcntl.LOCK_NB)
+            else:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
+
+    def _acquire(self, fd, mode):
+        start = time.monotonic()
+        while not self._try_lock(fd, mode):
+            waited = time.monotonic() - start
+            if waited >= self.timeout:
+                logger.warning("等待项目锁超时: %s (%s, %.1fs)", self.key, mode, waited)
+                raise ProjectLockTimeout(self.key, self.timeout)
+            time.sleep(self.POLL_INTERVAL)
+        waited = time.monotonic() - start
+        if waited >= self.POLL_INTERVAL:
+            logger.debug("获取项目锁 %s (%s) 等待 %.2fs", self.key, mode, waited)
+
+    def _release(self, fd):
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        else:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+def project_lock(project_id):
+    """按当前应用的配置创建项目锁：PROJECT_LOCK_DIR（默认 SHEET_DATA_DIR/.locks）、PROJECT_LOCK_TIMEOUT"""
+    config = current_app.config
+    lock_dir = config.get('PROJECT_LOCK_DIR') or os.path.join(config['SHEET_DATA_DIR'], '.locks')
+    return ProjectLock(lock_dir, project_id, config.get('PROJECT_LOCK_TIMEOUT', 60))
+
+
+def locked_project(mode, key=None):
+    """
+    视图装饰器：整个请求期间持有项目的读锁（READ）或写锁（WRITE），等待超时返回503
+
+    key 为根据视图参数（URL参数字典）计算锁名的函数，默认使用 project_id。
+    上传的文件在加锁前解析（写入临时文件），慢速上传不占用项目锁
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            request.files  # noqa: B018 触发表单解析
+            lock = project_lock(key(kwargs) if key else kwargs['project_id'])
+            try:
+                with lock.write() if mode == WRITE else lock.read():
+                    return func(*args, **kwargs)
+            except ProjectLockTimeout as e:
+                return jsonify({'success': False, 'message': str(e)}), 503
+
+        return wrapper
+
+    return decorator
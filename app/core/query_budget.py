@@ -0,0 +1,127 @@
+"""
+按请求统计SQL语句数量与数据库耗时，用于发现循环中逐条查询（N+1）的问题
+
+- 每个请求结束时，同一语句形状重复超过 QUERY_REPEAT_THRESHOLD 次会记录警告日志
+- 调试模式下响应头附带 X-DB-Queries / X-DB-Time
+- 测试中可用 track_queries() 统计任意代码块的查询次数（见 test/conftest.py 的 assert_max_queries）
+"""
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from flask import g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# 当前上下文中生效的统计器（允许嵌套，例如测试中统计包含多次请求的代码块）
+_active_trackers = ContextVar('active_query_trackers', default=())
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_RE = re.compile(r'%\(\w+\)s|%s|\?|:\w+')
+_IN_LIST_RE = re.compile(r'\bIN \((?:\?(?:, )?)+\)', re.IGNORECASE)
+
+
+def statement_shape(statement):
+    """把SQL语句归一化为“形状”：去掉参数、字面量和IN列表长度的差异"""
+    shape = _WHITESPACE_RE.sub(' ', statement).strip()
+    shape = _LITERAL_RE.sub('?', shape)
+    shape = _PLACEHOLDER_RE.sub('?', shape)
+    return _IN_LIST_RE.sub('IN (?)', shape)
+
+
+class QueryTracker:
+    """记录一段代码执行的SQL语句数量、总耗时及各语句形状的出现次数"""
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.shapes = Counter()
+
+    def record(self, statement, seconds):
+        self.count += 1
+        self.total_time += seconds
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated_statements(self, threshold):
+        """返回重复次数超过threshold的语句形状 [(形状, 次数)]"""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count > threshold]
+
+    def report(self):
+        lines = [f"共 {self.count} 条SQL, 耗时 {self.total_time * 1000:.1f}ms"]
+        lines.extend(f"  {count} x {shape}" for shape, count in self.shapes.most_common())
+        return '\n'.join(lines)
+
+
+@contextmanager
+def track_queries():
+    """统计代码块内执行的SQL语句"""
+    install_query_listeners()
+    tracker = QueryTracker()
+    token = _active_trackers.set(_active_trackers.get() + (tracker,))
+    try:
+        yield tracker
+    finally:
+        _active_trackers.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # 执行失败时不会触发after事件，这里直接覆盖而不是入栈，避免连接复用时残留数据累积
+    if _active_trackers.get():
+        conn.info['query_budget_start'] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_time = conn.info.pop('query_budget_start', None)
+    if start_time is None:
+        return
+    elapsed = time.perf_counter() - start_time
+    for tracker in _active_trackers.get():
+        tracker.record(statement, elapsed)
+
+
+def install_query_listeners():
+    """在所有Engine上注册语句执行事件（重复调用无副作用）"""
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+def init_query_budget(app):
+    """为应用注册按请求统计SQL的钩子"""
+    if not app.config.get('QUERY_BUDGET_ENABLED', True):
+        return
+    install_query_listeners()
+    threshold = app.config.get('QUERY_REPEAT_THRESHOLD', 10)
+
+    @app.before_request
+    def start_query_tracking():
+        tracker = QueryTracker()
+        g.query_tracker = tracker
+        g.query_tracker_token = _active_trackers.set(_active_trackers.get() + (tracker,))
+
+    @app.after_request
+    def report_query_budget(response):
+        tracker = g.get('query_tracker')
+        if tracker is None:
+            return response
+
+        for shape, count in tracker.repeated_statements(threshold):
+            logger.warning("疑似N+1查询: %s %s (%s) 同一语句执行 %s 次: %s",
+                           request.method, request.path, request.endpoint, count, shape[:300])
+
+        if app.debug:
+            response.headers['X-DB-Queries'] = str(tracker.count)
+            response.headers['X-DB-Time'] = f"{tracker.total_time * 1000:.1f}ms"
+        return response
+
+    @app.teardown_request
+    def stop_query_tracking(exc=None):
+        token = g.pop('query_tracker_token', None)
+        if token is not None:
+            _active_trackers.reset(token)
@@ -0,0 +1,228 @@
+"""
+测试数据：按指定规模写入用户、项目、工作簿（Sheet/Table 及对应的xlsx文件）和图表
+
+配合 SQLite 配置在本机/CI上压测和性能分析：
+    FLASK_CONFIG=sqlite python -m app.core.seed --projects 50 --sheets 2 --tables 3 --rows 2000 --charts 10
+
+目录结构与接口保存的数据一致：工作簿在 SHEET_DATA_DIR/<项目ID>/<工作簿名>.xlsx，
+图表在 CHART_SAVE_ROOT_DIR/<项目ID>/<图表类型>/<图表名>_<图表ID>.png。
+同一规模下所有工作簿内容相同，只生成一次模板再复制。
+"""
+import argparse
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from app.core.utils import lazy_import
+
+pd = lazy_import('pandas')
+np = lazy_import('numpy')
+
+logger = logging.getLogger(__name__)
+
+# 与 ChartUtils.gen_chart 中的图表类型ID对应
+CHART_TYPES = {1: '散点图', 2: '折线图'}
+DATA_ANA_TYPES = ('描述统计', '相关性分析', '回归分析')
+CATEGORIES = ('彩椒', '番茄', '黄瓜', '茄子')
+
+
+def _next_id(db, model):
+    return (db.session.query(db.func.max(model.id)).scalar() or 0) + 1
+
+
+def build_workbook_template(file_path, tables, rows, columns, seed=42):
+    """生成工作簿模板，返回页签名列表"""
+    rng = np.random.default_rng(seed)
+    table_names = [f'数据表{i + 1}' for i in range(tables)]
+    with pd.ExcelWriter(file_path, engine='openpyxl') as writer:
+        for table_name in table_names:
+            data = {
+                '编号': np.arange(rows),
+                '时间': pd.date_range('2025-01-01', periods=rows, freq='h'),
+                '分类': rng.choice(CATEGORIES, size=rows),
+            }
+            for i in range(columns):
+                data[f'指标{i + 1}'] = rng.normal(25, 8, size=rows).round(2)
+            pd.DataFrame(data).to_excel(writer, sheet_name=table_name, index=False)
+    return table_names
+
+
+def build_chart_template(file_path):
+    """生成一张小尺寸的图表图片，作为所有测试图表的文件内容"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    fig = plt.figure(figsize=(4, 3))
+    plt.plot([0, 1, 2, 3], [1, 3, 2, 4], marker='o')
+    fig.savefig(file_path, dpi=50)
+    plt.close(fig)
+
+
+def seed_reference_data(db):
+    """写入图表类型和数据分析类型（已存在时跳过），并清除本进程的参考数据缓存"""
+    from app.DataProject.modules import ChartType, DataAnaType
+    from app.Utils.reference_cache import ReferenceCache
+
+    for type_id, type_name in CHART_TYPES.items():
+        if db.session.get(ChartType, type_id) is None:
+            db.session.add(ChartType(id=type_id, type_name=type_name))
+    existing = {item.type_name for item in DataAnaType.query.all()}
+    for type_name in DATA_ANA_TYPES:
+        if type_name not in existing:
+            db.session.add(DataAnaType(type_name=type_name))
+    db.session.commit()
+    ReferenceCache.invalidate_chart_types()
+    ReferenceCache.invalidate_data_ana_types()
+
+
+def seed_database(app, db, projects=10, users=20, members=3, sheets=2, tables=3, rows=500, columns=5, charts=5,
+                  seed=42):
+    """
+    按规模写入测试数据
+
+    参数:
+        projects: 项目数
+        users: 用户数，每个项目随机关联 members 个成员
+        sheets: 每个项目的工作簿数
+        tables: 每个工作簿的页签数
+        rows/columns: 每个页签的行数和指标列数
+        charts: 每个项目的图表数
+
+    返回:
+        dict: 各类数据的数量及首个项目ID
+    """
+    from werkzeug.security import generate_password_hash
+
+    from app.DataProject.modules import (ChartData, ChartProject, DataProject, ProjectUser, ProjectWorkbook, Sheet,
+                                         SheetProject, Table)
+    from app.user.modules import User
+
+    rng = np.random.default_rng(seed)
+    start = time.perf_counter()
+    sheet_data_dir = app.config['SHEET_DATA_DIR']
+    chart_root_dir = app.config['CHART_SAVE_ROOT_DIR']
+
+    with app.app_context():
+        seed_reference_data(db)
+
+        template_dir = tempfile.mkdtemp(prefix='seed_templates_')
+        workbook_template = os.path.join(template_dir, 'workbook.xlsx')
+        chart_template = os.path.join(template_dir, 'chart.png')
+        table_names = build_workbook_template(workbook_template, tables, rows, columns, seed)
+        if charts:
+            build_chart_template(chart_template)
+
+        created_at = datetime.utcnow() - timedelta(days=30)
+
+        # 用户（密码哈希计算较慢，所有测试用户共用一个）
+        user_id = _next_id(db, User)
+        password_hash = generate_password_hash('seed-password')
+        suffix = int(time.time())
+        user_ids = list(range(user_id, user_id + users))
+        db.session.bulk_insert_mappings(User, [
+            {'id': uid, 'username': f'seed_{suffix}_{uid}', 'email': f'seed_{suffix}_{uid}@example.com',
+             'password_hash': password_hash}
+            for uid in user_ids
+        ])
+
+        project_id = _next_id(db, DataProject)
+        sheet_id = _next_id(db, Sheet)
+        chart_id = _next_id(db, ChartData)
+        project_ids = list(range(project_id, project_id + projects))
+        project_rows, member_rows, sheet_rows, sheet_project_rows, table_rows = [], [], [], [], []
+        workbook_rows = []
+        chart_rows, chart_project_rows = [], []
+
+        for index, pid in enumerate(project_ids):
+            project_rows.append({'id': pid, 'name': f'测试项目{pid}', 'description': f'第{index + 1}个测试项目'})
+            if user_ids:
+                for uid in rng.choice(user_ids, size=min(members, len(user_ids)), replace=False):
+                    member_rows.append({'user_id': int(uid), 'project_id': pid})
+
+            project_dir = os.path.join(sheet_data_dir, str(pid))
+            os.makedirs(project_dir, exist_ok=True)
+            for i in range(sheets):
+                workbook_name = f'测试工作簿{pid}_{i + 1}'
+                file_path = os.path.join(project_dir, f'{workbook_name}.xlsx')
+                shutil.copyfile(workbook_template, file_path)
+                sheet_time = created_at + timedelta(minutes=index * sheets + i)
+                sheet_rows.append({'id': sheet_id, 'name': workbook_name, 'file_path': file_path,
+                                   'created_at': sheet_time, 'updated_at': sheet_time})
+                sheet_project_rows.append({'sheet_id': sheet_id, 'project_id': pid, 'created_at': sheet_time})
+                table_rows.extend({'name': table_name, 'sheet_id': sheet_id} for table_name in table_names)
+                sheet_id += 1
+            if sheets:
+                # 最后保存的工作簿为项目的当前工作簿
+                workbook_rows.append({'project_id': pid, 'sheet_id': sheet_id - 1, 'file_path': file_path,
+                                      'updated_at': sheet_time})
+
+            for i in range(charts):
+                chart_type_id = i % len(CHART_TYPES) + 1
+                chart_name = f'测试图表{pid}_{i + 1}'
+                chart_dir = os.path.join(chart_root_dir, str(pid), CHART_TYPES[chart_type_id])
+                os.makedirs(chart_dir, exist_ok=True)
+                file_path = os.path.join(chart_dir, f'{chart_name}_{chart_id}.png')
+                shutil.copyfile(chart_template, file_path)
+                chart_time = created_at + timedelta(minutes=index * charts + i)
+                chart_rows.append({'id': chart_id, 'chart_type_id': chart_type_id, 'chart_name': chart_name,
+                                   'file_path': file_path, 'created_at': chart_time})
+                chart_project_rows.append({'chart_id': chart_id, 'project_id': pid, 'created_at': chart_time})
+                chart_id += 1
+
+        for model, mappings in ((DataProject, project_rows), (ProjectUser, member_rows), (Sheet, sheet_rows),
+                                (SheetProject, sheet_project_rows), (ProjectWorkbook, workbook_rows),
+                                (Table, table_rows), (ChartData, chart_rows), (ChartProject, chart_project_rows)):
+            db.session.bulk_insert_mappings(model, mappings)
+        db.session.commit()
+        shutil.rmtree(template_dir, ignore_errors=True)
+
+    summary = {
+        'projects': len(project_rows),
+        'users': len(user_ids),
+        'project_users': len(member_rows),
+        'sheets': len(sheet_rows),
+        'tables': len(table_rows),
+        'charts': len(chart_rows),
+        'first_project_id': project_ids[0] if project_ids else None,
+        'seconds': round(time.perf_counter() - start, 2),
+    }
+    logger.info("测试数据写入完成: %s", summary)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='按规模写入测试数据（建议配合 FLASK_CONFIG=sqlite 使用）')
+    parser.add_argument('--projects', type=int, default=10, help='项目数')
+    parser.add_argument('--users', type=int, default=20, help='用户数')
+    parser.add_argument('--members', type=int, default=3, help='每个项目的成员数')
+    parser.add_argument('--sheets', type=int, default=2, help='每个项目的工作簿数')
+    parser.add_argument('--tables', type=int, default=3, help='每个工作簿的页签数')
+    parser.add_argument('--rows', type=int, default=500, help='每个页签的行数')
+    parser.add_argument('--columns', type=int, default=5, help='每个页签的指标列数')
+    parser.add_argument('--charts', type=int, default=5, help='每个项目的图表数')
+    parser.add_argument('--reset', action='store_true', help='写入前清空所有表')
+    parser.add_argument('--seed', type=int, default=42, help='随机数种子')
+    args = parser.parse_args()
+
+    from app import create_app
+
+    app = create_app()
+    from app import db
+
+    if args.reset:
+        with app.app_context():
+            db.drop_all()
+            db.create_all()
+
+    summary = seed_database(app, db, args.projects, args.users, args.members, args.sheets, args.tables, args.rows,
+                            args.columns, args.charts, args.seed)
+    print(json.dumps(summary, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""
+慢查询日志：执行时间超过 SLOW_QUERY_THRESHOLD_MS 的SQL记录到进程内环形缓冲区，
+包括语句、脱敏后的参数、耗时、发起请求的视图函数，SELECT 语句在 MySQL/SQLite 上附带 EXPLAIN 结果。
+通过 /admin/api/slow_queries 查看。
+"""
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from flask import has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# 参数值只保留类型和长度，不记录具体内容（可能包含用户名、邮箱等）
+_MAX_PARAM_ITEMS = 20
+
+
+def redact_value(value):
+    if value is None or isinstance(value, (bool, int, float)):
+        return f'<{type(value).__name__}>'
+    if isinstance(value, (str, bytes)):
+        return f'<{type(value).__name__} len={len(value)}>'
+    return f'<{type(value).__name__}>'
+
+
+def redact_parameters(parameters):
+    """脱敏SQL参数：dict 保留键名，序列保留位置"""
+    if isinstance(parameters, dict):
+        items = list(parameters.items())[:_MAX_PARAM_ITEMS]
+        return {key: redact_value(value) for key, value in items}
+    if isinstance(parameters, (list, tuple)):
+        return [redact_value(value) for value in list(parameters)[:_MAX_PARAM_ITEMS]]
+    return redact_value(parameters)
+
+
+class SlowQueryLog:
+    """保留最近 maxlen 条慢查询的环形缓冲区（线程安全）"""
+
+    def __init__(self, maxlen=200):
+        self._lock = threading.Lock()
+        self._records = deque(maxlen=maxlen)
+        self.total = 0
+
+    def resize(self, maxlen):
+        with self._lock:
+            self._records = deque(self._records, maxlen=maxlen)
+
+    def add(self, record):
+        with self._lock:
+            self._records.append(record)
+            self.total += 1
+
+    def records(self, limit=None):
+        """按耗时从高到低返回慢查询记录"""
+        with self._lock:
+            records = list(self._records)
+        records.sort(key=lambda record: record['duration_ms'], reverse=True)
+        return records[:limit] if limit else records
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+            self.total = 0
+
+
+slow_query_log = SlowQueryLog()
+
+_settings = {
+    'threshold': 0.2,
+    'explain': True,
+}
+
+
+def explain_statement(conn, statement, parameters):
+    """用同一个DBAPI连接执行 EXPLAIN，返回执行计划的行列表；不支持的数据库返回None"""
+    dialect = conn.dialect.name
+    if dialect == 'sqlite':
+        explain_sql = f'EXPLAIN QUERY PLAN {statement}'
+    elif dialect == 'mysql':
+        explain_sql = f'EXPLAIN {statement}'
+    else:
+        return None
+
+    # 直接使用底层DBAPI游标，避免再次触发引擎事件
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(explain_sql, parameters)
+        columns = [column[0] for column in cursor.description or []]
+        return [dict(zip(columns, (str(value) for value in row))) for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info['slow_query_start'] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_time = conn.info.pop('slow_query_start', None)
+    if start_time is None:
+        return
+    elapsed = time.perf_counter() - start_time
+    if elapsed < _settings['threshold']:
+        return
+
+    record = {
+        'time': datetime.now().isoformat(timespec='seconds'),
+        'duration_ms': round(elapsed * 1000, 2),
+        'statement': statement,
+        'parameters': redact_parameters(parameters),
+        'executemany': executemany,
+        'view': request.endpoint if has_request_context() else None,
+        'path': request.path if has_request_context() else None,
+        'explain': None,
+    }
+
+    if _settings['explain'] and not executemany and statement.lstrip().upper().startswith('SELECT'):
+        try:
+            record['explain'] = explain_statement(conn, statement, parameters)
+        except Exception as e:
+            record['explain_error'] = str(e)
+
+    slow_query_log.add(record)
+    logger.warning("慢查询 %sms (%s): %s", record['duration_ms'], record['view'], statement[:300])
+
+
+def init_slow_query_log(app):
+    """根据配置注册慢查询监听"""
+    if not app.config.get('SLOW_QUERY_LOG_ENABLED', True):
+        return
+
+    _settings['threshold'] = app.config.get('SLOW_QUERY_THRESHOLD_MS', 200) / 1000
+    _settings['explain'] = app.config.get('SLOW_QUERY_EXPLAIN', True)
+    slow_query_log.resize(app.config.get('SLOW_QUERY_LOG_SIZE', 200))
+
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
@@ -0,0 +1,381 @@
+"""
+上传文件处理
+
+- MAX_CONTENT_LENGTH 限制请求体大小：声明的 Content-Length 超限时不读取请求体直接返回413，
+  未声明长度（分块传输）时读到超限为止
+- UploadRequest：multipart 中的文件由解析器分块直接写入 UPLOAD_FOLDER 下的临时文件，不在内存中缓冲，
+  视图可以直接按路径读取（stored_upload_path），请求结束时删除
+- UploadSweeper：定期清理 UPLOAD_FOLDER 中超过 UPLOAD_TEMP_MAX_AGE 的遗留文件（如worker被强制结束时未删除的）
+- ChunkedUpload：断点续传的分片上传会话，状态全部保存在磁盘上（多worker进程共享），
+  每个分片单独落盘并校验SHA-256，完成时按顺序流式拼接到目标文件
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+
+from flask import Request, current_app, request
+from werkzeug.exceptions import RequestEntityTooLarge
+
+from app.Utils.RequestsUtils import RequestsUtils
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_PREFIX = 'upload_'
+UPLOAD_SUFFIX = '.part'
+
+
+class UploadRequest(Request):
+    """上传文件直接落盘的请求类"""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        upload_dir = current_app.config['UPLOAD_FOLDER']
+        os.makedirs(upload_dir, exist_ok=True)
+        # delete=False：Windows 下删除标记的临时文件无法被再次按路径打开，改为在 close() 中删除
+        stream = tempfile.NamedTemporaryFile('wb+', dir=upload_dir, prefix=UPLOAD_PREFIX, suffix=UPLOAD_SUFFIX,
+                                             delete=False)
+        self.track_upload_path(stream.name)
+        return stream
+
+    def track_upload_path(self, path):
+        """登记请求结束时需要删除的临时文件"""
+        self.__dict__.setdefault('_upload_paths', []).append(path)
+
+    def close(self):
+        super().close()
+        for path in self.__dict__.pop('_upload_paths', []):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning("删除上传临时文件失败 %s: %s", path, e)
+
+
+def stored_upload_path(file_storage):
+    """
+    上传文件在磁盘上的路径（UploadRequest 已写入临时文件时直接返回，不再复制），请求结束后文件即被删除
+    """
+    stream = file_storage.stream
+    path = getattr(stream, 'name', None)
+    if isinstance(path, str) and os.path.isfile(path):
+        stream.flush()
+        return path
+
+    # 非 UploadRequest 解析的文件（如内存中的小文件）写入临时文件，同样在请求结束时删除
+    upload_dir = current_app.config['UPLOAD_FOLDER']
+    os.makedirs(upload_dir, exist_ok=True)
+    with tempfile.NamedTemporaryFile('wb', dir=upload_dir, prefix=UPLOAD_PREFIX, suffix=UPLOAD_SUFFIX,
+                                     delete=False) as f:
+        stream.seek(0)
+        shutil.copyfileobj(stream, f, current_app.config.get('UPLOAD_CHUNK_SIZE', 1024 * 1024))
+    request.track_upload_path(f.name)
+    return f.name
+
+
+def save_upload(file_storage, target_path, chunk_size=1024 * 1024):
+    """分块写入同目录的临时文件后原子替换目标文件，读取方不会看到写了一半的文件"""
+    target_dir = os.path.dirname(target_path)
+    os.makedirs(target_dir, exist_ok=True)
+    stream = file_storage.stream
+    stream.seek(0)
+    fd, temp_path = tempfile.mkstemp(dir=target_dir, prefix='.upload_', suffix=UPLOAD_SUFFIX)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            shutil.copyfileobj(stream, f, chunk_size)
+        os.replace(temp_path, target_path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    return target_path
+
+
+class ChunkedUploadError(Exception):
+    """分片上传请求无效，status_code 为对应的HTTP状态码，data 为附加信息（如当前偏移量）"""
+
+    def __init__(self, message, status_code=400, data=None):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+        self.data = data or {}
+
+
+class ChunkedUpload:
+    """
+    断点续传的分片上传会话
+
+    目录结构: <root>/<upload_id>/meta.json 及每个分片 <起始偏移量>.chunk。
+    已接收的连续字节数即续传偏移量，客户端断线后查询状态并从该偏移量继续上传；
+    分片先写临时文件、校验通过后再重命名，重复发送同一分片是幂等的。
+    """
+    META_FILE = 'meta.json'
+    CHUNK_SUFFIX = '.chunk'
+    ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+    def __init__(self, root, upload_id, meta):
+        self.root = root
+        self.upload_id = upload_id
+        self.directory = os.path.join(root, upload_id)
+        self.meta = meta
+
+    @classmethod
+    def create(cls, root, project_id, filename, total_size, chunk_size):
+        upload_id = uuid.uuid4().hex
+        meta = {
+            'project_id': project_id,
+            'filename': filename,
+            'total_size': total_size,
+            'chunk_size': chunk_size,
+            'created_at': time.time(),
+        }
+        upload = cls(root, upload_id, meta)
+        os.makedirs(upload.directory)
+        with open(os.path.join(upload.directory, cls.META_FILE), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+        return upload
+
+    @classmethod
+    def load(cls, root, upload_id, project_id=None):
+        """按ID读取上传会话，不存在（或已过期被清理、不属于该项目）时抛出404"""
+        if not cls.ID_PATTERN.match(upload_id or ''):
+            raise ChunkedUploadError('上传ID无效', 404)
+        try:
+            with open(os.path.join(root, upload_id, cls.META_FILE), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            raise ChunkedUploadError('上传会话不存在或已过期', 404)
+        if project_id is not None and meta.get('project_id') != project_id:
+            raise ChunkedUploadError('上传会话不存在或已过期', 404)
+        return cls(root, upload_id, meta)
+
+    @property
+    def total_size(self):
+        return self.meta['total_size']
+
+    def _chunks(self):
+        """已接收的分片 [(偏移量, 大小, 路径)]，按偏移量排序"""
+        chunks = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(self.CHUNK_SUFFIX):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                chunks.append((int(name[:-len(self.CHUNK_SUFFIX)]), os.path.getsize(path), path))
+            except (ValueError, OSError):
+                continue
+        return sorted(chunks)
+
+    def _contiguous(self):
+        """从0开始连续的分片及其结束偏移量"""
+        offset, chunks = 0, []
+        for start, size, path in self._chunks():
+            if start != offset:
+                break
+            chunks.append((start, size, path))
+            offset += size
+        return chunks, offset
+
+    @property
+    def offset(self):
+        return self._contiguous()[1]
+
+    def status(self):
+        offset = self.offset
+        return {
+            'upload_id': self.upload_id,
+            'filename': self.meta['filename'],
+            'total_size': self.total_size,
+            'chunk_size': self.meta['chunk_size'],
+            'offset': offset,
+            'complete': offset == self.total_size,
+        }
+
+    def write_chunk(self, offset, stream, checksum, buffer_size=1024 * 1024):
+        """
+        从 stream 分块读取一个分片写入磁盘，校验SHA-256后生效，返回新的续传偏移量
+
+        offset 只能是当前续传偏移量（或重传已接收的分片），否则返回409及当前偏移量
+        """
+        checksum = (checksum or '').strip().lower()
+        if not checksum:
+            raise ChunkedUploadError('缺少分片校验值（X-Chunk-SHA256）')
+        chunks = {start: size for start, size, _ in self._contiguous()[0]}
+        current = sum(chunks.values())
+        if offset != current and offset not in chunks:
+            raise ChunkedUploadError('分片偏移量与已接收的数据不连续', 409, {'offset': current})
+
+        limit = min(self.meta['chunk_size'], self.total_size - offset)
+        digest = hashlib.sha256()
+        size = 0
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                while True:
+                    block = stream.read(buffer_size)
+                    if not block:
+                        break
+                    size += len(block)
+                    if size > limit:
+                        raise ChunkedUploadError(f'分片超过允许的大小（{limit}字节）', 413, {'offset': current})
+                    digest.update(block)
+                    f.write(block)
+            if size == 0:
+                raise ChunkedUploadError('分片内容为空', 400, {'offset': current})
+            if digest.hexdigest() != checksum:
+                raise ChunkedUploadError('分片校验失败，请重新上传该分片', 422, {'offset': current})
+            if offset in chunks and chunks[offset] != size:
+                raise ChunkedUploadError('重传分片的大小与已接收的不一致', 409, {'offset': current})
+            os.replace(temp_path, os.path.join(self.directory, f'{offset:015d}{self.CHUNK_SUFFIX}'))
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+        # 更新会话的修改时间，上传中的会话不会被 UploadSweeper 当作过期文件清理
+        os.utime(os.path.join(self.directory, self.META_FILE))
+        return self.offset
+
+    def assemble(self, target_path, checksum=None, buffer_size=1024 * 1024):
+        """
+        按顺序将分片流式拼接到 target_path（先写同目录临时文件再原子替换），可选校验整个文件的SHA-256，
+        成功后删除上传会话
+        """
+        chunks, offset = self._contiguous()
+        if offset != self.total_size:
+            raise ChunkedUploadError('文件尚未上传完成', 409, {'offset': offset})
+
+        target_dir = os.path.dirname(target_path)
+        os.makedirs(target_dir, exist_ok=True)
+        digest = hashlib.sha256()
+        fd, temp_path = tempfile.mkstemp(dir=target_dir, prefix='.upload_', suffix=UPLOAD_SUFFIX)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for _, _, path in chunks:
+                    with open(path, 'rb') as chunk:
+                        while True:
+                            block = chunk.read(buffer_size)
+                            if not block:
+                                break
+                            digest.update(block)
+                            f.write(block)
+            if checksum and digest.hexdigest() != checksum.strip().lower():
+                raise ChunkedUploadError('文件校验失败，请重新上传', 422)
+            os.replace(temp_path, target_path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+        self.discard()
+        return target_path
+
+    def discard(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+class UploadSweeper:
+    """定期删除上传目录中超过 max_age 秒未修改的文件及空目录"""
+
+    def __init__(self, directory, max_age=3600, interval=600):
+        self.directory = directory
+        self.max_age = max_age
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def sweep(self, now=None):
+        """执行一次清理，返回删除的文件数"""
+        if not os.path.isdir(self.directory):
+            return 0
+        cutoff = (now or time.time()) - self.max_age
+        removed = 0
+        emptied = set()
+        for root, dirs, files in os.walk(self.directory):
+            # 分片上传会话按整体清理：以 meta.json 的修改时间（每收到一个分片更新）判断是否过期
+            if ChunkedUpload.META_FILE in files:
+                dirs[:] = []
+                try:
+                    if os.path.getmtime(os.path.join(root, ChunkedUpload.META_FILE)) < cutoff:
+                        shutil.rmtree(root)
+                        removed += len(files)
+                except OSError as e:
+                    logger.warning("清理过期的分片上传失败 %s: %s", root, e)
+                continue
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                        removed += 1
+                        emptied.add(root)
+                except FileNotFoundError:
+                    continue
+                except OSError as e:
+                    logger.warning("清理上传临时文件失败 %s: %s", path, e)
+        # 删除文件会更新目录的修改时间，本次清理过文件的空目录直接删除
+        for root, dirs, files in os.walk(self.directory, topdown=False):
+            if root == self.directory:
+                continue
+            try:
+                if not os.listdir(root) and (root in emptied or os.path.getmtime(root) < cutoff):
+                    os.rmdir(root)
+            except OSError:
+                continue
+        if removed:
+            logger.info("已清理 %s 个过期的上传临时文件", removed)
+        return removed
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.sweep()
+            except Exception:
+                logger.exception("清理上传临时文件时发生异常")
+
+    def ensure_started(self):
+        """在当前进程中启动清理线程（fork出的worker不继承父进程的线程，按进程ID判断）"""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._stop = threading.Event()
+            self._thread = threading.Thread(target=self._run, name='upload-sweeper', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+def init_uploads(app):
+    """注册上传请求类、413响应和过期临时文件清理"""
+    app.request_class = UploadRequest
+
+    @app.errorhandler(RequestEntityTooLarge)
+    def upload_too_large(e):
+        limit_mb = (app.config.get('MAX_CONTENT_LENGTH') or 0) / 1024 / 1024
+        return RequestsUtils.make_response(
+            status_code=413,
+            msg=f'上传文件超过大小限制（{limit_mb:.0f}MB）',
+            success=False
+        )
+
+    sweeper = UploadSweeper(app.config['UPLOAD_FOLDER'], app.config.get('UPLOAD_TEMP_MAX_AGE', 3600),
+                            app.config.get('UPLOAD_SWEEP_INTERVAL', 600))
+    app.extensions['upload_sweeper'] = sweeper
+    if sweeper.interval > 0:
+        app.before_request(sweeper.ensure_started)
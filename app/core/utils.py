@@ -0,0 +1,67 @@
+import importlib
+import threading
+import types
+
+# 已登记的延迟导入模块: 模块名 -> LazyModule
+_LAZY_MODULES = {}
+_LAZY_LOCK = threading.RLock()
+
+
+class LazyModule(types.ModuleType):
+    """延迟导入的模块代理，首次访问属性时才真正导入模块"""
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.__dict__['_lazy_module'] = None
+
+    def _load(self):
+        module = self.__dict__['_lazy_module']
+        if module is not None:
+            return module
+
+        with _LAZY_LOCK:
+            module = self.__dict__['_lazy_module']
+            if module is None:
+                module = importlib.import_module(self.__name__)
+                # 把真实模块的属性拷贝过来，之后的访问不再经过 __getattr__
+                self.__dict__.update(module.__dict__)
+                self.__dict__['_lazy_module'] = module
+        return module
+
+    def __getattr__(self, item):
+        return getattr(self._load(), item)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = 'loaded' if self.__dict__['_lazy_module'] is not None else 'not loaded'
+        return f'<LazyModule {self.__name__} ({state})>'
+
+
+def lazy_import(name):
+    """获取模块的延迟导入代理，同名模块共享同一个代理"""
+    with _LAZY_LOCK:
+        proxy = _LAZY_MODULES.get(name)
+        if proxy is None:
+            proxy = LazyModule(name)
+            _LAZY_MODULES[name] = proxy
+        return proxy
+
+
+def is_lazy_module_loaded(name):
+    """判断延迟导入的模块是否已经真正导入"""
+    proxy = _LAZY_MODULES.get(name)
+    return proxy is not None and proxy.__dict__['_lazy_module'] is not None
+
+
+def preload_lazy_modules(names=None):
+    """立即导入已登记（或指定）的延迟模块，返回已导入的模块名列表"""
+    with _LAZY_LOCK:
+        targets = list(names) if names else list(_LAZY_MODULES)
+
+    loaded = []
+    for name in targets:
+        lazy_import(name)._load()
+        loaded.append(name)
+    return loaded
@@ -1,18 +1,31 @@
-// 获取图表列表
-function loadChartList() {
+// 下一页图表的游标
+let nextChartCursor = null;
+
+// 获取图表列表（append为true时加载下一页并追加）
+function loadChartList(append = false) {
     const projectId = document.body.dataset.projectId;
     const chartTypeId = document.body.dataset.chartTypeId;
 
-    // 显示加载状态
-    showLoadingState();
+    if (!append) {
+        // 显示加载状态
+        showLoadingState();
+        nextChartCursor = null;
+    }
 
-    // 修复：添加 chart_type_id 参数
-    fetch(`/data/api/project/${projectId}/chart?chart_type_id=${chartTypeId}`)
+    // 修复：添加 chart_type_id 参数；首屏同时获取总数
+    let url = `/data/api/project/${projectId}/chart?chart_type_id=${chartTypeId}`;
+    url += append ? `&cursor=${encodeURIComponent(nextChartCursor)}` : '&with_count=1';
+
+    fetch(url)
         .then(response => response.json())
         .then(data => {
             if (data.success) {
-                renderChartList(data.data);
-                updateChartCount(data.data.length);
+                renderChartList(data.data, append);
+                const pagination = data.pagination || {};
+                if (!append) {
+                    updateChartCount(pagination.total !== undefined ? pagination.total : data.data.length);
+                }
+                updateLoadMoreCharts(pagination);
             } else {
                 console.error('获取图表列表失败:', data.msg);
                 showErrorState('获取图表列表失败: ' + data.msg);
@@ -24,14 +37,32 @@ function loadChartList() {
         });
 }
 
+// 更新"加载更多"按钮
+function updateLoadMoreCharts(pagination) {
+    nextChartCursor = pagination.has_more ? pagination.next_cursor : null;
+    const container = document.getElementById('load-more-charts');
+    if (container) {
+        container.style.display = nextChartCursor ? 'block' : 'none';
+    }
+}
+
+// 加载下一页图表
+function loadMoreCharts() {
+    if (nextChartCursor) {
+        loadChartList(true);
+    }
+}
+
 // 渲染图表列表
-function renderChartList(chartData) {
+function renderChartList(chartData, append = false) {
     const tbody = document.getElementById('chart-list-body');
     const emptyState = document.getElementById('empty-state');
 
-    tbody.innerHTML = '';
+    if (!append) {
+        tbody.innerHTML = '';
+    }
 
-    if (chartData.length === 0) {
+    if (chartData.length === 0 && !append) {
         emptyState.style.display = 'block';
         return;
     }
@@ -106,7 +137,7 @@ function showErrorState(message) {
             <td colspan="4" class="text-center py-4 text-danger">
                 <i class="bi bi-exclamation-triangle me-2"></i>
                 ${message}
-                <button class="btn btn-sm btn-outline-primary mt-2" onclick="loadChartList()">
+                <button class="btn btn-sm btn-outline-primary mt-2" onclick="loadChartList(false)">
                     <i class="bi bi-arrow-clockwise me-1"></i>重试
                 </button>
             </td>
@@ -0,0 +1,41 @@
+# gunicorn.conf.py
+"""
+gunicorn 配置，参数取自 app.core.config 中的 WSGI_* 配置项
+
+启动: FLASK_CONFIG=production gunicorn -c gunicorn.conf.py wsgi:app
+"""
+import os
+
+os.environ.setdefault('MPLBACKEND', 'Agg')
+
+from app.core.config import config
+
+bind = config.WSGI_BIND
+workers = config.WSGI_WORKERS
+# 线程数大于1时使用gthread worker：同一进程内的线程共享已加载的pandas/matplotlib模块，
+# 图表各自使用独立的Figure对象渲染（见 app/Utils/chart_utils.py），不共享pyplot的全局状态
+threads = config.WSGI_THREADS
+worker_class = 'gthread' if config.WSGI_THREADS > 1 else 'sync'
+timeout = config.WSGI_TIMEOUT
+graceful_timeout = config.WSGI_GRACEFUL_TIMEOUT
+keepalive = config.WSGI_KEEPALIVE
+max_requests = config.WSGI_MAX_REQUESTS
+max_requests_jitter = config.WSGI_MAX_REQUESTS_JITTER
+preload_app = config.WSGI_PRELOAD
+
+accesslog = '-'
+errorlog = '-'
+
+
+def post_fork(server, worker):
+    """fork之后丢弃从master继承的数据库连接，每个worker重新建立自己的连接池"""
+    if not preload_app:
+        return
+
+    from app import db
+    from app.core.db_pool import pool_stats
+    from wsgi import app
+
+    with app.app_context():
+        db.engine.dispose(close=False)
+    pool_stats.reset()
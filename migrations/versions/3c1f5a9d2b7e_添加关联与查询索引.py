@@ -0,0 +1,51 @@
+"""添加关联与查询索引
+
+Revision ID: 3c1f5a9d2b7e
+Revises: 8ed4837b326e
+Create Date: 2026-01-05 10:12:31.204517
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c1f5a9d2b7e'
+down_revision = '8ed4837b326e'
+branch_labels = None
+depends_on = None
+
+# (索引名, 表名, 列) —— 与模型中的 __table_args__ 保持一致，基准测试也读取此列表
+INDEXES = [
+    ('ix_project_users_project_id_user_id', 'project_users', ['project_id', 'user_id']),
+    ('ix_sheet_projects_project_id_created_at', 'sheet_projects', ['project_id', 'created_at']),
+    ('ix_tables_sheet_id', 'tables', ['sheet_id']),
+    ('ix_chart_data_chart_type_id_created_at', 'chart_data', ['chart_type_id', 'created_at']),
+    ('ix_chart_projects_project_id_chart_id', 'chart_projects', ['project_id', 'chart_id']),
+    ('ix_chart_projects_chart_id', 'chart_projects', ['chart_id']),
+    ('ix_data_ana_models_project_id_created_at', 'data_ana_models', ['project_id', 'created_at']),
+    ('ix_data_ana_models_types_model_id_type_id', 'data_ana_models_types', ['model_id', 'type_id']),
+    ('ix_data_ana_models_types_type_id_model_id', 'data_ana_models_types', ['type_id', 'model_id']),
+]
+
+
+def upgrade():
+    # 部分表由 create_all 创建，已存在的索引跳过
+    existing_tables = set(sa.inspect(op.get_bind()).get_table_names())
+    for index_name, table_name, columns in INDEXES:
+        if table_name not in existing_tables:
+            continue
+        existing_indexes = {ix['name'] for ix in sa.inspect(op.get_bind()).get_indexes(table_name)}
+        if index_name in existing_indexes:
+            continue
+        op.create_index(index_name, table_name, columns, unique=False)
+
+
+def downgrade():
+    existing_tables = set(sa.inspect(op.get_bind()).get_table_names())
+    for index_name, table_name, _ in reversed(INDEXES):
+        if table_name not in existing_tables:
+            continue
+        existing_indexes = {ix['name'] for ix in sa.inspect(op.get_bind()).get_indexes(table_name)}
+        if index_name in existing_indexes:
+            op.drop_index(index_name, table_name=table_name)
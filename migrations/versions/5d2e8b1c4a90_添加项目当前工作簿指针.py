@@ -0,0 +1,39 @@
+"""添加项目当前工作簿指针
+
+Revision ID: 5d2e8b1c4a90
+Revises: 3c1f5a9d2b7e
+Create Date: 2026-10-19 09:41:07.318254
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d2e8b1c4a90'
+down_revision = '3c1f5a9d2b7e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 表可能已由 create_all 创建；已有项目的指针在首次访问时由扫描项目目录回填
+    if 'project_workbooks' in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.create_table(
+        'project_workbooks',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('project_id', sa.Integer(), nullable=False),
+        sa.Column('sheet_id', sa.Integer(), nullable=True),
+        sa.Column('file_path', sa.String(length=500), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_project_workbooks_project_id', 'project_workbooks', ['project_id'], unique=True)
+
+
+def downgrade():
+    if 'project_workbooks' not in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.drop_index('ix_project_workbooks_project_id', table_name='project_workbooks')
+    op.drop_table('project_workbooks')
@@ -0,0 +1,63 @@
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+import pytest
+
+# 配置在导入时按 FLASK_CONFIG 选择，必须在任何测试导入 app 之前设置：
+# 进程内的测试使用嵌入式SQLite（数据放在本次测试的临时目录），不依赖MySQL；显式设置的环境变量优先
+_SQLITE_DATA_DIR = tempfile.mkdtemp(prefix='data_ana_sys_test_')
+os.environ.setdefault('FLASK_CONFIG', 'sqlite')
+os.environ.setdefault('SQLITE_DATA_DIR', _SQLITE_DATA_DIR)
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(_SQLITE_DATA_DIR, ignore_errors=True)
+
+
+@pytest.fixture(scope='session')
+def app():
+    """
+    进程内的应用（整个测试会话只创建一次：模型在首次创建应用时绑定到 app.db），已写入少量种子数据
+
+    需要 FLASK_CONFIG=sqlite（默认），其他配置下跳过
+    """
+    pytest.importorskip('flask_sqlalchemy')
+    if os.environ['FLASK_CONFIG'] != 'sqlite':
+        pytest.skip('进程内应用只在 FLASK_CONFIG=sqlite 下创建')
+    from app import create_app
+    from app.core.seed import seed_database
+
+    application = create_app()
+    from app import db
+    application.seed_summary = seed_database(application, db, projects=5, users=10, members=3, sheets=1, tables=2,
+                                             rows=5, columns=2, charts=1)
+    return application
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def assert_max_queries():
+    """
+    断言代码块内执行的SQL语句不超过给定数量，用于发现N+1回归
+
+        def test_project_list(client, assert_max_queries):
+            with assert_max_queries(2):
+                client.get('/data/api/projects')
+    """
+    pytest.importorskip('flask')
+    pytest.importorskip('sqlalchemy')
+    from app.core.query_budget import track_queries
+
+    @contextmanager
+    def _assert_max_queries(max_count):
+        with track_queries() as tracker:
+            yield tracker
+        assert tracker.count <= max_count, f"SQL数量超出预算 {max_count}:\n{tracker.report()}"
+
+    return _assert_max_queries
@@ -0,0 +1,150 @@
+"""
+Excel 读取引擎基准测试
+
+用合成工作簿（见 workbook_factory）按常见的工作簿形状，对比各读取引擎（见 app/Utils/excel_reader.py）：
+- all_sheets：读取全部工作表（加载工作簿）
+- one_sheet：读取一张工作表（图表、合并表）
+- header：读取前5行（表头接口）
+- sheet_names：只读取页签列表
+
+未安装的引擎（如 python-calamine）跳过；auto 一列为自动选择的结果，括号中为选中的引擎。
+
+用法:
+    python -m test.test_benchmark.bench_excel_readers --repeat 5 --output bench_excel_readers.json
+    python -m test.test_benchmark.bench_excel_readers --shapes tall,wide --scale 0.1
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import tempfile
+import time
+from datetime import datetime
+
+from test.test_benchmark.bench_hot_paths import measure
+from test.test_benchmark.workbook_factory import generate_workbook
+
+# 形状名 -> (每表行数, 数据列数, 工作表数)
+SHAPES = {
+    'small': (500, 10, 3),       # 日常录入的小工作簿
+    'tall': (50000, 10, 1),      # 传感器长时间序列
+    'wide': (5000, 80, 1),       # 指标很多的宽表
+    'multi': (10000, 15, 5),     # 多页签待合并的工作簿
+}
+CASES = ('all_sheets', 'one_sheet', 'header', 'sheet_names')
+ENGINES = ('openpyxl', 'calamine', 'auto')
+
+
+def run_case(case, path, engine):
+    from app.Utils.excel_reader import ExcelReader
+
+    if case == 'all_sheets':
+        return ExcelReader.read(path, sheet_name=None, engine=engine)
+    if case == 'one_sheet':
+        return ExcelReader.read(path, sheet_name=0, engine=engine)
+    if case == 'header':
+        return ExcelReader.read(path, sheet_name=0, nrows=5, engine=engine)
+    return ExcelReader.sheet_names(path, engine=engine)
+
+
+def selected_engine(case, path):
+    from app.Utils.excel_reader import ExcelReader
+
+    return ExcelReader.select_engine(path, nrows={'header': 5, 'sheet_names': 0}.get(case))
+
+
+def bench_shape(shape, path, repeat, engines=ENGINES, cases=CASES):
+    """返回 {用例: {引擎: 统计}}，auto 的统计中附带实际选中的引擎"""
+    from app.Utils.excel_reader import engine_available
+
+    results = {}
+    for case in cases:
+        results[case] = {}
+        for engine in engines:
+            if engine != 'auto' and not engine_available(engine):
+                continue
+            run_case(case, path, engine)  # 预热：首次导入引擎模块不计时
+            result = measure(lambda: run_case(case, path, engine), repeat)
+            if engine == 'auto':
+                result['selected'] = selected_engine(case, path)
+            results[case][engine] = result
+    return results
+
+
+def run(shapes, repeat, scale=1.0, engines=ENGINES, cases=CASES, seed=42, work_dir=None):
+    work_dir = work_dir or tempfile.mkdtemp(prefix='bench_excel_readers_')
+    report = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'params': {'repeat': repeat, 'scale': scale, 'seed': seed},
+        'shapes': {},
+    }
+    for shape in shapes:
+        rows, columns, sheets = SHAPES[shape]
+        rows = max(int(rows * scale), 10)
+        path = os.path.join(work_dir, f'{shape}.xlsx')
+        generate_workbook(path, rows, columns, sheets, seed=seed)
+        size_kb = round(os.path.getsize(path) / 1024)
+        print(f"=== {shape}: {sheets} 个工作表 x {rows} 行 x {columns} 列, {size_kb}KB ===")
+        report['shapes'][shape] = {
+            'rows': rows, 'columns': columns, 'sheets': sheets, 'size_kb': size_kb,
+            'results': bench_shape(shape, path, repeat, engines, cases),
+        }
+    return report
+
+
+def print_report(report):
+    engines = [engine for engine in ENGINES
+               if any(engine in case_results for shape in report['shapes'].values()
+                      for case_results in shape['results'].values())]
+    print(f"{'形状':<8}{'用例':<14}" + ''.join(f"{engine + ' p50(ms)':>22}" for engine in engines))
+    for shape, shape_report in report['shapes'].items():
+        for case, case_results in shape_report['results'].items():
+            cells = []
+            for engine in engines:
+                result = case_results.get(engine)
+                if not result:
+                    cells.append(f"{'-':>22}")
+                    continue
+                text = f"{result['p50_ms']:.1f}"
+                if 'selected' in result:
+                    text += f" ({result['selected'] or 'default'})"
+                cells.append(f"{text:>22}")
+            print(f"{shape:<8}{case:<14}" + ''.join(cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Excel 读取引擎基准测试')
+    parser.add_argument('--shapes', default=','.join(SHAPES), help='工作簿形状，逗号分隔')
+    parser.add_argument('--scale', type=float, default=1.0, help='行数缩放比例，快速验证时可设为0.1')
+    parser.add_argument('--repeat', type=int, default=3, help='每个用例执行次数')
+    parser.add_argument('--engines', default=','.join(ENGINES), help='参与对比的引擎，逗号分隔')
+    parser.add_argument('--cases', default=','.join(CASES), help='要执行的用例，逗号分隔')
+    parser.add_argument('--seed', type=int, default=42, help='随机数种子')
+    parser.add_argument('--output', default='', help='结果JSON输出路径')
+    args = parser.parse_args()
+
+    shapes = [shape for shape in args.shapes.split(',') if shape]
+    unknown = set(shapes) - set(SHAPES)
+    if unknown:
+        parser.error(f"未知形状: {', '.join(sorted(unknown))}")
+
+    work_dir = tempfile.mkdtemp(prefix='bench_excel_readers_')
+    start = time.perf_counter()
+    try:
+        report = run(shapes, args.repeat, args.scale, tuple(args.engines.split(',')), tuple(args.cases.split(',')),
+                     args.seed, work_dir)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print_report(report)
+    print(f"总耗时 {time.perf_counter() - start:.1f}s")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"结果已保存到: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
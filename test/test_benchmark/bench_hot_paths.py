@@ -0,0 +1,274 @@
+"""
+工作簿、合并表、图表热点路径基准测试
+
+用合成工作簿（见 workbook_factory）分别计时：
+- convert_excel_to_json：加载工作簿
+- convert_dict_to_excel：保存工作簿
+- merge_tables：ExcelExec.merge_tables 合并表（每次在工作簿副本上执行，复制不计时）
+- scatter_chart / line_chart：绘图 + save_chart 保存图片
+- sheet_headers / table_headers：表头接口（SQLite临时库 + 测试客户端）
+
+结果保存为JSON，指定 --compare 时与上次结果对比，p50 变慢超过 --max-regression 倍时以非0状态码退出。
+
+用法:
+    python -m test.test_benchmark.bench_hot_paths --rows 10000 --columns 20 --output bench_hot_paths.json
+    python -m test.test_benchmark.bench_hot_paths --rows 10000 --compare bench_hot_paths.json
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from datetime import datetime
+
+# 基准测试在无显示环境中运行，matplotlib 使用非交互后端
+os.environ.setdefault('MPLBACKEND', 'Agg')
+# 服务器上通常没有中文字体，缺字警告不影响计时
+warnings.filterwarnings('ignore', message='Glyph .* missing from font')
+
+from test.test_benchmark.workbook_factory import (  # noqa: E402
+    CATEGORY_COLUMN, DTYPES, KEY_COLUMN, TIME_COLUMN, generate_workbook)
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+CASES = ('convert_excel_to_json', 'convert_dict_to_excel', 'merge_tables', 'scatter_chart', 'line_chart',
+         'sheet_headers', 'table_headers')
+
+
+def summarize(timings):
+    """延迟统计（毫秒）"""
+    timings = sorted(timings)
+    return {
+        'repeat': len(timings),
+        'min_ms': round(timings[0], 2),
+        'p50_ms': round(statistics.median(timings), 2),
+        'p95_ms': round(timings[math.ceil(len(timings) * 0.95) - 1], 2),
+        'max_ms': round(timings[-1], 2),
+        'mean_ms': round(statistics.fmean(timings), 2),
+    }
+
+
+def measure(func, repeat, setup=None):
+    """执行 repeat 次 func，setup 的返回值作为 func 的参数且不计入耗时"""
+    timings = []
+    for i in range(repeat):
+        args = setup(i) if setup else ()
+        start = time.perf_counter()
+        func(*args)
+        timings.append((time.perf_counter() - start) * 1000)
+    return summarize(timings)
+
+
+def configure_app(work_dir):
+    """
+    基准测试使用临时目录和SQLite库，必须在导入 app 的业务模块之前调用
+    （项目默认配置连接MySQL，图表保存到 src_Data 下）
+    """
+    from app.core.config import config
+
+    config.SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(work_dir, 'bench.db')}"
+    config.SHEET_DATA_DIR = os.path.join(work_dir, 'SheetData')
+    config.CHART_SAVE_ROOT_DIR = os.path.join(work_dir, 'ChartData')
+    config.LOG_LEVEL = 'WARNING'
+    config.DEBUG = True
+
+
+def bench_workbook(workbook_path, work_dir, repeat):
+    from app.Utils.data_project_utils import DataProjectUtils
+
+    results = {'convert_excel_to_json': measure(lambda: DataProjectUtils.convert_excel_to_json(workbook_path), repeat)}
+
+    workbook_dict = DataProjectUtils.convert_excel_to_json(workbook_path)
+    output_path = os.path.join(work_dir, 'saved.xlsx')
+    results['convert_dict_to_excel'] = measure(
+        lambda: DataProjectUtils.convert_dict_to_excel(workbook_dict, output_path), repeat)
+    return results
+
+
+def bench_merge(workbook_path, layout, work_dir, repeat):
+    from app.Utils.data_detail_utils import ExcelExec
+
+    sheet_names = list(layout['sheets'])
+    param_data = {
+        'targetTableName': sheet_names[0],
+        'sourceTableNames': sheet_names[1:],
+        'matchColumns': [KEY_COLUMN],
+        'mergeColumns': [{'tableName': name, 'columns': layout['numeric_columns'][name][:2]}
+                         for name in sheet_names[1:]],
+    }
+
+    def setup(i):
+        copy_path = os.path.join(work_dir, f'merge_{i}.xlsx')
+        shutil.copyfile(workbook_path, copy_path)
+        return (copy_path,)
+
+    def merge(copy_path):
+        if not ExcelExec.merge_tables(copy_path, param_data):
+            raise RuntimeError("合并表失败")
+
+    return {'merge_tables': measure(merge, repeat, setup)}
+
+
+def bench_charts(workbook_path, layout, repeat):
+    import pandas as pd
+
+    from app.Utils.chart_utils import ChartUtils
+
+    sheet_name = next(iter(layout['sheets']))
+    data = pd.read_excel(workbook_path, sheet_name=sheet_name)
+    y_axis = layout['numeric_columns'][sheet_name][:2]
+
+    results = {}
+    for case, chart_func, x_axis in (('scatter_chart', ChartUtils.scatter_chart, y_axis[0]),
+                                     ('line_chart', ChartUtils.line_chart, TIME_COLUMN)):
+        def render():
+            fig = chart_func(data=data, x_axis=x_axis, y_axis=y_axis[1:] or y_axis, category=CATEGORY_COLUMN,
+                             chart_name=case)
+            ChartUtils.save_chart(fig, project_id='bench', chart_type_name=case, chart_name=case, chart_id=0)
+
+        results[case] = measure(render, repeat)
+    return results
+
+
+def bench_header_endpoints(workbook_path, layout, repeat):
+    from app import create_app
+
+    app = create_app()
+    from app import db
+    from app.DataProject.modules import DataProject, Sheet, SheetProject, Table
+
+    with app.app_context():
+        db.create_all()
+        project = DataProject(name='基准测试项目')
+        sheet = Sheet(name='基准测试工作簿', file_path=workbook_path)
+        db.session.add_all([project, sheet])
+        db.session.flush()
+        db.session.add(SheetProject(sheet_id=sheet.id, project_id=project.id))
+        table = Table(name=next(iter(layout['sheets'])), sheet_id=sheet.id)
+        db.session.add(table)
+        db.session.commit()
+        sheet_id, table_id = sheet.id, table.id
+
+    client = app.test_client()
+
+    def get(url):
+        response = client.get(url)
+        if response.status_code != 200:
+            raise RuntimeError(f"{url} 返回 {response.status_code}: {response.get_data(as_text=True)[:200]}")
+
+    return {
+        'sheet_headers': measure(lambda: get(f'/data/api/sheets/{sheet_id}/headers'), repeat),
+        'table_headers': measure(lambda: get(f'/data/api/tables/{table_id}/headers'), repeat),
+    }
+
+
+def run(rows, columns, sheets, dtypes, key_cardinality, repeat, cases=CASES, seed=42, work_dir=None):
+    """执行基准测试，返回结果字典"""
+    work_dir = work_dir or tempfile.mkdtemp(prefix='bench_hot_paths_')
+    configure_app(work_dir)
+
+    workbook_path = os.path.join(work_dir, 'bench.xlsx')
+    start = time.perf_counter()
+    layout = generate_workbook(workbook_path, rows, columns, sheets, dtypes, key_cardinality, seed)
+    print(f"=== 生成工作簿: {sheets} 个工作表 x {rows} 行 x {columns} 列, "
+          f"耗时 {time.perf_counter() - start:.1f}s, {os.path.getsize(workbook_path) / 1024:.0f}KB ===")
+
+    results = {}
+    if {'convert_excel_to_json', 'convert_dict_to_excel'} & set(cases):
+        results.update(bench_workbook(workbook_path, work_dir, repeat))
+    if 'merge_tables' in cases:
+        results.update(bench_merge(workbook_path, layout, work_dir, repeat))
+    if {'scatter_chart', 'line_chart'} & set(cases):
+        results.update(bench_charts(workbook_path, layout, repeat))
+    if {'sheet_headers', 'table_headers'} & set(cases):
+        results.update(bench_header_endpoints(workbook_path, layout, repeat))
+
+    return {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'params': {'rows': rows, 'columns': columns, 'sheets': sheets, 'dtypes': list(dtypes),
+                   'key_cardinality': key_cardinality or rows, 'repeat': repeat, 'seed': seed},
+        'results': {case: results[case] for case in cases if case in results},
+    }
+
+
+def compare(report, baseline, max_regression):
+    """与基线对比 p50，返回变慢超过阈值的用例"""
+    if report['params'] != baseline.get('params'):
+        print(f"警告: 参数与基线不一致，对比结果仅供参考（基线: {baseline.get('params')}）")
+
+    regressions = []
+    print(f"{'用例':<24}{'基线p50(ms)':>14}{'本次p50(ms)':>14}{'比值':>8}")
+    for case, result in report['results'].items():
+        base = baseline.get('results', {}).get(case)
+        if not base:
+            continue
+        ratio = result['p50_ms'] / base['p50_ms'] if base['p50_ms'] else float('inf')
+        flag = ' <-- 变慢' if ratio > max_regression else ''
+        print(f"{case:<24}{base['p50_ms']:>14.2f}{result['p50_ms']:>14.2f}{ratio:>7.2f}x{flag}")
+        if ratio > max_regression:
+            regressions.append(case)
+    return regressions
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR, capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='工作簿、合并表、图表热点路径基准测试')
+    parser.add_argument('--rows', type=int, default=5000, help='每个工作表的行数')
+    parser.add_argument('--columns', type=int, default=10, help='每个工作表的数据列数（不含编号/时间/分类）')
+    parser.add_argument('--sheets', type=int, default=3, help='工作表数量')
+    parser.add_argument('--dtypes', default=','.join(DTYPES), help='数据列类型，逗号分隔')
+    parser.add_argument('--key-cardinality', type=int, default=0, help='编号列不同取值的数量，默认等于行数')
+    parser.add_argument('--repeat', type=int, default=5, help='每个用例执行次数')
+    parser.add_argument('--cases', default=','.join(CASES), help='要执行的用例，逗号分隔')
+    parser.add_argument('--seed', type=int, default=42, help='随机数种子')
+    parser.add_argument('--output', default='', help='结果JSON输出路径')
+    parser.add_argument('--compare', default='', help='基线结果JSON路径')
+    parser.add_argument('--max-regression', type=float, default=1.2, help='p50 允许的最大变慢倍数')
+    args = parser.parse_args()
+
+    cases = tuple(case for case in args.cases.split(',') if case)
+    unknown = set(cases) - set(CASES)
+    if unknown:
+        parser.error(f"未知用例: {', '.join(sorted(unknown))}")
+
+    work_dir = tempfile.mkdtemp(prefix='bench_hot_paths_')
+    try:
+        report = run(args.rows, args.columns, args.sheets, tuple(args.dtypes.split(',')),
+                     args.key_cardinality or None, args.repeat, cases, args.seed, work_dir)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"{'用例':<24}{'p50(ms)':>12}{'p95(ms)':>12}{'max(ms)':>12}")
+    for case, result in report['results'].items():
+        print(f"{case:<24}{result['p50_ms']:>12.2f}{result['p95_ms']:>12.2f}{result['max_ms']:>12.2f}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"结果已保存到: {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            regressions = compare(report, json.load(f), args.max_regression)
+        if regressions:
+            print(f"性能回退: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
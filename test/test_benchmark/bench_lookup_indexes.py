@@ -0,0 +1,213 @@
+"""
+关联表索引基准测试
+
+向各关联/查询表写入大量数据（默认每张表100万行），分别在添加索引前后执行热点查询，
+对比查询延迟。索引定义直接读取迁移脚本中的 INDEXES 列表。
+
+用法:
+    python -m test.test_benchmark.bench_lookup_indexes --rows 1000000 --output bench_indexes.json
+"""
+import argparse
+import ast
+import glob
+import json
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+MIGRATION_GLOB = os.path.join(ROOT_DIR, 'migrations', 'versions', '3c1f5a9d2b7e_*.py')
+
+TABLE_DDL = [
+    "CREATE TABLE project_users (id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, project_id INTEGER NOT NULL)",
+    "CREATE TABLE sheet_projects (id INTEGER PRIMARY KEY, sheet_id INTEGER NOT NULL, project_id INTEGER NOT NULL, "
+    "created_at DATETIME)",
+    "CREATE TABLE tables (id INTEGER PRIMARY KEY, name VARCHAR(255) NOT NULL, sheet_id INTEGER NOT NULL, "
+    "created_at DATETIME, updated_at DATETIME)",
+    "CREATE TABLE chart_data (id INTEGER PRIMARY KEY, chart_type_id INTEGER NOT NULL, chart_name VARCHAR(255) NOT NULL, "
+    "file_path VARCHAR(500), created_at DATETIME)",
+    "CREATE TABLE chart_projects (id INTEGER PRIMARY KEY, chart_id INTEGER NOT NULL, project_id INTEGER NOT NULL, "
+    "created_at DATETIME)",
+    "CREATE TABLE data_ana_models (id INTEGER PRIMARY KEY, name VARCHAR(255) NOT NULL, file_path VARCHAR(500) NOT NULL, "
+    "table_id INTEGER NOT NULL, project_id INTEGER NOT NULL, created_at DATETIME, updated_at DATETIME)",
+    "CREATE TABLE data_ana_models_types (id INTEGER PRIMARY KEY, model_id INTEGER NOT NULL, type_id INTEGER NOT NULL, "
+    "created_at DATETIME)",
+]
+
+# (名称, SQL, 参数生成函数) —— 对应各接口中的热点查询
+QUERIES = [
+    ('项目成员', "SELECT user_id FROM project_users WHERE project_id IN (?, ?, ?, ?, ?)",
+     lambda s: [random.randint(1, s['projects']) for _ in range(5)]),
+    ('项目最新Sheet', "SELECT sheet_id FROM sheet_projects WHERE project_id = ? "
+                   "ORDER BY created_at DESC, id DESC LIMIT 1",
+     lambda s: [random.randint(1, s['projects'])]),
+    ('Sheet下的页签', "SELECT id, name FROM tables WHERE sheet_id = ?",
+     lambda s: [random.randint(1, s['sheets'])]),
+    ('项目图表分页', "SELECT cd.id, cd.chart_name FROM chart_data cd "
+               "JOIN chart_projects cp ON cp.chart_id = cd.id WHERE cp.project_id = ? "
+               "ORDER BY cd.created_at DESC, cd.id DESC LIMIT 50",
+     lambda s: [random.randint(1, s['projects'])]),
+    ('类型图表分页', "SELECT id, chart_name FROM chart_data WHERE chart_type_id = ? "
+               "ORDER BY created_at DESC, id DESC LIMIT 50",
+     lambda s: [random.randint(1, s['chart_types'])]),
+    ('图表所属项目', "SELECT project_id FROM chart_projects WHERE chart_id = ?",
+     lambda s: [random.randint(1, s['rows'])]),
+    ('项目分析模型分页', "SELECT id, name FROM data_ana_models WHERE project_id = ? "
+                 "ORDER BY created_at DESC, id DESC LIMIT 50",
+     lambda s: [random.randint(1, s['projects'])]),
+    ('模型的分析类型', "SELECT model_id, type_id FROM data_ana_models_types WHERE model_id IN (?, ?, ?, ?, ?)",
+     lambda s: [random.randint(1, s['rows']) for _ in range(5)]),
+    ('类型下的模型', "SELECT model_id FROM data_ana_models_types WHERE type_id = ? LIMIT 50",
+     lambda s: [random.randint(1, s['ana_types'])]),
+]
+
+
+def load_migration_indexes():
+    """从迁移脚本中读取 INDEXES 列表（只解析字面量，不导入alembic）"""
+    paths = glob.glob(MIGRATION_GLOB)
+    if not paths:
+        raise FileNotFoundError(f"未找到索引迁移脚本: {MIGRATION_GLOB}")
+
+    with open(paths[0], 'r', encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(getattr(t, 'id', None) == 'INDEXES' for t in node.targets):
+            return ast.literal_eval(node.value)
+    raise ValueError("迁移脚本中没有 INDEXES 定义")
+
+
+def seed(conn, rows, batch_size=50000):
+    """写入测试数据，返回数据规模信息"""
+    scale = {
+        'rows': rows,
+        'projects': max(rows // 1000, 1),
+        'sheets': max(rows // 10, 1),
+        'chart_types': 10,
+        'ana_types': 20,
+        'users': max(rows // 100, 1),
+    }
+    base_time = datetime(2025, 1, 1)
+
+    def created_at(i):
+        return (base_time + timedelta(seconds=i * 7)).isoformat(sep=' ')
+
+    generators = {
+        'project_users': ("INSERT INTO project_users (user_id, project_id) VALUES (?, ?)",
+                          lambda i: (random.randint(1, scale['users']), random.randint(1, scale['projects']))),
+        'sheet_projects': ("INSERT INTO sheet_projects (sheet_id, project_id, created_at) VALUES (?, ?, ?)",
+                           lambda i: (i % scale['sheets'] + 1, random.randint(1, scale['projects']), created_at(i))),
+        'tables': ("INSERT INTO tables (name, sheet_id, created_at) VALUES (?, ?, ?)",
+                   lambda i: (f'Sheet{i % 8}', random.randint(1, scale['sheets']), created_at(i))),
+        'chart_data': ("INSERT INTO chart_data (chart_type_id, chart_name, file_path, created_at) VALUES (?, ?, ?, ?)",
+                       lambda i: (random.randint(1, scale['chart_types']), f'chart_{i}', f'/charts/{i}.png',
+                                  created_at(i))),
+        'chart_projects': ("INSERT INTO chart_projects (chart_id, project_id, created_at) VALUES (?, ?, ?)",
+                           lambda i: (i + 1, random.randint(1, scale['projects']), created_at(i))),
+        'data_ana_models': ("INSERT INTO data_ana_models (name, file_path, table_id, project_id, created_at) "
+                            "VALUES (?, ?, ?, ?, ?)",
+                            lambda i: (f'model_{i}', f'/models/{i}.xlsx', random.randint(1, rows),
+                                       random.randint(1, scale['projects']), created_at(i))),
+        'data_ana_models_types': ("INSERT INTO data_ana_models_types (model_id, type_id, created_at) VALUES (?, ?, ?)",
+                                  lambda i: (random.randint(1, rows), random.randint(1, scale['ana_types']),
+                                             created_at(i))),
+    }
+
+    for table_name, (sql, make_row) in generators.items():
+        start = time.perf_counter()
+        for offset in range(0, rows, batch_size):
+            conn.executemany(sql, (make_row(i) for i in range(offset, min(offset + batch_size, rows))))
+        conn.commit()
+        print(f"写入 {table_name}: {rows} 行, 耗时 {time.perf_counter() - start:.1f}s")
+
+    conn.execute("ANALYZE")
+    return scale
+
+
+def run_queries(conn, scale, repeat):
+    """执行热点查询，返回每个查询的延迟统计（毫秒）"""
+    results = {}
+    for name, sql, make_params in QUERIES:
+        timings = []
+        for _ in range(repeat):
+            params = make_params(scale)
+            start = time.perf_counter()
+            conn.execute(sql, params).fetchall()
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        results[name] = {
+            'p50_ms': round(statistics.median(timings), 3),
+            'p95_ms': round(timings[int(len(timings) * 0.95) - 1], 3),
+            'max_ms': round(timings[-1], 3),
+        }
+    return results
+
+
+def create_indexes(conn, indexes):
+    """按迁移脚本的定义创建索引，返回耗时（秒）"""
+    start = time.perf_counter()
+    for index_name, table_name, columns in indexes:
+        conn.execute(f"CREATE INDEX {index_name} ON {table_name} ({', '.join(columns)})")
+    conn.execute("ANALYZE")
+    conn.commit()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='关联表索引基准测试')
+    parser.add_argument('--rows', type=int, default=1_000_000, help='每张关联表写入的行数')
+    parser.add_argument('--repeat', type=int, default=50, help='每个查询执行次数')
+    parser.add_argument('--db', default='', help='SQLite数据库文件路径，默认使用临时文件')
+    parser.add_argument('--output', default='', help='结果JSON输出路径')
+    parser.add_argument('--seed', type=int, default=42, help='随机数种子')
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    indexes = load_migration_indexes()
+
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix='bench_indexes_'), 'bench.db')
+    if os.path.exists(db_path):
+        os.remove(db_path)
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=OFF")
+    for ddl in TABLE_DDL:
+        conn.execute(ddl)
+
+    print(f"=== 写入测试数据: 每张表 {args.rows} 行, 数据库: {db_path} ===")
+    scale = seed(conn, args.rows)
+
+    print("=== 无索引查询 ===")
+    before = run_queries(conn, scale, args.repeat)
+
+    index_seconds = create_indexes(conn, indexes)
+    print(f"=== 创建 {len(indexes)} 个索引, 耗时 {index_seconds:.1f}s ===")
+
+    after = run_queries(conn, scale, args.repeat)
+    conn.close()
+
+    print(f"{'查询':<12}{'无索引p50(ms)':>16}{'有索引p50(ms)':>16}{'加速比':>10}")
+    report = []
+    for name, _, _ in QUERIES:
+        speedup = before[name]['p50_ms'] / after[name]['p50_ms'] if after[name]['p50_ms'] else float('inf')
+        print(f"{name:<12}{before[name]['p50_ms']:>16.3f}{after[name]['p50_ms']:>16.3f}{speedup:>9.1f}x")
+        report.append({'query': name, 'before': before[name], 'after': after[name], 'speedup': round(speedup, 1)})
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({
+                'rows': args.rows,
+                'repeat': args.repeat,
+                'index_build_seconds': round(index_seconds, 2),
+                'created_at': datetime.now().isoformat(),
+                'results': report,
+            }, f, ensure_ascii=False, indent=2)
+        print(f"结果已保存到: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,375 @@
+"""
+HTTP压测：按比例回放典型用户操作，统计各接口吞吐量和延迟分位数
+
+场景（--mix 设置权重）：
+- open：打开项目 —— 项目详情、Sheet列表、加载工作簿
+- save：编辑并保存工作簿 —— 加载工作簿、修改单元格、保存
+- chart：生成图表 —— Sheet信息、页签列表、表头、生成图表
+- merge：合并表 —— 加载工作簿、合并第一个页签与第二个页签
+
+每个并发用户循环执行：随机选择场景和项目，执行完整流程，直到 --duration 秒或 --iterations 次。
+merge/save 会修改项目的工作簿，建议使用 SQLite 配置和测试数据：
+
+    FLASK_CONFIG=sqlite python -m app.core.seed --projects 20 --rows 2000 --reset
+    FLASK_CONFIG=sqlite gunicorn -c gunicorn.conf.py wsgi:app
+    python -m test.test_benchmark.load_test --base-url http://127.0.0.1:5000 --concurrency 16 --duration 60
+
+也可以加 --serve 由本脚本在子进程中启动应用（werkzeug多线程服务，仅用于快速对比，不代表生产部署性能）。
+"""
+import argparse
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from datetime import datetime
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+DEFAULT_MIX = 'open=60,save=15,chart=15,merge=10'
+
+SERVE_SCRIPT = """
+import logging, os, sys
+os.environ.setdefault('MPLBACKEND', 'Agg')
+from werkzeug.serving import make_server
+from app import create_app
+logging.getLogger('werkzeug').setLevel(logging.WARNING)
+server = make_server('127.0.0.1', int(sys.argv[1]), create_app(), threaded=True)
+print('ready', flush=True)
+server.serve_forever()
+"""
+
+
+def percentile(sorted_values, ratio):
+    """最近秩法分位数"""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(math.ceil(len(sorted_values) * ratio) - 1, 0)]
+
+
+class LoadStats:
+    """按接口汇总请求结果（线程安全）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.scenarios = defaultdict(list)
+        self.scenario_errors = defaultdict(int)
+
+    def record(self, endpoint, seconds, ok):
+        with self._lock:
+            self.latencies[endpoint].append(seconds * 1000)
+            if not ok:
+                self.errors[endpoint] += 1
+
+    def record_scenario(self, scenario, seconds, ok):
+        with self._lock:
+            self.scenarios[scenario].append(seconds * 1000)
+            if not ok:
+                self.scenario_errors[scenario] += 1
+
+    @staticmethod
+    def _summary(latencies, errors, elapsed):
+        values = sorted(latencies)
+        return {
+            'requests': len(values),
+            'errors': errors,
+            'throughput_rps': round(len(values) / elapsed, 2) if elapsed else 0.0,
+            'p50_ms': round(percentile(values, 0.50), 1),
+            'p95_ms': round(percentile(values, 0.95), 1),
+            'p99_ms': round(percentile(values, 0.99), 1),
+            'max_ms': round(values[-1], 1) if values else 0.0,
+        }
+
+    def report(self, elapsed):
+        with self._lock:
+            endpoints = {name: self._summary(values, self.errors[name], elapsed)
+                         for name, values in sorted(self.latencies.items())}
+            scenarios = {name: self._summary(values, self.scenario_errors[name], elapsed)
+                         for name, values in sorted(self.scenarios.items())}
+            total = sum(len(values) for values in self.latencies.values())
+            total_errors = sum(self.errors.values())
+        return {
+            'elapsed_seconds': round(elapsed, 2),
+            'total_requests': total,
+            'total_errors': total_errors,
+            'throughput_rps': round(total / elapsed, 2) if elapsed else 0.0,
+            'endpoints': endpoints,
+            'scenarios': scenarios,
+        }
+
+
+class ScenarioError(Exception):
+    """场景中某一步失败，终止本次流程"""
+
+
+class Client:
+    """单个并发用户的HTTP客户端，endpoint 为统计用的接口名（路由模板）"""
+
+    def __init__(self, base_url, stats, timeout=120):
+        self.base_url = base_url.rstrip('/')
+        self.stats = stats
+        self.timeout = timeout
+
+    def request(self, method, path, endpoint, payload=None):
+        body = json.dumps(payload).encode('utf-8') if payload is not None else None
+        req = urllib.request.Request(self.base_url + path, data=body, method=method,
+                                     headers={'Content-Type': 'application/json'} if body else {})
+        start = time.perf_counter()
+        status, data = 0, b''
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as response:
+                status, data = response.status, response.read()
+        except urllib.error.HTTPError as e:
+            status, data = e.code, e.read()
+        except (urllib.error.URLError, OSError) as e:
+            data = str(e).encode('utf-8')
+        finally:
+            self.stats.record(f'{method} {endpoint}', time.perf_counter() - start, 200 <= status < 300)
+
+        if not 200 <= status < 300:
+            raise ScenarioError(f"{method} {path} -> {status}: {data[:200]!r}")
+        try:
+            return json.loads(data) if data else {}
+        except ValueError:
+            return {}
+
+
+def _load_workbook(client, project_id):
+    result = client.request('GET', f'/data/api/project/{project_id}/workbook/load',
+                            '/data/api/project/<id>/workbook/load')
+    workbook = result.get('workbook_data')
+    if not workbook or not workbook.get('sheets'):
+        raise ScenarioError(f"项目 {project_id} 没有工作簿数据")
+    return workbook
+
+
+def scenario_open(client, project_id, rng):
+    client.request('GET', f'/data/api/project/{project_id}', '/data/api/project/<id>')
+    client.request('GET', f'/data/api/projects/{project_id}/sheets', '/data/api/projects/<id>/sheets')
+    _load_workbook(client, project_id)
+
+
+def scenario_save(client, project_id, rng):
+    workbook = _load_workbook(client, project_id)
+    # 模拟编辑：随机修改若干单元格
+    for sheet in workbook['sheets']:
+        rows, columns = sheet.get('rows', []), sheet.get('columns', [])
+        for _ in range(min(len(rows), 5)):
+            if columns:
+                rows[rng.randrange(len(rows))][str(rng.randrange(len(columns)))] = str(rng.random())
+    client.request('POST', f'/data/api/project/{project_id}/workbook/save', '/data/api/project/<id>/workbook/save',
+                   {'workbook_name': workbook['workbook_name'], 'sheets': workbook['sheets']})
+
+
+def scenario_chart(client, project_id, rng):
+    sheets = client.request('GET', f'/data/api/projects/{project_id}/sheet', '/data/api/projects/<id>/sheet')
+    if not sheets.get('data'):
+        raise ScenarioError(f"项目 {project_id} 没有Sheet")
+    sheet_id = sheets['data'][-1]['id']
+    tables = client.request('GET', f'/data/api/sheets/{sheet_id}/tables', '/data/api/sheets/<id>/tables')
+    if not tables.get('data'):
+        raise ScenarioError(f"Sheet {sheet_id} 没有页签")
+    table_id = rng.choice(tables['data'])['id']
+    headers = client.request('GET', f'/data/api/tables/{table_id}/headers', '/data/api/tables/<id>/headers')
+
+    columns = [header['name'] for header in headers.get('data', {}).get('headers', [])]
+    numeric = [header['name'] for header in headers.get('data', {}).get('headers', [])
+               if header.get('type', '').startswith(('int', 'float'))]
+    if len(numeric) < 2:
+        raise ScenarioError(f"页签 {table_id} 数值列不足")
+    client.request('POST', '/data/api/charts/generate', '/data/api/charts/generate', {
+        'project_id': project_id,
+        'chart_type_id': rng.choice([1, 2]),
+        'sheet_id': sheet_id,
+        'table_id': table_id,
+        'x_axis': numeric[0],
+        'y_axis': [rng.choice(numeric[1:])],
+        'category': '分类' if '分类' in columns else None,
+        'chart_name': f'压测图表_{int(time.time() * 1000)}_{rng.randrange(10 ** 6)}',
+    })
+
+
+def scenario_merge(client, project_id, rng):
+    workbook = _load_workbook(client, project_id)
+    sheets = workbook['sheets']
+    if len(sheets) < 2:
+        raise ScenarioError(f"项目 {project_id} 的工作簿少于两个页签")
+    target, source = sheets[0], sheets[1]
+    target_columns = {column['name'] for column in target['columns']}
+    source_columns = [column['name'] for column in source['columns']]
+    match_columns = [name for name in source_columns if name in target_columns][:1]
+    merge_columns = [name for name in source_columns if name not in match_columns][:2]
+    if not match_columns or not merge_columns:
+        raise ScenarioError(f"项目 {project_id} 的页签没有可用的匹配列")
+    client.request('POST', f'/data/api/project/{project_id}/merge-tables', '/data/api/project/<id>/merge-tables', {
+        'targetTableName': target['name'],
+        'sourceTableNames': [source['name']],
+        'matchColumns': match_columns,
+        'requiredColumns': match_columns,
+        'mergeColumns': [{'tableName': source['name'], 'columns': merge_columns}],
+    })
+
+
+SCENARIOS = {
+    'open': scenario_open,
+    'save': scenario_save,
+    'chart': scenario_chart,
+    'merge': scenario_merge,
+}
+
+
+def parse_mix(text):
+    """解析 "open=60,save=15" 格式的场景权重"""
+    mix = {}
+    for item in text.split(','):
+        name, _, weight = item.partition('=')
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise ValueError(f"未知场景: {name}")
+        mix[name] = float(weight or 1)
+    if not any(mix.values()):
+        raise ValueError("场景权重不能全为0")
+    return mix
+
+
+def discover_projects(base_url, limit=200):
+    """从项目列表接口获取可用于压测的项目ID"""
+    with urllib.request.urlopen(f"{base_url.rstrip('/')}/data/api/projects?limit={limit}", timeout=30) as response:
+        payload = json.loads(response.read())
+    return [project['id'] for project in payload.get('projects', [])]
+
+
+def run_load(base_url, project_ids, mix, concurrency, duration=None, iterations=None, seed=42, log_errors=5):
+    """
+    执行压测，返回统计报告
+
+    参数:
+        duration: 持续秒数；iterations: 每个并发用户执行的流程次数，二者至少指定一个
+    """
+    stats = LoadStats()
+    names, weights = list(mix), list(mix.values())
+    deadline = time.perf_counter() + duration if duration else None
+    error_samples = []
+    error_lock = threading.Lock()
+
+    def worker(index):
+        rng = random.Random(seed + index)
+        client = Client(base_url, stats)
+        count = 0
+        while (iterations is None or count < iterations) and (deadline is None or time.perf_counter() < deadline):
+            count += 1
+            name = rng.choices(names, weights)[0]
+            start = time.perf_counter()
+            ok = True
+            try:
+                SCENARIOS[name](client, rng.choice(project_ids), rng)
+            except ScenarioError as e:
+                ok = False
+                with error_lock:
+                    if len(error_samples) < log_errors:
+                        error_samples.append(f"[{name}] {e}")
+            stats.record_scenario(name, time.perf_counter() - start, ok)
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    report = stats.report(time.perf_counter() - start)
+    report['error_samples'] = error_samples
+    return report
+
+
+def print_report(report):
+    print(f"\n总请求 {report['total_requests']}，失败 {report['total_errors']}，"
+          f"耗时 {report['elapsed_seconds']}s，吞吐量 {report['throughput_rps']} req/s")
+    header = f"{'接口':<52}{'请求数':>8}{'失败':>6}{'req/s':>9}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}"
+    for title, rows in (('接口', report['endpoints']), ('场景', report['scenarios'])):
+        print(f"\n{header.replace('接口', title, 1)}")
+        for name, row in rows.items():
+            print(f"{name:<52}{row['requests']:>8}{row['errors']:>6}{row['throughput_rps']:>9.2f}"
+                  f"{row['p50_ms']:>10.1f}{row['p95_ms']:>10.1f}{row['p99_ms']:>10.1f}")
+    for sample in report['error_samples']:
+        print(f"错误示例: {sample}")
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_local_server():
+    """在子进程中启动应用（使用当前环境变量中的配置，如 FLASK_CONFIG=sqlite），返回 (进程, base_url)"""
+    port = _free_port()
+    process = subprocess.Popen([sys.executable, '-c', SERVE_SCRIPT, str(port)], cwd=ROOT_DIR,
+                               stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()
+    if 'ready' not in line:
+        process.kill()
+        raise RuntimeError("应用启动失败")
+    return process, f'http://127.0.0.1:{port}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='HTTP压测：回放打开项目、保存工作簿、生成图表、合并表等操作')
+    parser.add_argument('--base-url', default='http://127.0.0.1:5000', help='应用地址')
+    parser.add_argument('--serve', action='store_true', help='在子进程中启动应用（忽略 --base-url）')
+    parser.add_argument('--concurrency', type=int, default=8, help='并发用户数')
+    parser.add_argument('--duration', type=float, default=30, help='持续秒数（指定 --iterations 时可设为0）')
+    parser.add_argument('--iterations', type=int, default=0, help='每个并发用户执行的流程次数')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='场景权重，如 open=60,save=15,chart=15,merge=10')
+    parser.add_argument('--projects', default='', help='项目ID，逗号分隔；默认从项目列表接口获取')
+    parser.add_argument('--seed', type=int, default=42, help='随机数种子')
+    parser.add_argument('--output', default='', help='结果JSON输出路径')
+    args = parser.parse_args()
+
+    if not args.duration and not args.iterations:
+        parser.error("--duration 和 --iterations 至少指定一个")
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    server = None
+    base_url = args.base_url
+    if args.serve:
+        server, base_url = start_local_server()
+    try:
+        project_ids = [int(item) for item in args.projects.split(',') if item] or discover_projects(base_url)
+        if not project_ids:
+            parser.error("没有可用的项目，请先写入测试数据（python -m app.core.seed）")
+
+        print(f"=== 压测 {base_url}: 并发 {args.concurrency}, 项目 {len(project_ids)} 个, 场景 {mix} ===")
+        report = run_load(base_url, project_ids, mix, args.concurrency, args.duration or None,
+                          args.iterations or None, args.seed)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=10)
+
+    report.update({
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'base_url': base_url,
+        'params': {'concurrency': args.concurrency, 'duration': args.duration, 'iterations': args.iterations,
+                   'mix': mix, 'projects': len(project_ids), 'seed': args.seed},
+    })
+    print_report(report)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"结果已保存到: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,18 @@
+import pytest
+
+pytest.importorskip('pandas')
+pytest.importorskip('openpyxl')
+
+from test.test_benchmark import bench_excel_readers  # noqa: E402
+
+
+def test_reader_benchmark_covers_available_engines(tmp_path, monkeypatch):
+    monkeypatch.setitem(bench_excel_readers.SHAPES, 'tiny', (20, 3, 2))
+    report = bench_excel_readers.run(['tiny'], repeat=1, work_dir=str(tmp_path))
+
+    results = report['shapes']['tiny']['results']
+    assert set(results) == set(bench_excel_readers.CASES)
+    for case_results in results.values():
+        assert {'openpyxl', 'auto'} <= set(case_results)
+        assert case_results['openpyxl']['repeat'] == 1
+    assert results['header']['auto']['selected'] == 'openpyxl'
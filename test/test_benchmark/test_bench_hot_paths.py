@@ -0,0 +1,35 @@
+import pytest
+
+pd = pytest.importorskip('pandas')
+pytest.importorskip('openpyxl')
+pytest.importorskip('flask')
+
+from test.test_benchmark.bench_hot_paths import bench_merge, bench_workbook  # noqa: E402
+from test.test_benchmark.workbook_factory import KEY_COLUMN, generate_workbook  # noqa: E402
+
+
+def test_generate_workbook_respects_shape_and_key_cardinality(tmp_path):
+    path = tmp_path / 'bench.xlsx'
+    layout = generate_workbook(path, rows=40, columns=5, sheets=2, key_cardinality=4)
+
+    sheets = pd.read_excel(path, sheet_name=None)
+    assert list(sheets) == list(layout['sheets']) == ['表1', '表2']
+    for df in sheets.values():
+        assert df.shape == (40, 8)
+        assert df[KEY_COLUMN].nunique() <= 4
+    assert layout['numeric_columns']['表1'] == ['表1_int_0', '表1_float_1']
+
+
+def test_workbook_and_merge_benchmarks_produce_timings(tmp_path):
+    path = str(tmp_path / 'bench.xlsx')
+    layout = generate_workbook(path, rows=30, columns=4, sheets=2)
+
+    results = bench_workbook(path, str(tmp_path), repeat=1)
+    results.update(bench_merge(path, layout, str(tmp_path), repeat=1))
+
+    assert set(results) == {'convert_excel_to_json', 'convert_dict_to_excel', 'merge_tables'}
+    for result in results.values():
+        assert result['repeat'] == 1
+        assert result['min_ms'] <= result['p50_ms'] <= result['p95_ms'] <= result['max_ms']
+    merged = pd.read_excel(tmp_path / 'merge_0.xlsx', sheet_name='表1')
+    assert '表2_表2_int_0' in merged.columns
@@ -0,0 +1,38 @@
+import pytest
+
+from test.test_benchmark.load_test import LoadStats, parse_mix, percentile
+
+
+def test_percentile_uses_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 0.50) == 50
+    assert percentile(values, 0.95) == 95
+    assert percentile(values, 0.99) == 99
+    assert percentile([7], 0.99) == 7
+    assert percentile([], 0.5) == 0.0
+
+
+def test_parse_mix_rejects_unknown_scenarios():
+    assert parse_mix('open=3,merge=1') == {'open': 3.0, 'merge': 1.0}
+    with pytest.raises(ValueError):
+        parse_mix('open=1,upload=1')
+    with pytest.raises(ValueError):
+        parse_mix('open=0')
+
+
+def test_load_stats_reports_per_endpoint_throughput_and_errors():
+    stats = LoadStats()
+    for ms in range(1, 11):
+        stats.record('GET /data/api/project/<id>', ms / 1000, ok=True)
+    stats.record('POST /data/api/charts/generate', 2.0, ok=False)
+    stats.record_scenario('open', 0.5, ok=True)
+
+    report = stats.report(elapsed=2.0)
+    detail = report['endpoints']['GET /data/api/project/<id>']
+    assert detail['requests'] == 10
+    assert detail['throughput_rps'] == 5.0
+    assert (detail['p50_ms'], detail['p95_ms'], detail['p99_ms']) == (5.0, 10.0, 10.0)
+    assert report['endpoints']['POST /data/api/charts/generate']['errors'] == 1
+    assert report['total_requests'] == 11
+    assert report['total_errors'] == 1
+    assert report['scenarios']['open']['requests'] == 1
@@ -0,0 +1,93 @@
+"""
+合成测试工作簿生成器
+
+每个工作表包含：
+- 编号：整数匹配键，取值范围为 [0, key_cardinality)，用于合并表
+- 时间：按分钟递增的时间，用于折线图X轴
+- 分类：少量取值的分类字段，用于图表分组
+- 其余列按 dtypes 轮换生成（int/float/str/date/category），列名为 "<工作表>_<类型>_<序号>"
+
+用法:
+    python -m test.test_benchmark.workbook_factory --rows 10000 --columns 20 --sheets 3 --output bench.xlsx
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+DTYPES = ('int', 'float', 'str', 'date', 'category')
+KEY_COLUMN = '编号'
+TIME_COLUMN = '时间'
+CATEGORY_COLUMN = '分类'
+CATEGORIES = ('彩椒', '番茄', '黄瓜', '茄子', '生菜')
+
+
+def _make_column(dtype, rows, rng):
+    if dtype == 'int':
+        return rng.integers(0, 100000, size=rows)
+    if dtype == 'float':
+        values = rng.normal(25, 8, size=rows).round(2)
+        # 约1%的空值，覆盖NaN处理路径
+        values[rng.random(rows) < 0.01] = np.nan
+        return values
+    if dtype == 'str':
+        return np.char.add('样本_', rng.integers(0, max(rows // 10, 1), size=rows).astype(str))
+    if dtype == 'date':
+        return pd.Timestamp('2025-01-01') + pd.to_timedelta(rng.integers(0, 365, size=rows), unit='D')
+    if dtype == 'category':
+        return rng.choice(CATEGORIES, size=rows)
+    raise ValueError(f"不支持的列类型: {dtype}")
+
+
+def make_frame(sheet_name, rows, columns, dtypes=DTYPES, key_cardinality=None, seed=0):
+    """生成一个工作表的数据，columns 为除编号/时间/分类外的数据列数"""
+    rng = np.random.default_rng(seed)
+    key_cardinality = key_cardinality or rows
+    data = {
+        KEY_COLUMN: rng.integers(0, key_cardinality, size=rows),
+        TIME_COLUMN: pd.date_range('2025-01-01', periods=rows, freq='min'),
+        CATEGORY_COLUMN: rng.choice(CATEGORIES, size=rows),
+    }
+    for i in range(columns):
+        dtype = dtypes[i % len(dtypes)]
+        data[f'{sheet_name}_{dtype}_{i}'] = _make_column(dtype, rows, rng)
+    return pd.DataFrame(data)
+
+
+def generate_workbook(file_path, rows=1000, columns=10, sheets=3, dtypes=DTYPES, key_cardinality=None, seed=42):
+    """
+    生成合成工作簿并写入 file_path
+
+    返回:
+        dict: 工作表名 -> 列名列表，以及各类型列的位置，供基准测试配置合并列和图表字段
+    """
+    layout = {'sheets': {}, 'numeric_columns': {}}
+    with pd.ExcelWriter(file_path, engine='openpyxl') as writer:
+        for index in range(sheets):
+            sheet_name = f'表{index + 1}'
+            df = make_frame(sheet_name, rows, columns, dtypes, key_cardinality, seed + index)
+            df.to_excel(writer, sheet_name=sheet_name, index=False)
+            layout['sheets'][sheet_name] = list(df.columns)
+            layout['numeric_columns'][sheet_name] = [
+                column for column in df.columns[3:] if pd.api.types.is_numeric_dtype(df[column])]
+    return layout
+
+
+def main():
+    parser = argparse.ArgumentParser(description='生成合成测试工作簿')
+    parser.add_argument('--rows', type=int, default=1000, help='每个工作表的行数')
+    parser.add_argument('--columns', type=int, default=10, help='每个工作表的数据列数（不含编号/时间/分类）')
+    parser.add_argument('--sheets', type=int, default=3, help='工作表数量')
+    parser.add_argument('--dtypes', default=','.join(DTYPES), help='数据列类型，逗号分隔，按顺序轮换')
+    parser.add_argument('--key-cardinality', type=int, default=0, help='编号列不同取值的数量，默认等于行数')
+    parser.add_argument('--seed', type=int, default=42, help='随机数种子')
+    parser.add_argument('--output', required=True, help='输出的xlsx路径')
+    args = parser.parse_args()
+
+    layout = generate_workbook(args.output, args.rows, args.columns, args.sheets, tuple(args.dtypes.split(',')),
+                               args.key_cardinality or None, args.seed)
+    print(f"已生成 {args.output}: {len(layout['sheets'])} 个工作表, 每表 {args.rows} 行")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+import pytest
+
+
+@pytest.fixture
+def shared_chart(app):
+    """把一张图表再关联到第二个项目，测试结束后删除该关联"""
+    from app import db
+    from app.DataProject.modules import ChartData, ChartProject, DataProject
+
+    with app.app_context():
+        chart = ChartData.query.filter_by(chart_type_id=1).order_by(ChartData.id.asc()).first()
+        linked = {row.project_id for row in ChartProject.query.filter_by(chart_id=chart.id)}
+        other_project = DataProject.query.filter(DataProject.id.notin_(linked)).first()
+        link = ChartProject(chart_id=chart.id, project_id=other_project.id)
+        db.session.add(link)
+        db.session.commit()
+        chart_id, link_id = chart.id, link.id
+    yield chart_id
+    with app.app_context():
+        db.session.delete(db.session.get(ChartProject, link_id))
+        db.session.commit()
+
+
+def test_chart_linked_to_several_projects_listed_once(client, shared_chart):
+    # 同一页内不重复出现，也不多占 limit 名额
+    body = client.get('/data/api/chart-types/1/charts/paginated?limit=200').get_json()
+    ids = [chart['id'] for chart in body['charts']]
+    assert shared_chart in ids
+    assert len(ids) == len(set(ids))
+
+    # 逐页翻完也只出现一次
+    ids, cursor = [], ''
+    while True:
+        body = client.get(f'/data/api/chart-types/1/charts/paginated?limit=1&cursor={cursor}').get_json()
+        ids.extend(chart['id'] for chart in body['charts'])
+        cursor = body['pagination']['next_cursor']
+        if not cursor:
+            break
+    assert ids.count(shared_chart) == 1
+
+
+@pytest.mark.parametrize('url', ['/data/api/chart-types/1/charts/paginated?cursor=bad',
+                                 '/data/api/project/{project_id}/chart?cursor=%21%21'])
+def test_invalid_cursor_returns_400(app, client, url):
+    response = client.get(url.format(project_id=app.seed_summary['first_project_id']))
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
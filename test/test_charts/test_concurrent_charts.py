@@ -0,0 +1,71 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pd = pytest.importorskip('pandas')
+pytest.importorskip('matplotlib')
+
+from app.Utils.chart_utils import ChartUtils  # noqa: E402
+
+THREADS = 8
+
+# 测试环境未安装中文字体
+pytestmark = pytest.mark.filterwarnings('ignore:Glyph .* missing from font')
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+@pytest.fixture
+def data():
+    return pd.DataFrame({
+        '时间': pd.date_range('2025-01-01', periods=60, freq='h'),
+        '分类': ['彩椒', '番茄', '黄瓜'] * 20,
+        '温度': [20 + i % 7 for i in range(60)],
+        '湿度': [60 - i % 5 for i in range(60)],
+    })
+
+
+def test_chart_utils_render_concurrently(tmp_path, monkeypatch, data):
+    from app.Utils import chart_utils
+    monkeypatch.setattr(chart_utils.config, 'CHART_SAVE_ROOT_DIR', str(tmp_path))
+
+    def render(i):
+        chart_type_id = 1 if i % 2 else 2
+        x_axis = '温度' if chart_type_id == 1 else '时间'
+        fig = ChartUtils.gen_chart(chart_type_id, params={
+            'data': data, 'x_axis': x_axis, 'y_axis': ['湿度'], 'category': '分类', 'chart_name': f'图表{i}'})
+        return ChartUtils.save_chart(fig, project_id=1, chart_type_name=str(chart_type_id), chart_name=f'图表{i}',
+                                     chart_id=i)
+
+    # 多个线程同时绘图、保存（gthread/waitress 下的并发请求），每张图都完整生成
+    with ThreadPoolExecutor(THREADS) as pool:
+        paths = list(pool.map(render, range(THREADS * 2)))
+
+    assert len(set(paths)) == THREADS * 2
+    for path in paths:
+        with open(path, 'rb') as f:
+            assert f.read(8) == PNG_SIGNATURE
+        assert os.path.getsize(path) > 10000
+
+
+def test_generate_chart_endpoint_concurrently(app):
+    from app.DataProject.modules import SheetProject, Table
+
+    project_id = app.seed_summary['first_project_id']
+    with app.app_context():
+        sheet_id = SheetProject.query.filter_by(project_id=project_id).first().sheet_id
+        table_id = Table.query.filter_by(sheet_id=sheet_id).first().id
+
+    def generate(i):
+        response = app.test_client().post('/data/api/charts/generate', json={
+            'project_id': project_id, 'chart_type_id': 1 if i % 2 else 2, 'sheet_id': sheet_id,
+            'table_id': table_id, 'x_axis': '指标1' if i % 2 else '时间', 'y_axis': ['指标2'],
+            'category': '分类', 'chart_name': f'并发图表{i}'})
+        return response.status_code, response.get_json()
+
+    with ThreadPoolExecutor(4) as pool:
+        results = list(pool.map(generate, range(8)))
+
+    assert [status for status, _ in results] == [200] * 8, [body for _, body in results]
+    for _, body in results:
+        assert os.path.getsize(body['data']['chart']['file_path']) > 0
@@ -0,0 +1,89 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# 配置在导入时按 FLASK_CONFIG 选择，需要在子进程中创建应用
+SCRIPT = """
+import io
+import json
+import os
+
+from app import create_app
+from app.core.seed import seed_database
+
+app = create_app()
+from app import db
+from app.DataProject.modules import ProjectWorkbook
+from app.Utils.data_project_utils import DataProjectUtils
+
+summary = seed_database(app, db, projects=1, users=1, members=1, sheets=3, tables=1, rows=5, columns=1, charts=0)
+project_id = summary['first_project_id']
+client = app.test_client()
+
+# 有指针时不扫描项目目录
+scans = []
+scan = DataProjectUtils.get_latest_excel_file
+DataProjectUtils.get_latest_excel_file = staticmethod(lambda project_dir: scans.append(project_dir) or scan(project_dir))
+
+
+def load():
+    workbook = client.get(f'/data/api/project/{project_id}/workbook/load').get_json()['workbook_data']
+    return workbook['workbook_name'], [sheet['name'] for sheet in workbook['sheets']]
+
+
+def pointer():
+    with app.app_context():
+        return os.path.basename(ProjectWorkbook.query.filter_by(project_id=project_id).one().file_path)
+
+
+result = {'seeded': load(), 'seeded_pointer': pointer()}
+
+response = client.post(f'/data/api/project/{project_id}/import-excel',
+                       data={'file': (io.BytesIO('编号,温度\\n1,20.5\\n'.encode('utf-8')), '温度.csv')},
+                       content_type='multipart/form-data')
+result['import_status'] = response.status_code
+result['imported'] = load()
+result['imported_pointer'] = pointer()
+result['scans'] = len(scans)
+
+# 指针表上线前的项目：首次访问时扫描目录并回填指针
+with app.app_context():
+    ProjectWorkbook.query.delete()
+    db.session.commit()
+result['backfilled'] = load()
+result['backfilled_pointer'] = pointer()
+result['scans_after_backfill'] = len(scans)
+load()
+result['scans_after_reload'] = len(scans)
+print(json.dumps(result, ensure_ascii=False))
+"""
+
+
+def test_current_workbook_pointer(tmp_path):
+    pytest.importorskip('flask_sqlalchemy')
+    pytest.importorskip('pandas')
+    pytest.importorskip('openpyxl')
+
+    env = dict(os.environ, FLASK_CONFIG='sqlite', SQLITE_DATA_DIR=str(tmp_path), LOG_LEVEL='WARNING')
+    result = subprocess.run([sys.executable, '-c', SCRIPT], cwd=ROOT_DIR, env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr[-3000:]
+    output = json.loads(result.stdout.strip().splitlines()[-1])
+
+    # 种子数据的当前工作簿为最后一个
+    assert output['seeded_pointer'] == output['seeded'][0] + '.xlsx'
+    assert output['seeded'][0].endswith('_3')
+
+    assert output['import_status'] == 200
+    assert output['imported_pointer'] == 'workbook_data.xlsx'
+    assert output['imported'] == ['workbook_data', ['温度']]
+    assert output['scans'] == 0
+
+    # 回填：扫描一次目录（按修改时间最新的是导入的文件），之后走指针
+    assert output['backfilled_pointer'] == 'workbook_data.xlsx'
+    assert output['scans_after_backfill'] == 1
+    assert output['scans_after_reload'] == 1
@@ -0,0 +1,39 @@
+import pytest
+
+URL = '/data/api/projects/data_anas'
+
+
+@pytest.fixture
+def analyses(app, tmp_path):
+    """当前会话的第一个项目下写入3个数据分析模型，测试结束后删除"""
+    from app import db
+    from app.DataProject.modules import DataAnaModel
+
+    project_id = app.seed_summary['first_project_id']
+    with app.app_context():
+        models = [DataAnaModel(name=f'模型{i}', file_path=str(tmp_path / f'{i}.pkl'), table_id=1,
+                               project_id=project_id) for i in range(3)]
+        db.session.add_all(models)
+        db.session.commit()
+        ids = [model.id for model in models]
+    yield project_id
+    with app.app_context():
+        DataAnaModel.query.filter(DataAnaModel.id.in_(ids)).delete()
+        db.session.commit()
+
+
+def test_count_is_page_size_and_total_count_on_request(client, analyses):
+    data = client.post(f'{URL}?project_id={analyses}&limit=2').get_json()['data']
+    assert data['count'] == 2
+    assert 'total_count' not in data
+
+    data = client.post(f'{URL}?project_id={analyses}&limit=2&with_count=1').get_json()['data']
+    assert (data['count'], data['total_count']) == (2, 3)
+
+    cursor = data['pagination']['next_cursor']
+    data = client.post(f'{URL}?project_id={analyses}&limit=2&with_count=1&cursor={cursor}').get_json()['data']
+    assert (data['count'], data['total_count']) == (1, 3)
+
+
+def test_invalid_cursor_returns_400(client):
+    assert client.post(f'{URL}?cursor=bad').status_code == 400
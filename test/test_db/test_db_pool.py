@@ -0,0 +1,62 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+pytest.importorskip('sqlalchemy')
+
+from app.core.db_pool import PoolStats, TimedQueuePool, pool_stats  # noqa: E402
+
+CONNECT_DELAY = 0.2
+
+
+def slow_connect():
+    time.sleep(CONNECT_DELAY)
+    return sqlite3.connect(':memory:', check_same_thread=False)
+
+
+@pytest.fixture(autouse=True)
+def reset_stats():
+    pool_stats.reset()
+    yield
+    pool_stats.reset()
+
+
+def test_wait_excludes_connect_time():
+    pool = TimedQueuePool(slow_connect, pool_size=1, max_overflow=0, timeout=5)
+    connection = pool.connect()
+    connection.close()
+    pool.connect().close()
+
+    wait, connect = pool_stats.snapshot(), pool_stats.connect_snapshot()
+    # 两次获取连接：第一次新建连接（耗时计入 connect），第二次复用，均不需要排队
+    assert wait['checkouts'] == 2
+    assert wait['max_ms'] < CONNECT_DELAY * 1000 / 2
+    assert connect['connects'] == 1
+    assert connect['max_ms'] >= CONNECT_DELAY * 1000
+    pool.dispose()
+
+
+def test_wait_measures_pool_contention():
+    pool = TimedQueuePool(lambda: sqlite3.connect(':memory:', check_same_thread=False),
+                          pool_size=1, max_overflow=0, timeout=5)
+    held = pool.connect()
+    threading.Timer(CONNECT_DELAY, held.close).start()
+    pool.connect().close()
+
+    # 第二次获取连接需要等待第一个连接归还
+    assert pool_stats.snapshot()['max_ms'] >= CONNECT_DELAY * 1000 * 0.9
+    assert pool_stats.connect_snapshot()['connects'] == 1
+    pool.dispose()
+
+
+def test_timeouts_counted_separately():
+    stats = PoolStats()
+    stats.record_timeout()
+    stats.record_wait(0.01)
+    assert stats.snapshot()['timeouts'] == 1
+    assert stats.snapshot()['checkouts'] == 1
+    stats.reset()
+    assert stats.snapshot() == {'checkouts': 0, 'avg_ms': 0.0, 'p50_ms': 0.0, 'p95_ms': 0.0, 'p99_ms': 0.0,
+                                'max_ms': 0.0, 'timeouts': 0}
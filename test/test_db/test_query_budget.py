@@ -0,0 +1,61 @@
+import pytest
+
+sqlalchemy = pytest.importorskip('sqlalchemy')
+pytest.importorskip('flask')
+
+from app.core.query_budget import statement_shape, track_queries  # noqa: E402
+
+
+@pytest.fixture
+def engine():
+    engine = sqlalchemy.create_engine('sqlite://')
+    with engine.begin() as conn:
+        conn.execute(sqlalchemy.text("CREATE TABLE users (id INTEGER PRIMARY KEY, username VARCHAR(50))"))
+        conn.execute(sqlalchemy.text("INSERT INTO users (id, username) VALUES (1, 'a'), (2, 'b'), (3, 'c')"))
+    yield engine
+    engine.dispose()
+
+
+def test_statement_shape_ignores_parameters():
+    assert statement_shape("SELECT * FROM users WHERE id = %(id_1)s") == statement_shape(
+        "SELECT *  FROM users\nWHERE id = 5")
+    assert statement_shape("SELECT * FROM users WHERE id IN (?, ?, ?)") == statement_shape(
+        "SELECT * FROM users WHERE id IN (?)")
+
+
+def test_track_queries_detects_repeated_statements(engine):
+    with track_queries() as tracker:
+        with engine.connect() as conn:
+            for user_id in (1, 2, 3):
+                conn.execute(sqlalchemy.text("SELECT username FROM users WHERE id = :id"), {'id': user_id})
+
+    assert tracker.count == 3
+    assert tracker.total_time > 0
+    assert tracker.repeated_statements(2) == [("SELECT username FROM users WHERE id = ?", 3)]
+
+
+def test_assert_max_queries_fails_when_budget_exceeded(engine, assert_max_queries):
+    with assert_max_queries(1):
+        with engine.connect() as conn:
+            conn.execute(sqlalchemy.text("SELECT username FROM users WHERE id IN (1, 2, 3)"))
+
+    with pytest.raises(AssertionError):
+        with assert_max_queries(1):
+            with engine.connect() as conn:
+                for user_id in (1, 2):
+                    conn.execute(sqlalchemy.text("SELECT username FROM users WHERE id = :id"), {'id': user_id})
+
+
+def test_project_list_query_budget(client, assert_max_queries):
+    # 本页项目一条SQL + 本页所有成员一次连表查询，与项目和成员数量无关
+    with assert_max_queries(2) as tracker:
+        response = client.get('/data/api/projects?limit=3')
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['count'] == 3 and body['pagination']['has_more']
+    assert all(project['users'] for project in body['projects'])
+    assert tracker.count == 2
+
+    with assert_max_queries(2):
+        response = client.get(f"/data/api/projects?after_id={body['pagination']['next_after_id']}")
+    assert response.get_json()['count'] == 2
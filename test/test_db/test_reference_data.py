@@ -0,0 +1,16 @@
+def test_seed_reference_data_refreshes_cache(app):
+    from app import db
+    from app.core.seed import CHART_TYPES, seed_reference_data
+    from app.DataProject.modules import ChartType
+    from app.Utils.reference_cache import ReferenceCache
+
+    with app.app_context():
+        db.session.delete(db.session.get(ChartType, 2))
+        db.session.commit()
+        ReferenceCache.invalidate_chart_types()
+        assert ReferenceCache.get_chart_type(2) is None
+
+        # 写入参考数据后本进程的缓存立即生效，不必等过期
+        seed_reference_data(db)
+        assert [chart_type.id for chart_type in ReferenceCache.get_chart_types()] == sorted(CHART_TYPES)
+        assert ReferenceCache.get_chart_type(2).type_name == CHART_TYPES[2]
@@ -0,0 +1,35 @@
+from types import SimpleNamespace
+
+import pytest
+
+sqlalchemy = pytest.importorskip('sqlalchemy')
+pytest.importorskip('flask')
+
+from app.core import slow_query  # noqa: E402
+
+
+@pytest.fixture
+def engine():
+    slow_query.init_slow_query_log(SimpleNamespace(config={'SLOW_QUERY_THRESHOLD_MS': 0}))
+    slow_query.slow_query_log.clear()
+    engine = sqlalchemy.create_engine('sqlite://')
+    with engine.begin() as conn:
+        conn.execute(sqlalchemy.text("CREATE TABLE users (id INTEGER PRIMARY KEY, email VARCHAR(120))"))
+    yield engine
+    engine.dispose()
+    slow_query.init_slow_query_log(SimpleNamespace(config={}))
+
+
+def test_slow_select_records_redacted_parameters_and_plan(engine):
+    with engine.connect() as conn:
+        conn.execute(sqlalchemy.text("SELECT id FROM users WHERE email = :email"), {'email': 'someone@example.com'})
+
+    record = next(r for r in slow_query.slow_query_log.records() if r['statement'].startswith('SELECT id'))
+    assert 'someone@example.com' not in str(record['parameters'])
+    assert record['parameters'] == ['<str len=19>']
+    assert record['view'] is None
+    assert record['explain'] and 'users' in str(record['explain'])
+
+
+def test_redact_parameters_keeps_keys_only():
+    assert slow_query.redact_parameters({'name': 'abc', 'id': 3}) == {'name': '<str len=3>', 'id': '<int>'}
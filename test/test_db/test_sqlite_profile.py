@@ -0,0 +1,51 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# 配置在导入时按 FLASK_CONFIG 选择，需要在子进程中创建应用
+SCRIPT = """
+import json
+from app import create_app
+from app.core.seed import seed_database
+
+app = create_app()
+from app import db
+summary = seed_database(app, db, projects=2, users=3, members=2, sheets=1, tables=2, rows=20, columns=2, charts=1)
+client = app.test_client()
+project_id = summary['first_project_id']
+statuses = {url: client.get(url).status_code for url in (
+    f'/data/api/project/{project_id}',
+    f'/data/api/projects/{project_id}/sheets',
+    f'/data/api/project/{project_id}/workbook/load',
+    f'/data/api/project/{project_id}/chart',
+)}
+with app.app_context():
+    journal_mode = db.session.execute(db.text('PRAGMA journal_mode')).scalar()
+print(json.dumps({'summary': summary, 'statuses': statuses, 'journal_mode': journal_mode,
+                  'uri': app.config['SQLALCHEMY_DATABASE_URI']}))
+"""
+
+
+def test_sqlite_profile_runs_seeded_app_without_mysql(tmp_path):
+    pytest.importorskip('flask_sqlalchemy')
+    pytest.importorskip('pandas')
+    pytest.importorskip('openpyxl')
+    pytest.importorskip('matplotlib')
+
+    env = dict(os.environ, FLASK_CONFIG='sqlite', SQLITE_DATA_DIR=str(tmp_path), LOG_LEVEL='WARNING')
+    result = subprocess.run([sys.executable, '-c', SCRIPT], cwd=ROOT_DIR, env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr[-3000:]
+
+    output = json.loads(result.stdout.strip().splitlines()[-1])
+    assert output['uri'].startswith(f'sqlite:///{tmp_path}')
+    assert output['journal_mode'] == 'wal'
+    assert output['summary']['sheets'] == 2
+    assert output['summary']['tables'] == 4
+    assert set(output['statuses'].values()) == {200}
+    assert len(list((tmp_path / 'SheetData').rglob('*.xlsx'))) == 2
+    assert len(list((tmp_path / 'ChartData').rglob('*.png'))) == 2
@@ -0,0 +1,52 @@
+import pytest
+
+pytest.importorskip('pandas')
+
+from app.Utils.csv_utils import CsvUtils  # noqa: E402
+
+
+def test_gbk_csv_is_detected_and_parsed(tmp_path):
+    path = tmp_path / '传感器.csv'
+    path.write_bytes('时间,温度,分类\n2025-01-01 08:00,20.5,彩椒\n2025-01-01 09:00,21.0,番茄\n'.encode('gbk'))
+
+    assert CsvUtils.detect_encoding(str(path)) == 'gb18030'
+    df = CsvUtils.read_csv(str(path))
+    assert list(df.columns) == ['时间', '温度', '分类']
+    assert df['分类'].tolist() == ['彩椒', '番茄']
+
+
+def test_utf8_with_bom_and_delimiter_detection(tmp_path):
+    bom = tmp_path / 'bom.csv'
+    bom.write_bytes('\ufeff编号;温度\n1;20\n2;21\n'.encode('utf-8'))
+    assert CsvUtils.detect_encoding(str(bom)) == 'utf-8-sig'
+    assert list(CsvUtils.read_csv(str(bom)).columns) == ['编号', '温度']
+
+    tsv = tmp_path / 'data.tsv'
+    tsv.write_text('编号\t温度\n1\t20,5\n', encoding='utf-8')
+    assert CsvUtils.detect_encoding(str(tsv)) == 'utf-8'
+    assert CsvUtils.read_csv(str(tsv)).iloc[0].tolist() == [1, '20,5']
+
+
+def test_utf8_sample_cut_inside_multibyte_char(tmp_path):
+    path = tmp_path / 'long.csv'
+    path.write_text('名称\n' + '温室数据\n' * 1000, encoding='utf-8')
+    # 采样长度落在中文字符的中间，仍应识别为UTF-8
+    assert CsvUtils.detect_encoding(str(path), sample_size=8) == 'utf-8'
+
+
+def test_large_txt_read(tmp_path):
+    path = tmp_path / 'big.txt'
+    path.write_text('编号;值\n' + ''.join(f'{i};{i * 0.5}\n' for i in range(2500)), encoding='utf-8')
+
+    assert CsvUtils.is_csv_file(str(path))
+    df = CsvUtils.read_csv(str(path))
+    assert len(df) == 2500
+    assert df.index.tolist() == list(range(2500))
+    assert df['值'].sum() == sum(i * 0.5 for i in range(2500))
+
+
+def test_table_name_is_valid_and_unique():
+    assert CsvUtils.table_name('温室[1]号:传感器.csv') == '温室_1_号_传感器'
+    assert CsvUtils.table_name('数据.csv', {'数据', '数据_1'}) == '数据_2'
+    name = CsvUtils.table_name('x' * 40 + '.csv', {'x' * 31})
+    assert len(name) == 31 and name.endswith('_1')
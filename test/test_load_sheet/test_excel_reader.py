@@ -0,0 +1,52 @@
+import pytest
+
+pd = pytest.importorskip('pandas')
+pytest.importorskip('openpyxl')
+
+from app.Utils import excel_reader  # noqa: E402
+from app.Utils.excel_reader import ExcelReader  # noqa: E402
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    path = tmp_path / 'data.xlsx'
+    with pd.ExcelWriter(path, engine='openpyxl') as writer:
+        pd.DataFrame({'编号': range(200), '温度': [20.5] * 200}).to_excel(writer, sheet_name='表1', index=False)
+        pd.DataFrame({'编号': [1], '湿度': [30]}).to_excel(writer, sheet_name='表2', index=False)
+    return str(path)
+
+
+@pytest.fixture
+def calamine_installed(monkeypatch):
+    monkeypatch.setattr(excel_reader, 'engine_available', lambda engine: True)
+
+
+def test_auto_selects_by_rows_size_and_format(workbook, calamine_installed, monkeypatch):
+    monkeypatch.setattr(excel_reader.config, 'EXCEL_READER_ENGINE', 'auto')
+    monkeypatch.setattr(excel_reader.config, 'EXCEL_READER_CALAMINE_MIN_KB', 0)
+    assert ExcelReader.select_engine(workbook) == 'calamine'
+    # 只读表头时逐行读取
+    assert ExcelReader.select_engine(workbook, nrows=5) == 'openpyxl'
+    assert ExcelReader.select_engine('old.xls') == 'calamine'
+
+    monkeypatch.setattr(excel_reader.config, 'EXCEL_READER_CALAMINE_MIN_KB', 1024)
+    assert ExcelReader.select_engine(workbook) == 'openpyxl'
+
+
+def test_auto_without_calamine_and_forced_engine(workbook, monkeypatch):
+    monkeypatch.setattr(excel_reader, 'engine_available', lambda engine: engine != 'calamine')
+    monkeypatch.setattr(excel_reader.config, 'EXCEL_READER_CALAMINE_MIN_KB', 0)
+    assert ExcelReader.select_engine(workbook) == 'openpyxl'
+    assert ExcelReader.select_engine('old.xls') is None
+    assert ExcelReader.select_engine(workbook, engine='calamine') == 'calamine'
+    with pytest.raises(ValueError):
+        ExcelReader.select_engine(workbook, engine='xlsxwriter')
+
+
+def test_read_helpers(workbook):
+    assert ExcelReader.sheet_names(workbook) == ['表1', '表2']
+    assert ExcelReader.columns(workbook, '表2') == ['编号', '湿度']
+    assert ExcelReader.read(workbook, sheet_name='表1', nrows=5).shape == (5, 2)
+    assert list(ExcelReader.read(workbook, sheet_name=None)) == ['表1', '表2']
+    with ExcelReader.open(workbook) as excel_file:
+        assert len(excel_file.parse('表1')) == 200
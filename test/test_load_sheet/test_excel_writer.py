@@ -0,0 +1,216 @@
+import os
+import re
+import zipfile
+from datetime import date, datetime
+
+import pytest
+
+pd = pytest.importorskip('pandas')
+openpyxl = pytest.importorskip('openpyxl')
+
+from app.Utils.data_project_utils import DataProjectUtils  # noqa: E402
+from app.Utils.excel_writer import ExcelStreamWriter, frame_rows, unique_sheet_name  # noqa: E402
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({
+        '编号': [1, 2, None],
+        '名称': ['a', ' 空格 ', '<&>'],
+        '时间': [datetime(2024, 1, 2, 3, 4, 5), pd.NaT, datetime(2024, 3, 1)],
+        '日期': [date(2024, 5, 1)] * 3,
+        '合格': [True, False, True],
+        '温度': [20.5, float('nan'), -1.25],
+    })
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    path = tmp_path / 'data.xlsx'
+    with pd.ExcelWriter(path, engine='openpyxl') as writer:
+        pd.DataFrame({'编号': range(100)}).to_excel(writer, sheet_name='保留', index=False)
+        pd.DataFrame({'编号': [1]}).to_excel(writer, sheet_name='目标', index=False)
+    return str(path)
+
+
+def test_write_round_trip(tmp_path, frame):
+    path = str(tmp_path / 'out.xlsx')
+    written = ExcelStreamWriter.write(path, [('数据', frame_rows(frame)), ('空表', iter(()))])
+    assert written == {'数据': 3, '空表': 0}
+
+    result = pd.read_excel(path, sheet_name=None)
+    assert list(result) == ['数据', '空表']
+    pd.testing.assert_frame_equal(result['数据'], frame.assign(日期=pd.to_datetime(frame['日期'])),
+                                  check_dtype=False)
+
+    sheet = openpyxl.load_workbook(path)['数据']
+    assert sheet['C2'].number_format == 'YYYY-MM-DD HH:MM:SS'
+    assert sheet['D2'].number_format == 'YYYY-MM-DD'
+    # 只留下目标文件，没有遗留临时文件
+    assert os.listdir(tmp_path) == ['out.xlsx']
+
+
+def test_update_copies_unchanged_sheets(workbook, frame):
+    with zipfile.ZipFile(workbook) as zf:
+        kept = zf.read('xl/worksheets/sheet1.xml')
+
+    written = ExcelStreamWriter.update(workbook, [('目标', frame_rows(frame)), ('新增', frame_rows(frame.head(1)))])
+    assert written == {'目标': 3, '新增': 1}
+
+    with zipfile.ZipFile(workbook) as zf:
+        assert zf.read('xl/worksheets/sheet1.xml') == kept
+    result = pd.read_excel(workbook, sheet_name=None)
+    assert list(result) == ['保留', '目标', '新增']
+    assert len(result['保留']) == 100
+    assert result['目标']['名称'].tolist() == ['a', ' 空格 ', '<&>']
+    assert openpyxl.load_workbook(workbook)['新增']['C2'].number_format == 'YYYY-MM-DD HH:MM:SS'
+
+
+
+def test_repeated_update_reuses_styles(workbook, frame):
+    def styles():
+        with zipfile.ZipFile(workbook) as zf:
+            return zf.read('xl/styles.xml')
+
+    ExcelStreamWriter.update(workbook, [('目标', frame_rows(frame))])
+    after_first = styles()
+    for _ in range(20):
+        ExcelStreamWriter.update(workbook, [('目标', frame_rows(frame))])
+    assert styles() == after_first
+    assert after_first.count(b'<numFmt ') == 2
+    assert openpyxl.load_workbook(workbook)['目标']['C2'].number_format == 'YYYY-MM-DD HH:MM:SS'
+
+
+def test_written_sheets_have_dimension(tmp_path, workbook, frame):
+    path = str(tmp_path / 'out.xlsx')
+    ExcelStreamWriter.write(path, [('数据', frame_rows(frame)), ('空表', iter(()))])
+    ExcelStreamWriter.update(workbook, [('目标', frame_rows(frame)), ('新增', frame_rows(frame.head(1)))])
+
+    # openpyxl 只读模式按 <dimension> 报告大小
+    sheets = openpyxl.load_workbook(path, read_only=True)
+    assert (sheets['数据'].max_row, sheets['数据'].max_column) == (4, 6)
+    assert sheets['空表'].calculate_dimension() == 'A1:A1'
+    sheets = openpyxl.load_workbook(workbook, read_only=True)
+    assert [(ws.title, ws.max_row, ws.max_column) for ws in sheets] == [('保留', 101, 1), ('目标', 4, 6),
+                                                                        ('新增', 2, 6)]
+
+
+# 其他工具生成的工作簿：属性使用单引号、主命名空间带前缀、<sheet> 不自闭合
+FOREIGN_PARTS = {
+    '[Content_Types].xml':
+        "<?xml version='1.0' encoding='UTF-8'?><Types xmlns='http://schemas.openxmlformats.org/package/2006/"
+        "content-types'><Default Extension='rels' ContentType='application/vnd.openxmlformats-package."
+        "relationships+xml'/><Default Extension='xml' ContentType='application/xml'/><Override "
+        "PartName='/xl/workbook.xml' ContentType='application/vnd.openxmlformats-officedocument.spreadsheetml."
+        "sheet.main+xml'/><Override PartName='/xl/styles.xml' ContentType='application/vnd.openxmlformats-"
+        "officedocument.spreadsheetml.styles+xml'/><Override PartName='/xl/worksheets/a.xml' "
+        "ContentType='application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml'/></Types>",
+    '_rels/.rels':
+        "<?xml version='1.0' encoding='UTF-8'?><Relationships xmlns='http://schemas.openxmlformats.org/package/"
+        "2006/relationships'><Relationship Id='r1' Type='http://schemas.openxmlformats.org/officeDocument/2006/"
+        "relationships/officeDocument' Target='xl/workbook.xml'/></Relationships>",
+    'xl/workbook.xml':
+        "<?xml version='1.0' encoding='UTF-8'?><x:workbook xmlns:x='http://schemas.openxmlformats.org/"
+        "spreadsheetml/2006/main' xmlns:rel='http://schemas.openxmlformats.org/officeDocument/2006/relationships'>"
+        "<x:sheets><x:sheet name='原始&amp;数据' sheetId='3' rel:id='rIdA'></x:sheet></x:sheets></x:workbook>",
+    'xl/_rels/workbook.xml.rels':
+        "<?xml version='1.0' encoding='UTF-8'?><Relationships xmlns='http://schemas.openxmlformats.org/package/"
+        "2006/relationships'><Relationship Id='rIdA' Type='http://schemas.openxmlformats.org/officeDocument/2006/"
+        "relationships/worksheet' Target='worksheets/a.xml'/><Relationship Id='rId7' Type='http://schemas."
+        "openxmlformats.org/officeDocument/2006/relationships/styles' Target='styles.xml'/></Relationships>",
+    'xl/styles.xml':
+        "<?xml version='1.0' encoding='UTF-8'?><styleSheet xmlns='http://schemas.openxmlformats.org/spreadsheetml/"
+        "2006/main'><numFmts count='1'><numFmt numFmtId='164' formatCode='0.000'/></numFmts><fonts count='1'>"
+        "<font><sz val='11'/></font></fonts><fills count='1'><fill><patternFill patternType='none'/></fill>"
+        "</fills><borders count='1'><border/></borders><cellStyleXfs count='1'><xf numFmtId='0' fontId='0' "
+        "fillId='0' borderId='0'/></cellStyleXfs><cellXfs count='1'><xf numFmtId='0' fontId='0' fillId='0' "
+        "borderId='0' xfId='0'/></cellXfs><cellStyles count='1'><cellStyle name='Normal' xfId='0' builtinId='0'/>"
+        "</cellStyles></styleSheet>",
+    'xl/worksheets/a.xml':
+        "<?xml version='1.0' encoding='UTF-8'?><worksheet xmlns='http://schemas.openxmlformats.org/spreadsheetml/"
+        "2006/main'><sheetData><row r='1'><c r='A1' t='inlineStr'><is><t>编号</t></is></c></row><row r='2'>"
+        "<c r='A2'><v>1</v></c></row></sheetData></worksheet>",
+}
+
+
+def test_update_workbook_from_other_authors(tmp_path, frame):
+    path = str(tmp_path / 'foreign.xlsx')
+    with zipfile.ZipFile(path, 'w') as zf:
+        for name, xml in FOREIGN_PARTS.items():
+            zf.writestr(name, xml)
+
+    ExcelStreamWriter.update(path, [('新增', frame_rows(frame))])
+    ExcelStreamWriter.update(path, [('原始&数据', frame_rows(frame.head(1))), ('新增', frame_rows(frame))])
+
+    result = pd.read_excel(path, sheet_name=None)
+    assert list(result) == ['原始&数据', '新增']
+    assert len(result['原始&数据']) == 1 and len(result['新增']) == 3
+    sheets = openpyxl.load_workbook(path)
+    assert sheets['新增']['C2'].number_format == 'YYYY-MM-DD HH:MM:SS'
+    with zipfile.ZipFile(path) as zf:
+        styles = zf.read('xl/styles.xml').decode('utf-8')
+        assert 'xl/worksheets/a.xml' in zf.namelist()
+    # 已有的 numFmtId 164 不被重复使用；更新 count 时不留下原来单引号的 count 属性
+    assert styles.count("numFmtId='164'") == 1 and styles.count('numFmtId="164"') == 0
+    assert all(tag.count('count=') <= 1 for tag in re.findall(r'<\w+\b[^>]*>', styles))
+    assert re.search(r'<cellXfs count="(\d+)"', styles).group(1) == str(styles.count('<xf ') - 1)
+
+
+def test_failed_write_keeps_original(workbook):
+    def broken_rows():
+        yield ['编号']
+        raise RuntimeError('读取失败')
+
+    with open(workbook, 'rb') as f:
+        original = f.read()
+    with pytest.raises(RuntimeError):
+        ExcelStreamWriter.update(workbook, [('新增', broken_rows())])
+    with open(workbook, 'rb') as f:
+        assert f.read() == original
+    assert os.listdir(os.path.dirname(workbook)) == ['data.xlsx']
+
+
+@pytest.mark.parametrize('name', ['1/2月', '', "'引号", 'History', '超' * 32])
+def test_invalid_sheet_name_rejected(tmp_path, workbook, name):
+    with pytest.raises(ValueError):
+        ExcelStreamWriter.write(str(tmp_path / 'out.xlsx'), [(name, iter(()))])
+    with pytest.raises(ValueError):
+        ExcelStreamWriter.update(workbook, [(name, iter(()))])
+    assert pd.read_excel(workbook, sheet_name=None).keys() == {'保留', '目标'}
+
+
+def test_duplicate_sheet_name_rejected(tmp_path, workbook):
+    with pytest.raises(ValueError):
+        ExcelStreamWriter.write(str(tmp_path / 'out.xlsx'), [('数据', iter(())), ('数据', iter(()))])
+    # 页签名不区分大小写
+    with pytest.raises(ValueError):
+        ExcelStreamWriter.update(workbook, [('data', iter(())), ('DATA', iter(()))])
+
+
+def test_unique_sheet_name():
+    assert unique_sheet_name('1/2月') == '1_2月'
+    assert unique_sheet_name('') == 'Sheet'
+    assert unique_sheet_name('Data', {'data'}) == 'Data_1'
+    assert unique_sheet_name('Data', ['DATA', 'Data_1']) == 'Data_2'
+    assert len(unique_sheet_name('长' * 40, {'长' * 31})) == 31
+
+
+@pytest.mark.parametrize('names', [['1/2月'], [''], ['a' * 40, 'A' * 31], ['数据', '数据']])
+def test_validate_workbook_sheet_names(names):
+    data = {'workbook_name': 'wb', 'sheets': [{'name': name, 'columns': [], 'rows': []} for name in names]}
+    valid, message = DataProjectUtils.validate_workbook_data(data)
+    assert not valid, message
+
+
+def test_convert_dict_to_excel(tmp_path):
+    path = str(tmp_path / 'book.xlsx')
+    DataProjectUtils.convert_dict_to_excel({'sheets': [
+        {'name': '表' * 40, 'columns': [{'name': '列A'}, {}], 'rows': [{'0': 'x', '1': 3}, {'1': ''}]},
+        {'name': '空', 'columns': [], 'rows': []},
+    ]}, path)
+
+    result = pd.read_excel(path, sheet_name=None)
+    assert list(result) == ['表' * 31, '空']
+    assert result['表' * 31].columns.tolist() == ['列A', '列2']
+    # 与 pd.ExcelWriter 一致：末尾的空行读取时不保留
+    assert result['表' * 31].values.tolist() == [['x', 3]]
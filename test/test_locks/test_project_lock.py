@@ -0,0 +1,204 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+flask = pytest.importorskip('flask')
+
+from app.core.project_lock import (ProjectLock, ProjectLockTimeout, WRITE,  # noqa: E402
+                                   locked_project)
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# 子进程持有项目1的写锁，直到标准输入关闭
+HOLDER = """
+import sys
+from app.core.project_lock import ProjectLock
+with ProjectLock(sys.argv[1], 1).write():
+    print('locked', flush=True)
+    sys.stdin.read()
+"""
+
+pytestmark = pytest.mark.skipif(sys.platform == 'win32', reason='Windows 下读锁为排他锁')
+
+
+@pytest.fixture
+def holder(tmp_path):
+    process = subprocess.Popen([sys.executable, '-c', HOLDER, str(tmp_path)], cwd=ROOT_DIR,
+                               stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+    assert process.stdout.readline().strip() == 'locked'
+    yield process
+    process.stdin.close()
+    process.wait(timeout=10)
+
+
+def test_write_lock_excludes_other_processes(tmp_path, holder):
+    with pytest.raises(ProjectLockTimeout):
+        with ProjectLock(str(tmp_path), 1, timeout=0.2).read():
+            pass
+    # 其他项目不受影响
+    start = time.monotonic()
+    with ProjectLock(str(tmp_path), 2, timeout=0.2).write():
+        pass
+    assert time.monotonic() - start < 0.2
+
+    holder.stdin.close()
+    holder.wait(timeout=10)
+    with ProjectLock(str(tmp_path), 1, timeout=5).write():
+        pass
+
+
+def test_readers_share_and_writer_waits(tmp_path):
+    lock = ProjectLock(str(tmp_path), 1, timeout=5)
+    events = []
+    reader_ready = threading.Event()
+    release_reader = threading.Event()
+
+    def reader():
+        with lock.read():
+            reader_ready.set()
+            release_reader.wait(5)
+            events.append('reader_done')
+
+    thread = threading.Thread(target=reader)
+    thread.start()
+    reader_ready.wait(5)
+    # 读锁之间不互斥
+    with ProjectLock(str(tmp_path), 1, timeout=0.2).read():
+        pass
+    with pytest.raises(ProjectLockTimeout):
+        with ProjectLock(str(tmp_path), 1, timeout=0.2).write():
+            pass
+
+    threading.Timer(0.2, release_reader.set).start()
+    with lock.write():
+        events.append('writer')
+    thread.join()
+    assert events == ['reader_done', 'writer']
+
+
+def test_lock_is_reentrant_within_thread(tmp_path):
+    lock = ProjectLock(str(tmp_path), 1, timeout=0.2)
+    with lock.write():
+        with lock.read(), lock.write():
+            pass
+    with lock.read():
+        with pytest.raises(RuntimeError):
+            with lock.write():
+                pass
+
+
+def test_locked_project_view_returns_503_on_timeout(tmp_path, holder):
+    app = flask.Flask(__name__)
+    app.config.update(SHEET_DATA_DIR=str(tmp_path.parent), PROJECT_LOCK_DIR=str(tmp_path), PROJECT_LOCK_TIMEOUT=0.2)
+
+    @app.route('/projects/<int:project_id>', methods=['POST'])
+    @locked_project(WRITE)
+    def save(project_id):
+        return flask.jsonify({'success': True})
+
+    client = app.test_client()
+    response = client.post('/projects/1')
+    assert response.status_code == 503
+    assert response.get_json()['success'] is False
+    assert client.post('/projects/2').status_code == 200
+
+
+def test_readers_never_see_partial_workbook(tmp_path):
+    pd = pytest.importorskip('pandas')
+    pytest.importorskip('openpyxl')
+    from app.Utils.excel_reader import ExcelReader
+    from app.Utils.excel_writer import ExcelStreamWriter, frame_rows
+
+    path = str(tmp_path / 'workbook.xlsx')
+    df = pd.DataFrame({'编号': range(2000), '温度': [20.5] * 2000})
+    ExcelStreamWriter.write(path, [('数据', frame_rows(df))])
+    stop = threading.Event()
+    errors = []
+
+    def writer():
+        while not stop.is_set():
+            try:
+                ExcelStreamWriter.write(path, [('数据', frame_rows(df))])
+            except Exception as e:  # pragma: no cover
+                errors.append(e)
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    try:
+        # 没有加锁的读取也总是读到完整的工作簿（原子替换）
+        for _ in range(20):
+            assert len(ExcelReader.read(path, sheet_name='数据')) == 2000
+    finally:
+        stop.set()
+        thread.join()
+    assert not errors
+    assert os.listdir(tmp_path) == ['workbook.xlsx']
+
+
+# 配置在导入时按 FLASK_CONFIG 选择，需要在子进程中创建应用
+READERS = """
+import json
+import threading
+
+from app import create_app
+from app.core.project_lock import project_lock
+from app.core.seed import seed_database
+
+app = create_app()
+from app import db
+from app.DataProject.modules import SheetProject, Table
+
+summary = seed_database(app, db, projects=1, users=1, members=1, sheets=1, tables=1, rows=5, columns=2, charts=0)
+project_id = summary['first_project_id']
+with app.app_context():
+    sheet_id = SheetProject.query.filter_by(project_id=project_id).first().sheet_id
+    table = Table.query.filter_by(sheet_id=sheet_id).first()
+    chart = {'project_id': project_id, 'chart_type_id': 1, 'sheet_id': sheet_id, 'table_id': table.id,
+             'x_axis': 'a', 'y_axis': ['b'], 'chart_name': 'c'}
+client = app.test_client()
+
+
+def readers():
+    return [client.get(f'/data/api/sheets/{sheet_id}/headers').status_code,
+            client.get(f'/data/api/tables/{table.id}/headers').status_code,
+            client.post('/data/api/charts/generate', json=chart).status_code]
+
+
+locked, release = threading.Event(), threading.Event()
+
+
+def writer():
+    with app.app_context(), project_lock(project_id).write():
+        locked.set()
+        release.wait(10)
+
+
+thread = threading.Thread(target=writer)
+thread.start()
+locked.wait(10)
+result = {'locked': readers()}
+release.set()
+thread.join()
+result['unlocked'] = readers()[:2]
+print(json.dumps(result))
+"""
+
+
+def test_workbook_readers_take_project_read_lock(tmp_path):
+    pytest.importorskip('flask_sqlalchemy')
+    pytest.importorskip('pandas')
+    pytest.importorskip('openpyxl')
+
+    env = dict(os.environ, FLASK_CONFIG='sqlite', SQLITE_DATA_DIR=str(tmp_path), LOG_LEVEL='WARNING',
+               PROJECT_LOCK_TIMEOUT='0.2')
+    result = subprocess.run([sys.executable, '-c', READERS], cwd=ROOT_DIR, env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr[-3000:]
+    output = json.loads(result.stdout.strip().splitlines()[-1])
+    # 写锁持有期间读取工作簿的接口等待后返回503，释放后正常读取
+    assert output['locked'] == [503, 503, 503]
+    assert output['unlocked'] == [200, 200]
@@ -0,0 +1,54 @@
+import json
+import logging
+
+import pytest
+
+pytest.importorskip('flask')
+
+from app.core.logger import SamplingFilter, brief, parse_sample_rates, setup_logging  # noqa: E402
+
+
+@pytest.fixture
+def restore_root_logger():
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    yield
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(level)
+
+
+def make_record(name, level):
+    return logging.LogRecord(name, level, __file__, 1, 'msg', (), None)
+
+
+def test_brief_limits_large_payloads():
+    workbook = {'sheets': [{'rows': [{str(i): 'x' * 1000} for i in range(10000)]}]}
+    text = str(brief(workbook))
+    assert len(text) < 1000
+    assert '...' in text
+
+
+def test_sampling_filter_uses_longest_prefix_and_keeps_warnings():
+    sampling = SamplingFilter(parse_sample_rates('app=1,app.DataProject=0'))
+    assert not sampling.filter(make_record('app.DataProject.func_views', logging.INFO))
+    assert sampling.filter(make_record('app.DataProject.func_views', logging.WARNING))
+    assert sampling.filter(make_record('app.Utils.chart_utils', logging.DEBUG))
+
+
+def test_json_output_is_truncated_and_structured(capsys, restore_root_logger):
+    listener = setup_logging({'LOG_LEVEL': 'INFO', 'LOG_FORMAT': 'json', 'LOG_MAX_MESSAGE_LENGTH': 50})
+    logger = logging.getLogger('app.test')
+    logger.debug("不会输出: %s", 'x')
+    logger.info("数据: %s", 'y' * 500, extra={'project_id': 7})
+    listener.stop()
+
+    lines = [line for line in capsys.readouterr().err.splitlines() if line]
+    assert len(lines) == 1
+    payload = json.loads(lines[0])
+    assert payload['level'] == 'INFO'
+    assert payload['project_id'] == 7
+    assert payload['message'].endswith('已截断)')
+    assert len(payload['message']) < 100
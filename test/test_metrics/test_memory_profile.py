@@ -0,0 +1,53 @@
+import tracemalloc
+
+import pytest
+
+flask = pytest.importorskip('flask')
+pytest.importorskip('sqlalchemy')
+
+from app.core.memory_profile import init_memory_profile  # noqa: E402
+from app.core.metrics import stage_timer  # noqa: E402
+
+
+@pytest.fixture
+def client():
+    app = flask.Flask(__name__)
+    app.config.update(MEMORY_PROFILE_ENABLED=True, MEMORY_PROFILE_TOP_N=3, ADMIN_TOKEN='secret')
+    init_memory_profile(app)
+
+    @app.route('/merge')
+    def merge():
+        with stage_timer('excel_read'):
+            rows = [str(i) * 10 for i in range(50000)]
+        with stage_timer('transform'):
+            merged = [row + row for row in rows]
+            del merged
+        return flask.jsonify({'success': True})
+
+    return app.test_client()
+
+
+def test_request_without_opt_in_is_not_traced(client):
+    response = client.get('/merge', headers={'X-Admin-Token': 'secret'})
+    assert 'X-Memory-Peak' not in response.headers
+    assert '_memory_profile' not in response.get_json()
+
+
+def test_admin_request_reports_peak_per_stage(client):
+    response = client.get('/merge?__memprofile=1', headers={'X-Admin-Token': 'secret'})
+    report = response.get_json()['_memory_profile']
+    stages = {stage['stage']: stage for stage in report['stages']}
+
+    assert set(stages) == {'excel_read', 'transform'}
+    # transform 阶段的中间结果已释放：峰值明显，但净增接近0
+    assert stages['transform']['peak_mb'] > 1
+    assert stages['transform']['net_mb'] < stages['transform']['peak_mb'] / 2
+    assert stages['excel_read']['top'][0]['location'].endswith('test_memory_profile.py:21')
+    assert len(stages['excel_read']['top']) <= 3
+    assert int(response.headers['X-Memory-Peak']) >= stages['transform']['peak_bytes']
+    assert not tracemalloc.is_tracing()
+
+
+def test_non_admin_opt_in_is_ignored(client):
+    response = client.get('/merge', headers={'X-Memory-Profile': '1'})
+    assert 'X-Memory-Peak' not in response.headers
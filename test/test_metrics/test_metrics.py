@@ -0,0 +1,48 @@
+import pytest
+
+flask = pytest.importorskip('flask')
+pytest.importorskip('sqlalchemy')
+
+from app.core.metrics import MetricsRegistry, init_metrics, stage_timer  # noqa: E402
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.histogram('demo_seconds', '示例', ('stage',), buckets=(0.1, 1.0))
+    histogram.observe(0.05, stage='read')
+    histogram.observe(0.1, stage='read')
+    histogram.observe(5, stage='read')
+
+    text = registry.render()
+    assert 'demo_seconds_bucket{stage="read",le="0.1"} 2' in text
+    assert 'demo_seconds_bucket{stage="read",le="1.0"} 2' in text
+    assert 'demo_seconds_bucket{stage="read",le="+Inf"} 3' in text
+    assert 'demo_seconds_count{stage="read"} 3' in text
+
+
+def test_metric_requires_declared_labels():
+    counter = MetricsRegistry().counter('demo_total', '示例', ('route',))
+    with pytest.raises(ValueError):
+        counter.inc(path='/x')
+
+
+def test_request_metrics_use_route_template():
+    app = flask.Flask(__name__)
+    init_metrics(app)
+
+    @app.route('/api/project/<int:project_id>')
+    def project_detail(project_id):
+        with stage_timer('excel_read'):
+            pass
+        return {'id': project_id}
+
+    client = app.test_client()
+    client.get('/api/project/1')
+    client.get('/api/project/2')
+    client.get('/not-found')
+
+    text = client.get('/metrics').get_data(as_text=True)
+    assert 'http_requests_total{method="GET",route="/api/project/<int:project_id>",status="200"} 2' in text
+    assert 'http_requests_total{method="GET",route="unmatched",status="404"} 1' in text
+    assert 'http_requests_in_flight{method="GET",route="/api/project/<int:project_id>"} 0' in text
+    assert 'app_stage_duration_seconds_count{stage="excel_read"}' in text
@@ -0,0 +1,50 @@
+import os
+import time
+
+import pytest
+
+flask = pytest.importorskip('flask')
+pytest.importorskip('sqlalchemy')
+
+from app.core.profiler import init_profiler, list_profiles  # noqa: E402
+
+
+@pytest.fixture
+def client(tmp_path):
+    app = flask.Flask(__name__)
+    app.config.update(PROFILE_DIR=str(tmp_path), PROFILE_KEEP=2, PROFILE_SAMPLE_INTERVAL_MS=1, ADMIN_TOKEN='secret')
+    init_profiler(app)
+
+    @app.route('/slow')
+    def slow():
+        deadline = time.perf_counter() + 0.05
+        while time.perf_counter() < deadline:
+            pass
+        return 'ok'
+
+    return app.test_client()
+
+
+def test_non_admin_request_is_not_profiled(client, tmp_path):
+    response = client.get('/slow', headers={'X-Profile': 'sampling'})
+    assert 'X-Profile-Id' not in response.headers
+    assert list_profiles(str(tmp_path)) == []
+
+
+@pytest.mark.parametrize('mode, suffix', [('sampling', '.collapsed'), ('cprofile', '.prof')])
+def test_admin_request_writes_profile(client, tmp_path, mode, suffix):
+    response = client.get(f'/slow?__profile={mode}', headers={'X-Admin-Token': 'secret'})
+    profile_id = response.headers['X-Profile-Id']
+
+    profile = list_profiles(str(tmp_path))[0]
+    assert profile['id'] == profile_id
+    assert profile['endpoint'] == 'slow'
+    assert profile['file_name'].endswith(suffix)
+    assert os.path.getsize(tmp_path / profile['file_name']) > 0
+
+
+def test_old_profiles_are_pruned(client, tmp_path):
+    for _ in range(3):
+        client.get('/slow', headers={'X-Admin-Token': 'secret', 'X-Profile': '1'})
+    assert len(list_profiles(str(tmp_path))) == 2
+    assert len(os.listdir(tmp_path)) == 4
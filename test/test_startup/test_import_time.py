@@ -0,0 +1,72 @@
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+# 项目根目录
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# 创建应用的启动耗时预算（秒），可通过环境变量调整
+STARTUP_BUDGET_SECONDS = float(os.environ.get('STARTUP_BUDGET_SECONDS', '3.0'))
+
+# 这些重型科学计算库不应在创建应用时被导入
+HEAVY_MODULES = ['pandas', 'numpy', 'matplotlib', 'seaborn', 'openpyxl']
+
+STARTUP_SCRIPT = 'from app import create_app; create_app()'
+
+
+def run_importtime(script):
+    """以 -X importtime 运行脚本，返回 (耗时秒数, 导入记录列表)"""
+    env = dict(os.environ)
+    env['DB_CHECK_ON_STARTUP'] = '0'
+
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', script],
+        cwd=ROOT_DIR, env=env, capture_output=True, text=True
+    )
+    elapsed = time.perf_counter() - start
+
+    assert result.returncode == 0, f"创建应用失败:\n{result.stderr[-3000:]}"
+    return elapsed, parse_importtime(result.stderr)
+
+
+def parse_importtime(stderr):
+    """解析 importtime 输出，返回 [(模块名, 自身耗时us, 累计耗时us), ...]"""
+    records = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3:
+            continue
+        try:
+            records.append((parts[2].strip(), int(parts[0]), int(parts[1])))
+        except ValueError:
+            continue
+    return records
+
+
+def test_create_app_skips_heavy_imports():
+    """创建应用时不应导入 pandas / matplotlib 等重型依赖"""
+    pytest.importorskip('flask')
+    pytest.importorskip('flask_sqlalchemy')
+
+    elapsed, records = run_importtime(STARTUP_SCRIPT)
+    imported = {name for name, _, _ in records}
+
+    loaded_heavy = sorted(
+        module for module in HEAVY_MODULES
+        if any(name == module or name.startswith(module + '.') for name in imported)
+    )
+    assert not loaded_heavy, f"创建应用时导入了重型依赖: {loaded_heavy}"
+
+    # 打印累计耗时最高的导入，便于定位启动慢的来源
+    top_imports = sorted(records, key=lambda r: r[2], reverse=True)[:10]
+    print(f"\n创建应用耗时: {elapsed:.3f}s（预算 {STARTUP_BUDGET_SECONDS}s）")
+    for name, _, cumulative_us in top_imports:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+
+    assert elapsed < STARTUP_BUDGET_SECONDS, f"创建应用耗时 {elapsed:.3f}s 超出预算"
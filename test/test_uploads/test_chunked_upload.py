@@ -0,0 +1,96 @@
+import hashlib
+import io
+import os
+import time
+
+import pytest
+
+from app.core.uploads import ChunkedUpload, ChunkedUploadError, UploadSweeper
+
+CONTENT = os.urandom(10 * 1024 + 123)
+CHUNK = 4096
+
+
+def sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def send(upload, offset, data=None):
+    data = CONTENT[offset:offset + CHUNK] if data is None else data
+    return upload.write_chunk(offset, io.BytesIO(data), sha256(data), buffer_size=1000)
+
+
+@pytest.fixture
+def upload(tmp_path):
+    return ChunkedUpload.create(str(tmp_path / 'chunked'), 7, 'data.xlsx', len(CONTENT), CHUNK)
+
+
+def test_resume_after_interruption_and_assemble(tmp_path, upload):
+    assert send(upload, 0) == CHUNK
+
+    # 模拟断线后重新加载会话，从返回的偏移量继续上传
+    resumed = ChunkedUpload.load(upload.root, upload.upload_id, project_id=7)
+    offset = resumed.status()['offset']
+    assert offset == CHUNK
+    while offset < len(CONTENT):
+        offset = send(resumed, offset)
+    assert resumed.status()['complete']
+
+    target = tmp_path / 'SheetData' / '7' / 'workbook_data.xlsx'
+    resumed.assemble(str(target), checksum=sha256(CONTENT))
+    assert target.read_bytes() == CONTENT
+    assert not os.path.exists(upload.directory)
+
+
+def test_bad_checksum_is_rejected_and_not_stored(upload):
+    with pytest.raises(ChunkedUploadError) as e:
+        upload.write_chunk(0, io.BytesIO(CONTENT[:CHUNK]), sha256(b'other'))
+    assert e.value.status_code == 422
+    assert upload.offset == 0
+    assert os.listdir(upload.directory) == [ChunkedUpload.META_FILE]
+
+
+def test_out_of_order_chunk_returns_current_offset(upload):
+    send(upload, 0)
+    with pytest.raises(ChunkedUploadError) as e:
+        send(upload, 2 * CHUNK)
+    assert e.value.status_code == 409
+    assert e.value.data == {'offset': CHUNK}
+
+    # 重传已接收的分片是幂等的
+    assert send(upload, 0) == CHUNK
+
+
+def test_oversize_chunk_and_incomplete_assemble(tmp_path, upload):
+    with pytest.raises(ChunkedUploadError) as e:
+        send(upload, 0, CONTENT[:CHUNK + 1])
+    assert e.value.status_code == 413
+
+    send(upload, 0)
+    with pytest.raises(ChunkedUploadError) as e:
+        upload.assemble(str(tmp_path / 'out.xlsx'))
+    assert e.value.status_code == 409
+    assert not (tmp_path / 'out.xlsx').exists()
+
+
+def test_load_rejects_unknown_or_foreign_upload(upload):
+    for upload_id, project_id in (('../etc', None), ('0' * 32, None), (upload.upload_id, 8)):
+        with pytest.raises(ChunkedUploadError) as e:
+            ChunkedUpload.load(upload.root, upload_id, project_id)
+        assert e.value.status_code == 404
+
+
+def test_sweeper_keeps_active_session_and_removes_stale_one(tmp_path, upload):
+    send(upload, 0)
+    stale = ChunkedUpload.create(upload.root, 7, 'stale.xlsx', len(CONTENT), CHUNK)
+    send(stale, 0)
+    expired = time.time() - 7200
+    for directory in (upload.directory, stale.directory):
+        for name in os.listdir(directory):
+            os.utime(os.path.join(directory, name), (expired, expired))
+    # 活跃会话刚收到分片（meta.json 已更新），旧分片不能被单独清理
+    send(upload, CHUNK)
+
+    UploadSweeper(str(tmp_path), max_age=3600).sweep()
+    assert not os.path.exists(stale.directory)
+    assert upload.offset == 2 * CHUNK
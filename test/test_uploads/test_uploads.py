@@ -0,0 +1,85 @@
+import io
+import os
+import time
+
+import pytest
+
+flask = pytest.importorskip('flask')
+
+from app.core.uploads import UploadSweeper, init_uploads, save_upload, stored_upload_path  # noqa: E402
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = flask.Flask(__name__)
+    app.config.update(UPLOAD_FOLDER=str(tmp_path / 'uploads'), MAX_CONTENT_LENGTH=64 * 1024,
+                      UPLOAD_SWEEP_INTERVAL=0)
+    init_uploads(app)
+    seen = {}
+
+    @app.route('/upload', methods=['POST'])
+    def upload():
+        path = stored_upload_path(flask.request.files['file'])
+        seen['path'] = path
+        seen['exists_during_request'] = os.path.isfile(path)
+        with open(path, 'rb') as f:
+            return flask.jsonify({'size': len(f.read())})
+
+    app.seen = seen
+    return app
+
+
+def test_upload_is_streamed_to_upload_folder_and_removed(app):
+    data = {'file': (io.BytesIO(b'x' * 20000), 'data.xlsx')}
+    response = app.test_client().post('/upload', data=data, content_type='multipart/form-data')
+
+    assert response.status_code == 200
+    assert response.get_json()['size'] == 20000
+    assert os.path.dirname(app.seen['path']) == app.config['UPLOAD_FOLDER']
+    assert app.seen['exists_during_request']
+    assert not os.listdir(app.config['UPLOAD_FOLDER'])
+
+
+def test_oversize_upload_is_rejected(app):
+    data = {'file': (io.BytesIO(b'x' * 100 * 1024), 'data.xlsx')}
+    response = app.test_client().post('/upload', data=data, content_type='multipart/form-data')
+
+    assert response.status_code == 413
+    assert response.get_json()['success'] is False
+    assert 'path' not in app.seen
+
+
+def test_save_upload_replaces_target_atomically(tmp_path):
+    target = tmp_path / 'project' / 'workbook_data.xlsx'
+    target.parent.mkdir()
+    target.write_bytes(b'old')
+
+    class BrokenStream(io.BytesIO):
+        def read(self, size=-1):
+            raise OSError('connection reset')
+
+    with pytest.raises(OSError):
+        save_upload(type('File', (), {'stream': BrokenStream(b'new')})(), str(target))
+    # 写入失败时保留原文件，且不残留临时文件
+    assert target.read_bytes() == b'old'
+    assert os.listdir(target.parent) == ['workbook_data.xlsx']
+
+    save_upload(type('File', (), {'stream': io.BytesIO(b'new' * 1000)})(), str(target), chunk_size=512)
+    assert target.read_bytes() == b'new' * 1000
+    assert os.listdir(target.parent) == ['workbook_data.xlsx']
+
+
+def test_sweeper_removes_only_expired_files(tmp_path):
+    old_dir = tmp_path / 'old_session'
+    old_dir.mkdir()
+    old_file = old_dir / 'upload_old.part'
+    old_file.write_bytes(b'old')
+    new_file = tmp_path / 'upload_new.part'
+    new_file.write_bytes(b'new')
+    expired = time.time() - 7200
+    os.utime(old_file, (expired, expired))
+    os.utime(old_dir, (expired, expired))
+
+    assert UploadSweeper(str(tmp_path), max_age=3600).sweep() == 1
+    assert not old_dir.exists()
+    assert new_file.exists()
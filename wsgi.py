@@ -0,0 +1,45 @@
+# wsgi.py
+"""
+生产环境入口（多进程WSGI服务）
+
+Linux:   FLASK_CONFIG=production gunicorn -c gunicorn.conf.py wsgi:app
+Windows: FLASK_CONFIG=production python wsgi.py   （使用waitress多线程服务）
+"""
+import gc
+import logging
+import os
+
+# 服务端只需要离屏渲染，必须在导入 matplotlib 之前设置
+os.environ.setdefault('MPLBACKEND', 'Agg')
+
+from app import create_app
+from app.core.config import config
+from app.core.utils import preload_lazy_modules
+
+logger = logging.getLogger(__name__)
+
+app = create_app()
+
+if config.WSGI_PRELOAD:
+    # 在fork之前导入重型依赖，worker以写时复制方式共享这部分内存
+    preloaded = preload_lazy_modules(config.WSGI_PRELOAD_MODULES)
+    # 冻结已有对象，避免GC遍历时改写引用计数页而破坏写时复制
+    gc.freeze()
+    logger.info("✅ 已预加载模块: %s", ', '.join(preloaded))
+
+
+def serve_with_waitress():
+    """使用waitress启动服务（无fork的平台，如Windows）"""
+    from waitress import serve
+
+    logger.info("🚀 waitress 启动: %s, 线程数: %s", config.WSGI_BIND, config.WSGI_THREADS)
+    serve(
+        app,
+        listen=config.WSGI_BIND,
+        threads=config.WSGI_THREADS,
+        channel_timeout=config.WSGI_TIMEOUT,
+    )
+
+
+if __name__ == '__main__':
+    serve_with_waitress()